@@ -0,0 +1,432 @@
+import bisect
+import json
+import os
+import shutil
+
+import numpy as np
+
+# --- 1. Configurações ---
+# Pasta padrão do armazém (fica ao lado deste arquivo, em Data/candles)
+DIRETORIO_PADRAO = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'candles')
+
+# Arquivo com os limites (em timestamps) da divisão treino/validação/teste
+ARQUIVO_DIVISAO = 'divisao.json'
+
+# Índice de lacunas (minutos sem candles, ex.: paradas da corretora), mantido em dia a cada escrita no armazém
+ARQUIVO_LACUNAS = 'lacunas.json'
+
+# Saída do preprocessar.py: séries já normalizadas por conjunto (.npy) e o manifesto com o hash das entradas
+DIRETORIO_PREPROCESSADO = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'preprocessado')
+ARQUIVO_MANIFESTO = 'manifesto.json'
+
+# Colunas de preço/volume armazenadas em float32; o timestamp (ms) fica em int64
+COLUNAS = ('open', 'high', 'low', 'close', 'volume', 'delta')
+DTYPES = {'timestamp': np.dtype('<i8'), **{coluna: np.dtype('<f4') for coluna in COLUNAS}}
+
+
+UNIDADES_TIMEFRAME = {'m': 60, 'h': 3600, 'd': 86400, 'w': 604800}
+
+
+def duracao_timeframe_ms(timeframe):
+    """'1m' -> 60000, '4h' -> 14400000, ..."""
+    return int(timeframe[:-1]) * UNIDADES_TIMEFRAME[timeframe[-1]] * 1000
+
+
+def mes_do_timestamp(timestamps):
+    """Converte timestamps em ms para a chave do bloco mensal ('AAAA-MM')."""
+    return np.asarray(timestamps, dtype='i8').astype('datetime64[ms]').astype('datetime64[M]').astype(str)
+
+
+def indices_sem_lacunas(timestamps, look_back, duracao_ms=60_000):
+    """Índices (de create_sequences) das janelas cujos look_back + 1 candles são consecutivos.
+
+    Janelas que atravessam uma parada da corretora misturariam preços de horas diferentes
+    como se fossem minutos seguidos; elas ficam de fora.
+    """
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    n_amostras = len(timestamps) - look_back
+    if n_amostras <= 0:
+        return np.empty(0, dtype=np.int64)
+    # Sem lacunas, o alvo fica exatamente look_back candles depois do início da janela
+    extensao = timestamps[look_back:] - timestamps[:n_amostras]
+    return np.flatnonzero(extensao == look_back * duracao_ms)
+
+
+def indice_lacunas(timestamps, duracao_ms):
+    """Intervalos sem candles (paradas da corretora). Cada item: {'inicio', 'fim', 'candles'} (ms, inclusivo)."""
+    saltos = np.flatnonzero(np.diff(timestamps) > duracao_ms)
+    return [
+        {
+            'inicio': int(timestamps[i]) + duracao_ms,
+            'fim': int(timestamps[i + 1]) - duracao_ms,
+            'candles': int((timestamps[i + 1] - timestamps[i]) // duracao_ms) - 1,
+        }
+        for i in saltos
+    ]
+
+
+# --- 2. Armazém Colunar ---
+# Layout em disco (um diretório por par/timeframe e um subdiretório por mês):
+#   candles/ETH_USDT_1m/2024-01/timestamp.i8, open.f4, high.f4, low.f4, close.f4, volume.f4, delta.f4
+# Cada coluna é um arquivo binário cru, lido com np.memmap. Os meses ficam ordenados pelo nome,
+# então o índice de blocos é uma lista ordenada e a busca de um intervalo é bisect + searchsorted.
+class ArmazemCandles:
+    def __init__(self, symbol='ETH/USDT', timeframe='1m', raiz=DIRETORIO_PADRAO):
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.diretorio = os.path.join(raiz, f"{symbol.replace('/', '_')}_{timeframe}")
+        os.makedirs(self.diretorio, exist_ok=True)
+        self._meses = None
+
+    # --- Índice de blocos mensais ---
+    def meses(self):
+        if self._meses is None:
+            self._recuperar_trocas()
+            self._meses = sorted(
+                nome for nome in os.listdir(self.diretorio)
+                if os.path.isdir(os.path.join(self.diretorio, nome)) and not nome.startswith('.')
+            )
+        return self._meses
+
+    def _recuperar_trocas(self):
+        # Termina (ou desfaz) uma troca de mês interrompida por uma queda (ver _trocar_mes)
+        for nome in os.listdir(self.diretorio):
+            if not (nome.startswith('.') and nome.endswith('.novo')):
+                continue
+            mes = nome[1:-len('.novo')]
+            atual, novo = os.path.join(self.diretorio, mes), os.path.join(self.diretorio, nome)
+            if os.path.isdir(atual):
+                # A queda foi antes da troca: o mês novo pode estar incompleto e o atual está intacto
+                shutil.rmtree(novo)
+            else:
+                # A queda foi entre os dois renames: o mês novo já estava completo
+                os.replace(novo, atual)
+            shutil.rmtree(os.path.join(self.diretorio, f'.{mes}.antigo'), ignore_errors=True)
+
+    def _caminho(self, mes, coluna):
+        extensao = 'i8' if coluna == 'timestamp' else 'f4'
+        return os.path.join(self.diretorio, mes, f'{coluna}.{extensao}')
+
+    def _linhas(self, mes):
+        # Um append interrompido pode deixar colunas com tamanhos diferentes; vale o menor
+        tamanhos = []
+        for coluna, dtype in DTYPES.items():
+            caminho = self._caminho(mes, coluna)
+            tamanhos.append(os.path.getsize(caminho) // dtype.itemsize if os.path.exists(caminho) else 0)
+        return min(tamanhos)
+
+    def _mapear(self, mes, coluna, linhas=None):
+        if linhas is None:
+            linhas = self._linhas(mes)
+        if linhas == 0:
+            return np.empty(0, dtype=DTYPES[coluna])
+        return np.memmap(self._caminho(mes, coluna), dtype=DTYPES[coluna], mode='r', shape=(linhas,))
+
+    def __len__(self):
+        return sum(self._linhas(mes) for mes in self.meses())
+
+    def primeiro_timestamp(self):
+        for mes in self.meses():
+            timestamps = self._mapear(mes, 'timestamp')
+            if len(timestamps):
+                return int(timestamps[0])
+        return None
+
+    def ultimo_timestamp(self):
+        for mes in reversed(self.meses()):
+            timestamps = self._mapear(mes, 'timestamp')
+            if len(timestamps):
+                return int(timestamps[-1])
+        return None
+
+    # --- Leitura por Intervalo ---
+    def ler_intervalo(self, t0=None, t1=None, colunas=COLUNAS):
+        """Lê os candles com t0 <= timestamp <= t1 (ms). Retorna um dict coluna -> array.
+
+        Quando o intervalo cai em um único mês, os arrays são views do memmap (sem cópia);
+        caso contrário, apenas os k candles do intervalo são concatenados.
+        """
+        colunas = ('timestamp',) + tuple(c for c in colunas if c != 'timestamp')
+        meses = self.meses()
+        inicio = 0 if t0 is None else bisect.bisect_left(meses, str(mes_do_timestamp(t0)))
+        fim = len(meses) if t1 is None else bisect.bisect_right(meses, str(mes_do_timestamp(t1)))
+
+        partes = {coluna: [] for coluna in colunas}
+        for mes in meses[inicio:fim]:
+            linhas = self._linhas(mes)
+            timestamps = self._mapear(mes, 'timestamp', linhas)
+            a = 0 if t0 is None else int(np.searchsorted(timestamps, t0, side='left'))
+            b = linhas if t1 is None else int(np.searchsorted(timestamps, t1, side='right'))
+            if a >= b:
+                continue
+            for coluna in colunas:
+                partes[coluna].append(self._mapear(mes, coluna, linhas)[a:b])
+
+        resultado = {}
+        for coluna in colunas:
+            if not partes[coluna]:
+                resultado[coluna] = np.empty(0, dtype=DTYPES[coluna])
+            elif len(partes[coluna]) == 1:
+                resultado[coluna] = partes[coluna][0]
+            else:
+                resultado[coluna] = np.concatenate(partes[coluna])
+        return resultado
+
+    def ultimos(self, n, colunas=COLUNAS):
+        """Lê os n candles mais recentes."""
+        colunas = ('timestamp',) + tuple(c for c in colunas if c != 'timestamp')
+        partes = {coluna: [] for coluna in colunas}
+        faltam = n
+        for mes in reversed(self.meses()):
+            if faltam <= 0:
+                break
+            linhas = self._linhas(mes)
+            a = max(0, linhas - faltam)
+            for coluna in colunas:
+                partes[coluna].insert(0, self._mapear(mes, coluna, linhas)[a:])
+            faltam -= linhas - a
+        return {
+            coluna: np.concatenate(partes[coluna]) if partes[coluna] else np.empty(0, dtype=DTYPES[coluna])
+            for coluna in colunas
+        }
+
+    # --- Escrita ---
+    def adicionar(self, ohlcv):
+        """Grava candles no formato do ccxt ([timestamp, open, high, low, close, volume]).
+
+        Candles já armazenados (mesmo timestamp) são ignorados. Retorna quantos candles novos foram gravados.
+        """
+        dados = np.asarray(ohlcv, dtype='f8').reshape(-1, 6)
+        if len(dados) == 0:
+            return 0
+        timestamps = dados[:, 0].astype('i8')
+        # Ordena e remove duplicatas dentro do próprio lote (mantém a primeira ocorrência)
+        ordem = np.argsort(timestamps, kind='stable')
+        timestamps, dados = timestamps[ordem], dados[ordem]
+        timestamps, unicos = np.unique(timestamps, return_index=True)
+        dados = dados[unicos]
+
+        chaves = mes_do_timestamp(timestamps)
+        fronteiras = np.flatnonzero(chaves[1:] != chaves[:-1]) + 1
+        novos = 0
+        for a, b in zip(np.r_[0, fronteiras], np.r_[fronteiras, len(timestamps)]):
+            novos += self._gravar_mes(str(chaves[a]), timestamps[a:b], dados[a:b, 1:])
+        if novos:
+            self._atualizar_lacunas(int(timestamps[0]), int(timestamps[-1]))
+        return novos
+
+    def _vizinhos(self, t0, t1):
+        """Timestamps armazenados logo antes de t0 e logo depois de t1 (None quando não há)."""
+        meses = self.meses()
+        antes = depois = None
+        for mes in reversed(meses[:bisect.bisect_right(meses, str(mes_do_timestamp(t0)))]):
+            timestamps = self._mapear(mes, 'timestamp')
+            i = int(np.searchsorted(timestamps, t0, side='left'))
+            if i > 0:
+                antes = int(timestamps[i - 1])
+                break
+        for mes in meses[bisect.bisect_left(meses, str(mes_do_timestamp(t1))):]:
+            timestamps = self._mapear(mes, 'timestamp')
+            i = int(np.searchsorted(timestamps, t1, side='right'))
+            if i < len(timestamps):
+                depois = int(timestamps[i])
+                break
+        return antes, depois
+
+    def _atualizar_lacunas(self, t0, t1):
+        # Só o trecho entre os candles vizinhos de [t0, t1] pode ter ganhado ou perdido lacunas: ele é
+        # recalculado e o resto do índice fica como está. Sem índice ainda, ele é montado do armazém inteiro
+        duracao = duracao_timeframe_ms(self.timeframe)
+        if not os.path.exists(os.path.join(self.diretorio, ARQUIVO_LACUNAS)):
+            salvar_lacunas(indice_lacunas(self.ler_intervalo(colunas=())['timestamp'], duracao), self)
+            return
+        antes, depois = self._vizinhos(t0, t1)
+        a = t0 if antes is None else antes
+        b = t1 if depois is None else depois
+        # Uma lacuna nunca contém candles armazenados: ou ela está toda entre a e b, ou toda fora
+        lacunas = [lacuna for lacuna in carregar_lacunas(self) if lacuna['fim'] < a or lacuna['inicio'] > b]
+        lacunas += indice_lacunas(self.ler_intervalo(a, b, colunas=())['timestamp'], duracao)
+        salvar_lacunas(sorted(lacunas, key=lambda lacuna: lacuna['inicio']), self)
+
+    def _close_anterior(self, mes, timestamp):
+        """Último close armazenado antes de `timestamp` (ou None se não houver)."""
+        meses = self.meses()
+        for anterior in reversed(meses[:bisect.bisect_right(meses, mes)]):
+            linhas = self._linhas(anterior)
+            timestamps = self._mapear(anterior, 'timestamp', linhas)
+            i = int(np.searchsorted(timestamps, timestamp, side='left'))
+            if i > 0:
+                return float(self._mapear(anterior, 'close', linhas)[i - 1])
+        return None
+
+    def _gravar_mes(self, mes, timestamps, valores):
+        os.makedirs(os.path.join(self.diretorio, mes), exist_ok=True)
+        if mes not in self.meses():
+            bisect.insort(self._meses, mes)
+
+        linhas = self._linhas(mes)
+        existentes = self._mapear(mes, 'timestamp', linhas)
+
+        if linhas == 0 or timestamps[0] > existentes[-1]:
+            # Caminho rápido: os candles são todos mais novos que o bloco, basta anexar ao fim dos arquivos
+            self._truncar(mes, linhas)
+            anterior = self._close_anterior(mes, timestamps[0])
+            colunas = self._colunas_com_delta(valores, anterior)
+            for coluna, valores_coluna in [('timestamp', timestamps)] + list(colunas.items()):
+                with open(self._caminho(mes, coluna), 'ab') as f:
+                    f.write(np.ascontiguousarray(valores_coluna, dtype=DTYPES[coluna]).tobytes())
+            novos = len(timestamps)
+        else:
+            # Candles no meio do bloco: junta com o que já existe (sem duplicar) e regrava o mês inteiro
+            atuais = self.ler_intervalo(int(existentes[0]), int(existentes[-1]))
+            manter = ~np.isin(timestamps, existentes)
+            novos = int(manter.sum())
+            if novos == 0:
+                return 0
+            todos_ts = np.concatenate([atuais['timestamp'], timestamps[manter]])
+            todos_valores = np.concatenate([
+                np.column_stack([atuais[c] for c in COLUNAS[:-1]]).astype('f8'), valores[manter]
+            ])
+            ordem = np.argsort(todos_ts, kind='stable')
+            todos_ts, todos_valores = todos_ts[ordem], todos_valores[ordem]
+            anterior = self._close_anterior(mes, todos_ts[0])
+            colunas = self._colunas_com_delta(todos_valores, anterior)
+            # Todas as colunas vão para um diretório novo, que substitui o mês de uma vez: uma queda no
+            # meio nunca deixa colunas regravadas ao lado de colunas antigas
+            novo = os.path.join(self.diretorio, f'.{mes}.novo')
+            shutil.rmtree(novo, ignore_errors=True)
+            os.makedirs(novo)
+            for coluna, valores_coluna in [('timestamp', todos_ts)] + list(colunas.items()):
+                with open(os.path.join(novo, os.path.basename(self._caminho(mes, coluna))), 'wb') as f:
+                    f.write(np.ascontiguousarray(valores_coluna, dtype=DTYPES[coluna]).tobytes())
+                    f.flush()
+                    os.fsync(f.fileno())
+            self._trocar_mes(mes, novo)
+
+        self._corrigir_delta_do_proximo_mes(mes)
+        return novos
+
+    def _trocar_mes(self, mes, novo):
+        # Dois renames (o diretório antigo sai, o novo entra); _recuperar_trocas cuida de uma queda entre eles.
+        # Memmaps já abertos sobre o mês antigo continuam válidos até serem fechados
+        atual = os.path.join(self.diretorio, mes)
+        antigo = os.path.join(self.diretorio, f'.{mes}.antigo')
+        shutil.rmtree(antigo, ignore_errors=True)
+        os.replace(atual, antigo)
+        os.replace(novo, atual)
+        shutil.rmtree(antigo)
+
+    @staticmethod
+    def _colunas_com_delta(valores, close_anterior):
+        close = valores[:, 3]
+        anteriores = np.empty_like(close)
+        anteriores[1:] = close[:-1]
+        # O primeiro candle da série inteira fica com delta 0 (como no antigo editData.py)
+        anteriores[0] = close[0] if close_anterior is None else close_anterior
+        return {
+            'open': valores[:, 0], 'high': valores[:, 1], 'low': valores[:, 2],
+            'close': close, 'volume': valores[:, 4],
+            'delta': (close - anteriores) / anteriores,
+        }
+
+    def _truncar(self, mes, linhas):
+        for coluna, dtype in DTYPES.items():
+            caminho = self._caminho(mes, coluna)
+            if os.path.exists(caminho) and os.path.getsize(caminho) != linhas * dtype.itemsize:
+                with open(caminho, 'r+b') as f:
+                    f.truncate(linhas * dtype.itemsize)
+
+    def _corrigir_delta_do_proximo_mes(self, mes):
+        # Se um mês anterior mudou, o delta do primeiro candle do mês seguinte pode ter mudado também
+        meses = self.meses()
+        i = meses.index(mes) + 1
+        if i >= len(meses) or self._linhas(meses[i]) == 0:
+            return
+        proximo = meses[i]
+        primeiro_ts = int(self._mapear(proximo, 'timestamp')[0])
+        anterior = self._close_anterior(proximo, primeiro_ts)
+        delta = np.memmap(self._caminho(proximo, 'delta'), dtype=DTYPES['delta'], mode='r+', shape=(1,))
+        close = float(self._mapear(proximo, 'close')[0])
+        delta[0] = 0.0 if anterior is None else (close - anterior) / anterior
+        delta.flush()
+
+
+# --- 3. Divisão Treino/Validação/Teste ---
+# O gerarDadaFrame.py grava apenas os limites de cada conjunto; os dados continuam no armazém.
+def _salvar_json(dados, caminho):
+    with open(caminho + '.tmp', 'w') as f:
+        json.dump(dados, f, indent=2)
+    os.replace(caminho + '.tmp', caminho)
+
+
+def salvar_divisao(limites, armazem):
+    _salvar_json(limites, os.path.join(armazem.diretorio, ARQUIVO_DIVISAO))
+
+
+def carregar_conjunto(nome, colunas=('close',), armazem=None):
+    """Lê um dos conjuntos ('treino', 'validacao' ou 'teste') direto do armazém."""
+    armazem = armazem or ArmazemCandles()
+    caminho = os.path.join(armazem.diretorio, ARQUIVO_DIVISAO)
+    if not os.path.exists(caminho):
+        raise FileNotFoundError(f"Divisão '{caminho}' não encontrada. Execute Data/gerarDadaFrame.py primeiro.")
+    with open(caminho) as f:
+        limites = json.load(f)[nome]
+    return armazem.ler_intervalo(limites['inicio'], limites['fim'], colunas)
+
+
+# --- 4. Índice de Lacunas ---
+def salvar_lacunas(lacunas, armazem):
+    _salvar_json(lacunas, os.path.join(armazem.diretorio, ARQUIVO_LACUNAS))
+
+
+def carregar_lacunas(armazem=None):
+    """Lista de lacunas {'inicio', 'fim', 'candles'} (ms, inclusivo); vazia se o índice não existir."""
+    armazem = armazem or ArmazemCandles()
+    caminho = os.path.join(armazem.diretorio, ARQUIVO_LACUNAS)
+    if not os.path.exists(caminho):
+        return []
+    with open(caminho) as f:
+        return json.load(f)
+
+
+# --- 5. Saída do Pré-processamento ---
+def ler_manifesto(diretorio=DIRETORIO_PREPROCESSADO):
+    """Manifesto gravado pelo preprocessar.py (ou None se o pipeline ainda não rodou)."""
+    caminho = os.path.join(diretorio, ARQUIVO_MANIFESTO)
+    if not os.path.exists(caminho):
+        return None
+    with open(caminho) as f:
+        return json.load(f)
+
+
+def impressao_armazem(armazem):
+    """Tamanho e último timestamp do armazém: mudam sempre que candles novos são gravados."""
+    return {'linhas': len(armazem), 'ultimo': armazem.ultimo_timestamp()}
+
+
+def preprocessado_atualizado(manifesto, armazem=None):
+    """True se a saída do preprocessar.py foi gerada a partir do armazém como ele está agora.
+
+    O getVelueEth.py (e o preencher_historico.py) gravam candles novos só no armazém; depois disso a
+    saída antiga não vale mais e o preprocessar.py precisa rodar de novo.
+    """
+    if manifesto is None or 'armazem' not in manifesto:
+        return False
+    armazem = armazem or ArmazemCandles(manifesto['symbol'], manifesto['timeframe'])
+    return manifesto['armazem'] == impressao_armazem(armazem)
+
+
+def carregar_preprocessado(nome, diretorio=DIRETORIO_PREPROCESSADO):
+    """Arrays de um conjunto ('treino', 'validacao' ou 'teste') mapeados do disco (sem cópia).
+
+    Chaves: 'timestamp', 'close' (normalizado), 'delta', 'indices' (janelas sem lacunas)
+    e, se o pipeline gerou janelas prontas, 'X' e 'y'.
+    """
+    arrays = {}
+    for arquivo in sorted(os.listdir(diretorio)):
+        prefixo = f'{nome}_'
+        if arquivo.startswith(prefixo) and arquivo.endswith('.npy'):
+            arrays[arquivo[len(prefixo):-4]] = np.load(os.path.join(diretorio, arquivo), mmap_mode='r')
+    if not arrays:
+        raise FileNotFoundError(f"Conjunto '{nome}' não encontrado em '{diretorio}'. Execute Data/preprocessar.py primeiro.")
+    return arrays
@@ -1,79 +1,70 @@
+import numpy as np
 import pandas as pd
 import glob
-import os
+from concurrent.futures import ProcessPoolExecutor
+from armazem_candles import ArmazemCandles, duracao_timeframe_ms
+from mesclagem import ler_csv, mesclar_ordenados
 
 # --- 1. Configuração ---
-# Padrão para encontrar seus arquivos.
+# Padrão para encontrar os arquivos anuais gerados pelas versões antigas do getVelueEth.py.
 # Ajuste se os nomes forem diferentes (ex: 'dados_eth_*.csv')
-file_pattern = '*.csv'
+file_pattern = 'eth_usdt_1m_data_*.csv'
 
-# Nome do arquivo de saída
-output_filename = 'ethereum_close_and_delta.csv'
+# Número de processos de leitura (None = um por núcleo)
+processos = None
 
-# --- 2. Encontrar e Ler os Arquivos ---
-# Pega o caminho de todos os arquivos que correspondem ao padrão na pasta atual
-all_files = glob.glob(file_pattern)
+# Candles gravados no armazém por chamada (limita a cópia em float64 feita na gravação)
+tamanho_lote = 500_000
 
-# Remove o próprio arquivo de saída da lista, caso ele já exista e o script seja rodado novamente
-if output_filename in all_files:
-    all_files.remove(output_filename)
 
-print(f"Encontrados {len(all_files)} arquivos para processar:")
-print(all_files)
+if __name__ == '__main__':
+    # Armazém colunar de destino (Data/candles). O 'delta' é calculado pelo próprio armazém na gravação.
+    armazem = ArmazemCandles('ETH/USDT', '1m')
 
-# Cria uma lista para armazenar os DataFrames de cada arquivo
-df_list = []
+    # --- 2. Encontrar e Ler os Arquivos ---
+    # Pega o caminho de todos os arquivos que correspondem ao padrão na pasta atual
+    all_files = sorted(glob.glob(file_pattern))
 
-# Loop para ler cada arquivo
-for filename in all_files:
-    print(f"Lendo o arquivo: {filename}...")
-    try:
-        df = pd.read_csv(filename)
-        # Verifica se as colunas necessárias existem no arquivo
-        if 'timestamp' in df.columns and 'close' in df.columns:
-            df_list.append(df)
-        else:
-            print(f"  Aviso: O arquivo '{filename}' não contém as colunas 'timestamp' e 'close' e será ignorado.")
-    except Exception as e:
-        print(f"  Erro ao ler o arquivo '{filename}': {e}")
+    print(f"Encontrados {len(all_files)} arquivos para importar:")
+    print(all_files)
 
+    # Cada ano é lido em paralelo, já tipado (int64/float32) e só com as colunas usadas
+    partes = []
+    with ProcessPoolExecutor(max_workers=processos) as executor:
+        futuros = {filename: executor.submit(ler_csv, filename) for filename in all_files}
+        for filename, futuro in futuros.items():
+            try:
+                timestamps, valores = futuro.result()
+            except Exception as e:
+                print(f"  Erro ao ler o arquivo '{filename}' (ignorado): {e}")
+                continue
+            print(f"  {filename}: {len(timestamps)} candles.")
+            partes.append((timestamps, valores))
 
-# --- 3. Combinar e Processar os Dados ---
-if not df_list:
-    print("\nNenhum dado válido foi carregado. Saindo do script.")
-else:
-    # Combina todos os DataFrames da lista em um só
-    combined_df = pd.concat(df_list, ignore_index=True)
-    print(f"\nTotal de {len(combined_df)} linhas combinadas.")
+    # --- 3. Mesclar e Indexar as Lacunas ---
+    # Os anos já vêm ordenados: a mesclagem intercala só os trechos sobrepostos (sem ordenação global)
+    # As lacunas são anotadas durante a mesclagem, bloco a bloco (sem outra passada pela série inteira)
+    timestamps, valores, lacunas = mesclar_ordenados(partes, duracao_timeframe_ms(armazem.timeframe))
+    del partes
+    if len(timestamps) == 0:
+        print("Nenhum candle para importar.")
+        exit()
 
-    # Mantém apenas as colunas de interesse
-    processed_df = combined_df[['timestamp', 'close']].copy()
+    # O índice em lacunas.json é mantido pelo próprio armazém a cada escrita; aqui é só o resumo dos CSVs
+    faltantes = sum(lacuna['candles'] for lacuna in lacunas)
+    print(f"\n{len(timestamps)} candles mesclados; {len(lacunas)} lacunas ({faltantes} minutos sem dados).")
+    for lacuna in sorted(lacunas, key=lambda l: l['candles'], reverse=True)[:5]:
+        inicio = pd.to_datetime(lacuna['inicio'], unit='ms')
+        print(f" - {inicio}: {lacuna['candles']} minutos")
 
-    # Garante que a coluna 'timestamp' está no formato de data correto
-    processed_df['timestamp'] = pd.to_datetime(processed_df['timestamp'])
+    # --- 4. Importar para o Armazém ---
+    # Candles que já estão no armazém são ignorados, então o script pode ser rodado novamente.
+    total_novos = 0
+    for inicio in range(0, len(timestamps), tamanho_lote):
+        fim = inicio + tamanho_lote
+        total_novos += armazem.adicionar(np.column_stack([timestamps[inicio:fim], valores[inicio:fim]]))
 
-    # ** PASSO CRUCIAL: Ordena os valores pela data/hora **
-    # Sem isso, o cálculo do 'delta' estaria incorreto.
-    processed_df.sort_values(by='timestamp', inplace=True)
-    
-    # Remove duplicatas, mantendo a primeira ocorrência
-    processed_df.drop_duplicates(subset='timestamp', keep='first', inplace=True)
-
-    # --- 4. Calcular a Coluna 'delta' ---
-    # A função .shift(1) pega o valor da linha anterior
-    previous_close = processed_df['close'].shift(1)
-    
-    # Fórmula: (valor_atual - valor_anterior) / valor_anterior
-    processed_df['delta'] = (processed_df['close'] - previous_close) / previous_close
-    
-    # O primeiro valor da coluna 'delta' será NaN (Not a Number), pois não há linha anterior.
-    # Isso é esperado e correto. Podemos preencher com 0 se desejado.
-    processed_df['delta'].fillna(0, inplace=True)
-    
-    print("\nColuna 'delta' calculada com sucesso.")
-
-    # --- 5. Salvar o Resultado ---
-    processed_df.to_csv(output_filename, index=False)
-
-    print(f"\nArquivo final '{output_filename}' criado com {len(processed_df)} linhas.")
-    print("Processo concluído!")
\ No newline at end of file
+    # --- 5. Resumo ---
+    print(f"\nImportação concluída: {total_novos} candles novos.")
+    print(f"O armazém '{armazem.diretorio}' tem agora {len(armazem)} candles.")
+    print("Processo concluído!")
@@ -1,75 +1,133 @@
-import ccxt
-import pandas as pd
+import json
+import os
+import random
 import time
 
-# --- Parte 1: Configuração e Coleta de Dados para 2017 ---
-hora_inicial = 'T00:00:00Z'
-hora_final = 'T23:59:59Z'
-
-anos =[2017, 2018, 2019, 2020, 2021, 2022, 2023, 2024, 2025]
-meses= {'Janeiro':1, 'Fevereiro':2, 'Março':3, 'Abril':4, 'Maio':5, 'Junho':6,
-        'Julho':7, 'Agosto':8, 'Setembro':9, 'Outubro':10, 'Novembro':11, 'Dezembro':12}
-dias = {'Janeiro':31, 'Fevereiro':28, 'Março':31, 'Abril':30, 'Maio':31, 'Junho':30,
-        'Julho':31, 'Agosto':31, 'Setembro':30, 'Outubro':31, 'Novembro':30, 'Dezembro':31} 
-
+import pandas as pd
+from armazem_candles import ArmazemCandles, duracao_timeframe_ms
 
-# Instancia a corretora
-exchange = ccxt.binance()
+# --- Parte 1: Configuração ---
 # Define o símbolo e o timeframe
 symbol = 'ETH/USDT'
 timeframe = '1m'
 limit = 1000 # Limite de dados por requisição da API
 
-# Define a data de início (1 de janeiro de 2017)
-# Define a data de término (hoje)
-for ano in anos:
-    # for mes in meses.keys():
-        # since = exchange.parse8601('2025-08-01T00:00:00Z')
-        since = exchange.parse8601(f'{ano}-{meses["Janeiro"]:02d}-01{hora_inicial}')
-        until = exchange.parse8601(f'{ano}-{meses['Dezembro']:02d}-31{hora_final}')
-        print(since, until)
-        all_ohlcv = []
-        print(f"Iniciando a coleta de dados da Binance para o ano de {ano}.")
-        while since < until:
-            try:
-                # Busca os dados a partir do 'since'
-                ohlcv = exchange.fetch_ohlcv(symbol, timeframe, since, limit)
-
-                # Se a API não retornar mais dados, o loop para
-                if not ohlcv:
-                    break
-
-                # Filtra os dados para garantir que não ultrapassem a data final
-                ohlcv_filtered = [candle for candle in ohlcv if candle[0] <= until]
-                all_ohlcv.extend(ohlcv_filtered)
-
-                # Atualiza o 'since' para a próxima requisição
-                since = ohlcv[-1][0] + 1
-
-                # Imprime o progresso
-                last_date = pd.to_datetime(ohlcv_filtered[-1][0], unit='ms')
-                print(f"Buscando... {len(all_ohlcv)} candles coletados. Última data: {last_date}")
-
-            except Exception as e:
-                print(f"Ocorreu um erro: {e}. O script vai pausar por 10 segundos e tentar novamente.")
-                time.sleep(10)
-
-        print(f"\nColeta de dados de {ano} finalizada!")
-
-        # Converte para DataFrame do Pandas, se dados foram coletados
-        if all_ohlcv:
-            df = pd.DataFrame(all_ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-
-            # --- Parte 2: Salvando o DataFrame em Disco ---
-
-            # Define o nome do arquivo para refletir o conteúdo
-            filename = 'eth_usdt_1m_data_'+str(ano)+'.csv'
-
-            # Salva o DataFrame no arquivo CSV
-            print(f"\nSalvando os dados no arquivo '{filename}'...")
-            df.to_csv(filename, index=False)
-
-            print(f"DataFrame com {len(df)} linhas salvo com sucesso!")
+# Data de início usada apenas quando o armazém ainda está vazio (1 de janeiro de 2017)
+data_inicial = '2017-01-01T00:00:00Z'
+
+# Arquivo de checkpoint (fica na pasta do par/timeframe dentro do armazém)
+ARQUIVO_CHECKPOINT = 'checkpoint_sync.json'
+
+# Quando a corretora retorna um erro: espera exponencial (com um pouco de aleatoriedade) a partir de
+# pausa_erro, até espera_maxima; depois de `tentativas` falhas seguidas o erro é repassado
+pausa_erro = 10
+espera_maxima = 300
+tentativas = 6
+
+# --- Parte 2: Checkpoint ---
+# Guarda o próximo 'since' depois de cada página gravada, para que um reinício continue
+# exatamente de onde parou (mesmo quando a corretora devolve páginas vazias ou com buracos).
+def ler_checkpoint(armazem):
+    caminho = os.path.join(armazem.diretorio, ARQUIVO_CHECKPOINT)
+    if not os.path.exists(caminho):
+        return None
+    with open(caminho) as f:
+        return json.load(f)['since']
+
+
+def salvar_checkpoint(armazem, since):
+    caminho = os.path.join(armazem.diretorio, ARQUIVO_CHECKPOINT)
+    with open(caminho + '.tmp', 'w') as f:
+        json.dump({'symbol': armazem.symbol, 'timeframe': armazem.timeframe, 'since': int(since)}, f)
+    os.replace(caminho + '.tmp', caminho)
+
+
+def ponto_de_partida(armazem, since_padrao):
+    """Próximo timestamp a buscar: o checkpoint, o candle seguinte ao último armazenado ou o padrão."""
+    candidatos = [since_padrao]
+    checkpoint = ler_checkpoint(armazem)
+    if checkpoint is not None:
+        candidatos.append(checkpoint)
+    ultimo = armazem.ultimo_timestamp()
+    if ultimo is not None:
+        candidatos.append(ultimo + duracao_timeframe_ms(armazem.timeframe))
+    return max(candidatos)
+
+
+# --- Parte 3: Sincronização Incremental ---
+# Busca apenas os candles mais novos que o armazém e grava cada página assim que ela chega.
+# Para encher um armazém vazio (anos de histórico) use ../preencher_historico.py, que busca várias
+# páginas em paralelo; este script continua de onde ele parou.
+# 'exchange' pode ser qualquer objeto com fetch_ohlcv(symbol, timeframe, since, limit) e
+# milliseconds(), o que permite testar contra uma corretora falsa com páginas prontas.
+def sincronizar(exchange, armazem, since_padrao, until=None, limit=limit, pausa_erro=pausa_erro,
+                espera_maxima=espera_maxima, tentativas=tentativas):
+    """Sincroniza o armazém até `until` (ms, padrão: agora). Retorna quantos candles novos foram gravados.
+
+    Após `tentativas` erros seguidos da corretora, repassa o último; rodar de novo continua do checkpoint.
+    """
+    duracao = duracao_timeframe_ms(armazem.timeframe)
+    since = ponto_de_partida(armazem, since_padrao)
+    total_novos = 0
+    requisicoes = 0
+    falhas = 0
+
+    while True:
+        # Só candles já fechados entram no armazém; o candle em formação é buscado na próxima execução
+        fim = exchange.milliseconds() - duracao
+        if until is not None:
+            fim = min(fim, until)
+        if since > fim:
+            break
+
+        try:
+            # Busca os dados a partir do 'since'
+            ohlcv = exchange.fetch_ohlcv(armazem.symbol, armazem.timeframe, since, limit)
+            requisicoes += 1
+        except Exception as e:
+            falhas += 1
+            if falhas >= tentativas:
+                print(f"Ocorreu um erro: {e}. Desistindo após {falhas} tentativas seguidas.")
+                raise
+            espera = min(espera_maxima, pausa_erro * 2 ** (falhas - 1)) * random.uniform(0.5, 1.0)
+            print(f"Ocorreu um erro: {e}. O script vai pausar por {espera:.0f} segundos e tentar novamente.")
+            time.sleep(espera)
+            continue
+        falhas = 0
+
+        # Se a API não retornar mais dados, o loop para
+        if not ohlcv:
+            break
+
+        # Filtra os candles fora do intervalo; os repetidos (páginas sobrepostas) são descartados pelo armazém
+        ohlcv_filtered = [candle for candle in ohlcv if since <= candle[0] <= fim]
+        if ohlcv_filtered:
+            novos = armazem.adicionar(ohlcv_filtered)
+            total_novos += novos
+            since = ohlcv_filtered[-1][0] + duracao
+            last_date = pd.to_datetime(ohlcv_filtered[-1][0], unit='ms')
+            print(f"Buscando... {novos} candles novos gravados ({total_novos} no total). Última data: {last_date}")
         else:
-            print("Nenhum dado foi coletado para o período especificado.")
\ No newline at end of file
+            # Página só com candles ainda não fechados ou além do 'until': nada mais a buscar
+            break
+
+        salvar_checkpoint(armazem, since)
+
+    print(f"Sincronização concluída: {total_novos} candles novos em {requisicoes} requisições.")
+    return total_novos
+
+
+# --- Parte 4: Execução ---
+if __name__ == '__main__':
+    import ccxt
+
+    # Instancia a corretora
+    exchange = ccxt.binance()
+
+    # Armazém colunar onde os candles são gravados (Data/candles)
+    armazem = ArmazemCandles(symbol, timeframe)
+
+    since = ponto_de_partida(armazem, exchange.parse8601(data_inicial))
+    print(f"Iniciando a coleta de dados da Binance a partir de {pd.to_datetime(since, unit='ms')}.")
+    sincronizar(exchange, armazem, exchange.parse8601(data_inicial))
+    print(f"O armazém '{armazem.diretorio}' tem agora {len(armazem)} candles.")
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+from armazem_candles import indice_lacunas
+
+# --- Leitura Tipada e Mesclagem dos CSVs Anuais ---
+# Usado pelo editData.py. Cada CSV é lido em um processo separado, só com as colunas necessárias
+# (timestamp em int64, preços/volume em float32). Como cada ano já vem ordenado, a mesclagem só
+# precisa intercalar os trechos que se sobrepõem; anos disjuntos são simplesmente concatenados.
+
+COLUNAS_CSV = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+
+
+def ler_csv(caminho):
+    """Lê um CSV anual. Retorna (timestamps int64 em ms, valores float32 (n, 5)), ordenados e sem duplicatas."""
+    df = pd.read_csv(caminho, usecols=COLUNAS_CSV, dtype={coluna: np.float32 for coluna in COLUNAS_CSV[1:]})
+    # Os CSVs antigos guardam o timestamp como texto; o armazém usa milissegundos (int64)
+    timestamps = pd.to_datetime(df['timestamp']).values.astype('datetime64[ms]').view('i8')
+    valores = df[COLUNAS_CSV[1:]].to_numpy(dtype=np.float32)
+    del df
+
+    if len(timestamps) > 1 and not np.all(timestamps[1:] > timestamps[:-1]):
+        # Arquivo fora de ordem ou com linhas repetidas (raro): ordena só este arquivo
+        timestamps, unicos = np.unique(timestamps, return_index=True)
+        valores = valores[unicos]
+    return timestamps, valores
+
+
+def _mesclar_dois(ts_a, valores_a, ts_b, valores_b):
+    # Intercala dois trechos ordenados em tempo linear; em timestamps repetidos fica o de `a`
+    posicoes = np.searchsorted(ts_a, ts_b)
+    repetidos = (posicoes < len(ts_a)) & (ts_a[np.minimum(posicoes, len(ts_a) - 1)] == ts_b)
+    posicoes = posicoes[~repetidos]
+    return (np.insert(ts_a, posicoes, ts_b[~repetidos]),
+            np.insert(valores_a, posicoes, valores_b[~repetidos], axis=0))
+
+
+def mesclar_ordenados(partes, duracao_ms=None):
+    """Mescla trechos (timestamps, valores) já ordenados em uma única série ordenada e sem duplicatas.
+
+    Com `duracao_ms`, devolve também as lacunas da série (como indice_lacunas), anotadas durante a mesclagem.
+    """
+    partes = sorted((parte for parte in partes if len(parte[0])), key=lambda parte: parte[0][0])
+    blocos = []
+    lacunas = []
+
+    def fechar_bloco():
+        # Um bloco não muda mais quando o próximo trecho começa depois dele: as lacunas dele já são finais
+        if duracao_ms is not None and blocos:
+            lacunas.extend(indice_lacunas(blocos[-1][0], duracao_ms))
+
+    for timestamps, valores in partes:
+        if blocos and timestamps[0] <= blocos[-1][0][-1]:
+            # Sobreposição só pode acontecer com o último bloco (os blocos são disjuntos e ordenados)
+            blocos[-1] = _mesclar_dois(*blocos[-1], timestamps, valores)
+        else:
+            fechar_bloco()
+            if duracao_ms is not None and blocos:
+                # A emenda entre o fim do bloco anterior e o início deste
+                lacunas.extend(indice_lacunas(np.array([blocos[-1][0][-1], timestamps[0]]), duracao_ms))
+            blocos.append((timestamps, valores))
+    fechar_bloco()
+
+    if not blocos:
+        serie = np.empty(0, dtype='i8'), np.empty((0, len(COLUNAS_CSV) - 1), dtype=np.float32)
+    else:
+        serie = np.concatenate([b[0] for b in blocos]), np.concatenate([b[1] for b in blocos])
+    return serie if duracao_ms is None else (*serie, lacunas)
@@ -0,0 +1,166 @@
+import glob
+import hashlib
+import json
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from armazem_candles import (ARQUIVO_MANIFESTO, DIRETORIO_PREPROCESSADO, ArmazemCandles, duracao_timeframe_ms,
+                             impressao_armazem, indice_lacunas, indices_sem_lacunas, ler_manifesto,
+                             preprocessado_atualizado, salvar_divisao)
+from mesclagem import ler_csv, mesclar_ordenados
+
+# --- Pipeline Único: CSVs Anuais -> Armazém -> Delta -> Divisão 80/10/10 -> Normalizador ---
+# Substitui a sequência editData.py -> gerarDadaFrame.py -> (scaler no treinar_modelo.py) por uma
+# única passada em memória. Os CSVs são importados no armazém e a série vem do armazém, que também
+# recebe os candles novos do getVelueEth.py. A saída é binária (.npy, lida com memmap) e fica em cache
+# pelo hash dos CSVs e da configuração mais o tamanho e o último timestamp do armazém: rodar de novo sem
+# nada novo não faz nada.
+
+# --- 1. Configuração ---
+file_pattern = 'eth_usdt_1m_data_*.csv'
+symbol = 'ETH/USDT'
+timeframe = '1m'
+
+train_split_ratio = 0.8
+validation_split_ratio = 0.1
+# O restante será para teste (0.1 ou 10%)
+
+look_back = 30 # Usado para o índice de janelas sem lacunas (e para as janelas prontas)
+gerar_janelas = False # True: grava também X/y já janelados por conjunto (ocupa look_back vezes mais disco)
+
+processos = None # Processos de leitura dos CSVs (None = um por núcleo)
+tamanho_lote = 500_000 # Candles por bloco de escrita (armazém e janelas prontas)
+
+VERSAO_PIPELINE = 2
+
+
+def hash_entradas(arquivos, configuracao):
+    """SHA-256 do conteúdo dos CSVs e da configuração que afeta a saída."""
+    sha = hashlib.sha256(json.dumps(configuracao, sort_keys=True).encode())
+    for caminho in arquivos:
+        sha.update(os.path.basename(caminho).encode())
+        with open(caminho, 'rb') as f:
+            for bloco in iter(lambda: f.read(1 << 20), b''):
+                sha.update(bloco)
+    return sha.hexdigest()
+
+
+def calcular_delta(close):
+    # Variação percentual sobre o close anterior; o primeiro candle fica com delta 0
+    close = close.astype(np.float64)
+    delta = np.zeros_like(close)
+    delta[1:] = (close[1:] - close[:-1]) / close[:-1]
+    return delta.astype(np.float32)
+
+
+def gravar_janelas(diretorio, nome, serie, indices, look_back):
+    # Copia as janelas em blocos direto para o .npy no disco (a memória fica em um bloco só)
+    janelas = sliding_window_view(serie, look_back)
+    X = np.lib.format.open_memmap(os.path.join(diretorio, f'{nome}_X.npy'), mode='w+', dtype=np.float32,
+                                  shape=(len(indices), look_back, 1))
+    y = np.lib.format.open_memmap(os.path.join(diretorio, f'{nome}_y.npy'), mode='w+', dtype=np.float32,
+                                  shape=(len(indices),))
+    for inicio in range(0, len(indices), tamanho_lote):
+        bloco = indices[inicio:inicio + tamanho_lote]
+        X[inicio:inicio + len(bloco), :, 0] = janelas[bloco]
+        y[inicio:inicio + len(bloco)] = serie[bloco + look_back]
+    X.flush()
+    y.flush()
+
+
+if __name__ == '__main__':
+    arquivos = sorted(glob.glob(file_pattern))
+    print(f"Encontrados {len(arquivos)} arquivos: {arquivos}")
+
+    configuracao = {
+        'versao': VERSAO_PIPELINE, 'symbol': symbol, 'timeframe': timeframe, 'look_back': look_back,
+        'treino': train_split_ratio, 'validacao': validation_split_ratio, 'janelas': gerar_janelas,
+    }
+    assinatura = hash_entradas(arquivos, configuracao)
+    armazem = ArmazemCandles(symbol, timeframe)
+    manifesto = ler_manifesto()
+    csvs_importados = manifesto is not None and manifesto.get('hash') == assinatura
+    if csvs_importados and preprocessado_atualizado(manifesto, armazem):
+        print(f"Entradas inalteradas (hash {assinatura[:12]}); '{DIRETORIO_PREPROCESSADO}' já está atualizado.")
+        exit()
+
+    # --- 2. Leitura Paralela dos CSVs e Importação no Armazém ---
+    # Só quando os CSVs mudaram; candles que o armazém já tem são ignorados
+    if arquivos and not csvs_importados:
+        with ProcessPoolExecutor(max_workers=processos) as executor:
+            partes = list(executor.map(ler_csv, arquivos))
+        timestamps, valores = mesclar_ordenados(partes)
+        del partes
+        novos = 0
+        for inicio in range(0, len(timestamps), tamanho_lote):
+            fim = inicio + tamanho_lote
+            novos += armazem.adicionar(np.column_stack([timestamps[inicio:fim], valores[inicio:fim]]))
+        print(f"{novos} candles novos no armazém '{armazem.diretorio}'.")
+
+    # A série vem do armazém: CSVs + o que o getVelueEth.py / preencher_historico.py gravaram depois
+    dados = armazem.ler_intervalo(colunas=('open', 'high', 'low', 'close', 'volume'))
+    timestamps = dados['timestamp']
+    if len(timestamps) == 0:
+        print(f"Erro: nenhum CSV '{file_pattern}' e o armazém '{armazem.diretorio}' está vazio.")
+        exit()
+    duracao = duracao_timeframe_ms(timeframe)
+    lacunas = indice_lacunas(timestamps, duracao)
+    print(f"{len(timestamps)} candles no armazém; {len(lacunas)} lacunas.")
+
+    # --- 3. Delta, Divisão e Normalizador (na mesma série em memória) ---
+    close = dados['close']
+    delta = calcular_delta(close)
+    train_end_index = int(len(timestamps) * train_split_ratio)
+    validation_end_index = train_end_index + int(len(timestamps) * validation_split_ratio)
+    fatias = {
+        'treino': slice(0, train_end_index),
+        'validacao': slice(train_end_index, validation_end_index),
+        'teste': slice(validation_end_index, len(timestamps)),
+    }
+    # É CRUCIAL ajustar o normalizador APENAS com os dados de treino para evitar vazamento de dados
+    data_min = float(close[fatias['treino']].min())
+    data_max = float(close[fatias['treino']].max())
+    escala = 1.0 / (data_max - data_min) if data_max > data_min else 1.0
+    close_normalizado = ((close.astype(np.float64) - data_min) * escala).astype(np.float32)
+
+    # --- 4. Gravar a Saída (em um diretório temporário, trocado no fim) ---
+    temporario = DIRETORIO_PREPROCESSADO + '.tmp'
+    shutil.rmtree(temporario, ignore_errors=True)
+    os.makedirs(temporario)
+    divisao = {}
+    for nome, fatia in fatias.items():
+        ts = timestamps[fatia]
+        indices = indices_sem_lacunas(ts, look_back, duracao)
+        np.save(os.path.join(temporario, f'{nome}_timestamp.npy'), ts)
+        np.save(os.path.join(temporario, f'{nome}_close.npy'), close_normalizado[fatia])
+        np.save(os.path.join(temporario, f'{nome}_delta.npy'), delta[fatia])
+        np.save(os.path.join(temporario, f'{nome}_indices.npy'), indices)
+        if gerar_janelas:
+            gravar_janelas(temporario, nome, close_normalizado[fatia], indices, look_back)
+        divisao[nome] = {'inicio': int(ts[0]), 'fim': int(ts[-1]), 'linhas': int(len(ts))}
+        print(f" -> '{nome}': {len(ts)} linhas, {len(indices)} janelas sem lacunas, "
+              f"de {pd.to_datetime(ts[0], unit='ms')} até {pd.to_datetime(ts[-1], unit='ms')}.")
+
+    manifesto = {
+        **configuracao,
+        'hash': assinatura,
+        'arquivos': [os.path.basename(caminho) for caminho in arquivos],
+        'armazem': impressao_armazem(armazem),
+        'divisao': divisao,
+        'lacunas': len(lacunas),
+        'normalizador': {'feature_range': [0, 1], 'data_min': [data_min], 'data_max': [data_max]},
+    }
+    with open(os.path.join(temporario, ARQUIVO_MANIFESTO), 'w') as f:
+        json.dump(manifesto, f, indent=2)
+    shutil.rmtree(DIRETORIO_PREPROCESSADO, ignore_errors=True)
+    os.replace(temporario, DIRETORIO_PREPROCESSADO)
+
+    # --- 5. Divisão no Armazém (para a inferência e o backtest; o índice de lacunas o armazém já mantém) ---
+    salvar_divisao(divisao, armazem)
+
+    print(f"\nPré-processamento salvo em '{DIRETORIO_PREPROCESSADO}'.")
@@ -1,14 +1,16 @@
 import pandas as pd
-
-# Nome do seu arquivo CSV
-filename = 'ethereum_close_and_delta.csv'
+from armazem_candles import ArmazemCandles
 
 try:
-    # Lê o arquivo CSV para um DataFrame
-    df = pd.read_csv(filename)
+    # Abre o armazém colunar (Data/candles) e lê só o último candle
+    armazem = ArmazemCandles('ETH/USDT', '1m')
+    ultimo = armazem.ultimos(1, colunas=('close', 'delta'))
+
+    if len(ultimo['timestamp']) == 0:
+        raise FileNotFoundError(armazem.diretorio)
 
-    # Usa o método .tail(1) para pegar a última linha
-    ultima_linha_df = df.tail(1)
+    ultima_linha_df = pd.DataFrame({coluna: valores for coluna, valores in ultimo.items()})
+    ultima_linha_df['timestamp'] = pd.to_datetime(ultima_linha_df['timestamp'], unit='ms')
 
     print("--- Última linha como DataFrame do Pandas ---")
     print(ultima_linha_df)
@@ -23,6 +25,6 @@ try:
     print(f"\nValor de fechamento da última linha: {ultimo_close}")
 
 except FileNotFoundError:
-    print(f"Erro: O arquivo '{filename}' não foi encontrado.")
+    print(f"Erro: O armazém '{armazem.diretorio}' está vazio.")
 except Exception as e:
-    print(f"Ocorreu um erro: {e}")
\ No newline at end of file
+    print(f"Ocorreu um erro: {e}")
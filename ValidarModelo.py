@@ -1,65 +1,60 @@
-import pandas as pd
+import os
 import numpy as np
-from sklearn.preprocessing import MinMaxScaler
-from tensorflow.keras.models import load_model
 import matplotlib.pyplot as plt
 from sklearn.metrics import mean_squared_error
+from sequencias import SequenciaJanelas
+from Data.armazem_candles import carregar_conjunto
+from normalizador import ArtefatoIncompativel
+from registro_modelos import arquivo_atual, carregar_atual
 
 # --- 1. Configurações ---
-# Nomes dos arquivos
-TRAIN_FILE = 'Data/dados_treino.csv'
-VALIDATION_FILE = 'Data/dados_validacao.csv'
-TEST_FILE = 'Data/dados_teste.csv'
+# Nomes dos arquivos (os dados vêm do armazém em Data/candles, dividido pelo gerarDadaFrame.py)
 MODEL_FILE = 'modelo_ethereum.h5'
 
-# O LOOK_BACK deve ser o MESMO usado no treinamento
-LOOK_BACK = 30
+# O LOOK_BACK usado no treinamento vem do artefato do normalizador gravado junto com o modelo
 
 # --- 2. Carregar o Modelo e os Dados ---
+# Com o registro de modelos, valida a versão ativa dele; sem registro, o MODEL_FILE solto
 print("Carregando o modelo treinado...")
+versao, arquivo_modelo = arquivo_atual(MODEL_FILE)
+if not os.path.exists(arquivo_modelo):
+    print(f"Erro: O arquivo do modelo '{arquivo_modelo}' não foi encontrado. Execute o script de treinamento primeiro.")
+    exit()
 try:
-    model = load_model(MODEL_FILE)
-except IOError:
-    print(f"Erro: O arquivo do modelo '{MODEL_FILE}' não foi encontrado. Execute o script de treinamento primeiro.")
+    versao, model, scaler = carregar_atual(MODEL_FILE, usar_tensorflow=True)
+except (FileNotFoundError, ArtefatoIncompativel) as e:
+    print(f"Erro: {e}")
     exit()
 
-print("Carregando dados de teste e treino...")
+LOOK_BACK = scaler.look_back
+
+print("Carregando dados de teste...")
 try:
-    df_test = pd.read_csv(TEST_FILE)
-    df_train = pd.read_csv(TRAIN_FILE)
+    teste = carregar_conjunto('teste')
+    test_close = teste['close']
 except FileNotFoundError as e:
     print(f"Erro: Arquivo de dados não encontrado. Detalhes: {e}")
     exit()
 
 # --- 3. Preparar os Dados de Teste ---
 # Pega a coluna 'close' dos dados de teste
-test_data = df_test['close'].values.reshape(-1, 1)
+test_data = test_close.reshape(-1, 1)
 
 # **PASSO CRUCIAL:** Usamos o scaler ajustado (fitted) nos dados de TREINO para transformar os dados de TESTE.
 # Isso simula o cenário real onde não conhecemos o futuro (os dados de teste).
-scaler = MinMaxScaler(feature_range=(0, 1))
-# Ajusta o scaler com os dados de treino
-scaler.fit(df_train['close'].values.reshape(-1, 1)) 
+# Os parâmetros desse scaler foram gravados pelo treinar_modelo.py no artefato do normalizador.
 # Transforma os dados de teste
 scaled_test_data = scaler.transform(test_data)
 
-# Função para criar as sequências (a mesma do script de treino)
-def create_sequences(data, look_back=LOOK_BACK):
-    X, y = [], []
-    for i in range(len(data) - look_back):
-        X.append(data[i:(i + look_back), 0])
-        y.append(data[i + look_back, 0])
-    return np.array(X), np.array(y)
-
 print("Criando sequências de teste...")
-X_test, y_test = create_sequences(scaled_test_data)
-
-# Remodelar os dados para o formato esperado pelo LSTM [amostras, timesteps, features]
-X_test = np.reshape(X_test, (X_test.shape[0], X_test.shape[1], 1))
+# Janelas no formato esperado pelo LSTM [amostras, timesteps, features], servidas em lotes
+# As janelas que atravessam lacunas nos dados (paradas da corretora) são puladas
+test_sequences = SequenciaJanelas(scaled_test_data, LOOK_BACK, batch_size=1024, timestamps=teste['timestamp'])
+y_test = test_sequences.y[test_sequences.indices]
 
 # --- 4. Fazer as Previsões ---
 print("Realizando previsões com os dados de teste...")
-predicted_prices_scaled = model.predict(X_test)
+predicted_prices_scaled = model.predict(test_sequences)
 
 # --- 5. Reverter a Normalização ---
 # Agora, transformamos os preços previstos (e os reais) de volta para a escala original (dólares)
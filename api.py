@@ -0,0 +1,126 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import List
+
+import numpy as np
+from fastapi import FastAPI, HTTPException
+from pydantic import BaseModel
+
+from micro_lote import MicroLote
+from previsao_multipasso import PrevisorMultipasso
+from registro_modelos import RegistroModelos, RecarregadorModelo, carregar_atual
+
+# --- 1. Configurações ---
+MODEL_FILE = 'modelo_ethereum.h5' # Usado só enquanto nenhuma versão foi publicada no registro (registro_modelos.py)
+SEGUNDOS_ENTRE_VERIFICACOES = 10 # Frequência com que o ponteiro da versão atual é conferido
+
+# Micro-lotes: no máximo MAX_LOTE pedidos por forward pass, esperando até MAX_ESPERA_MS
+# pelo lote encher. A latência p99 fica limitada por essa janela mais um forward pass.
+MAX_LOTE = 64
+MAX_ESPERA_MS = 5
+HORIZONTE_MAXIMO = 60 # Máximo de minutos à frente aceito por pedido
+
+
+# --- 2. Modelos dos Pedidos e Respostas ---
+class PedidoPrevisao(BaseModel):
+    closes: List[float] # Closes mais recentes, do mais antigo ao mais novo (pelo menos LOOK_BACK valores)
+
+
+class RespostaPrevisao(BaseModel):
+    previsoes: List[float] # Preços previstos para t+1, t+2, ...
+
+
+# --- 3. Ciclo de Vida: o modelo e o scaler são carregados uma única vez ---
+# Versões novas publicadas no registro são carregadas e aquecidas em uma thread (RecarregadorModelo)
+# e entram no lugar da atual sem reiniciar a API: o par (scaler, micro-lote) é trocado de uma vez.
+estado = {}
+
+
+def preparar_previsor(model, scaler):
+    previsor = PrevisorMultipasso(model, scaler.look_back)
+
+    # Aquecimento: faz o trace do tf.function antes do primeiro pedido real
+    previsor.prever(np.zeros((MAX_LOTE, scaler.look_back), dtype=np.float32), 1)
+    return previsor
+
+
+def iniciar_lote(previsor):
+    lote = MicroLote(previsor, max_lote=MAX_LOTE, max_espera_ms=MAX_ESPERA_MS)
+    lote.iniciar()
+    return lote
+
+
+async def acompanhar_versoes(recarregador):
+    while True:
+        await asyncio.sleep(1)
+        nova = recarregador.trocar()
+        if nova is None:
+            continue
+        versao, model, scaler = nova
+        # O aquecimento com o lote cheio roda fora do event loop: os pedidos continuam com a versão antiga
+        previsor = await asyncio.get_running_loop().run_in_executor(None, preparar_previsor, model, scaler)
+        antigo = estado['lote']
+        estado.update(versao=versao, scaler=scaler, lote=iniciar_lote(previsor))
+        # Pedidos já enfileirados no lote antigo terminam com o modelo antigo antes de ele parar
+        await antigo.parar(drenar=True)
+
+
+@asynccontextmanager
+async def ciclo_de_vida(app):
+    versao, model, scaler = carregar_atual(MODEL_FILE, usar_tensorflow=True)
+    estado.update(versao=versao, scaler=scaler, lote=iniciar_lote(preparar_previsor(model, scaler)))
+
+    recarregador = RecarregadorModelo(RegistroModelos(), versao, usar_tensorflow=True,
+                                      intervalo=SEGUNDOS_ENTRE_VERIFICACOES).iniciar()
+    acompanhamento = asyncio.create_task(acompanhar_versoes(recarregador))
+    yield
+    acompanhamento.cancel()
+    recarregador.parar()
+    await estado['lote'].parar()
+    estado.clear()
+
+
+app = FastAPI(title='Oráculo Cripto', lifespan=ciclo_de_vida)
+
+
+async def prever_precos(closes, minutos):
+    # Lidos juntos: um pedido usa o scaler e o modelo da mesma versão mesmo durante uma troca
+    scaler, lote = estado['scaler'], estado['lote']
+    if len(closes) < scaler.look_back:
+        raise HTTPException(status_code=422, detail=f"São necessários pelo menos {scaler.look_back} closes.")
+    if not 1 <= minutos <= HORIZONTE_MAXIMO:
+        raise HTTPException(status_code=422, detail=f"O horizonte deve estar entre 1 e {HORIZONTE_MAXIMO} minutos.")
+
+    janela = scaler.transform(np.asarray(closes[-scaler.look_back:]).reshape(-1, 1)).ravel()
+    previsoes_scaled = await lote.prever(janela, minutos)
+    return scaler.inverse_transform(previsoes_scaled.reshape(-1, 1)).ravel().tolist()
+
+
+# --- 4. Endpoints ---
+@app.post('/previsao', response_model=RespostaPrevisao)
+async def previsao_proximo_minuto(pedido: PedidoPrevisao):
+    """Previsão do close do próximo minuto."""
+    return RespostaPrevisao(previsoes=await prever_precos(pedido.closes, 1))
+
+
+@app.post('/previsao/{minutos}', response_model=RespostaPrevisao)
+async def previsao_n_minutos(minutos: int, pedido: PedidoPrevisao):
+    """Previsão autorregressiva dos próximos `minutos` closes."""
+    return RespostaPrevisao(previsoes=await prever_precos(pedido.closes, minutos))
+
+
+@app.get('/saude')
+async def saude():
+    lote = estado.get('lote')
+    return {
+        'status': 'ok' if lote else 'carregando',
+        'versao': estado.get('versao'),
+        'lotes': lote.lotes if lote else 0,
+        'pedidos': lote.pedidos if lote else 0,
+    }
+
+
+if __name__ == '__main__':
+    import uvicorn
+
+    uvicorn.run(app, host='0.0.0.0', port=8000)
@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+# --- 1. Configurações ---
+MODEL_FILE = 'modelo_ethereum.h5'
+HORIZONTE = 10         # Avalia as previsões de t+1 até t+HORIZONTE
+PASSO = 1              # Começa uma previsão a cada PASSO minutos do conjunto de teste
+TAMANHO_BLOCO = 8192   # Quantos pontos de partida entram em cada forward pass (limita a memória)
+
+# Arquivos de saída
+SAIDA_HORIZONTE = 'backtest_por_horizonte.csv'
+SAIDA_HORA = 'backtest_por_hora.csv'
+
+
+# --- 2. Motor de Backtest Walk-Forward ---
+# Para cada ponto de partida i, a janela [i - look_back, i) prevê os closes de i até i + horizonte - 1.
+# Os pontos de partida são processados em blocos: cada passo do horizonte é UM forward pass com
+# todas as janelas do bloco, e só os acumuladores das métricas ficam em memória entre os blocos.
+def backtest(previsor, scaler, closes, timestamps, horizonte, passo=1, tamanho_bloco=TAMANHO_BLOCO):
+    """Roda a previsão autorregressiva a partir de cada `passo`-ésima posição de `closes`.
+
+    Retorna (metricas_por_horizonte, metricas_por_hora), dois DataFrames com RMSE, MAE e
+    acerto de direção (se o preço sobe ou desce em relação ao último close conhecido).
+    A hora do dia (UTC) é a do último candle conhecido quando a previsão é feita.
+    """
+    look_back = previsor.look_back
+    closes = np.asarray(closes, dtype=np.float64).reshape(-1)
+    scaled = scaler.transform(closes.reshape(-1, 1)).ravel().astype(np.float32)
+    janelas = sliding_window_view(scaled, look_back)
+    horas = np.asarray(timestamps, dtype=np.int64) // 3_600_000 % 24
+
+    inicios = np.arange(look_back, len(closes) - horizonte + 1, passo)
+    offsets = np.arange(horizonte)
+
+    # Acumuladores [horizonte] e [hora, horizonte]
+    soma_quad = np.zeros(horizonte)
+    soma_abs = np.zeros(horizonte)
+    acertos = np.zeros(horizonte)
+    soma_quad_hora = np.zeros((24, horizonte))
+    soma_abs_hora = np.zeros((24, horizonte))
+    acertos_hora = np.zeros((24, horizonte))
+    contagem_hora = np.zeros(24)
+
+    for bloco in range(0, len(inicios), tamanho_bloco):
+        i = inicios[bloco:bloco + tamanho_bloco]
+        previsto_scaled = previsor.prever(janelas[i - look_back], horizonte)
+        previsto = scaler.inverse_transform(previsto_scaled.reshape(-1, 1)).reshape(previsto_scaled.shape)
+        real = closes[i[:, None] + offsets]
+        ultimo_conhecido = closes[i - 1][:, None]
+
+        erro = previsto - real
+        acerto = np.sign(previsto - ultimo_conhecido) == np.sign(real - ultimo_conhecido)
+
+        soma_quad += (erro ** 2).sum(axis=0)
+        soma_abs += np.abs(erro).sum(axis=0)
+        acertos += acerto.sum(axis=0)
+
+        hora = horas[i - 1]
+        np.add.at(soma_quad_hora, hora, erro ** 2)
+        np.add.at(soma_abs_hora, hora, np.abs(erro))
+        np.add.at(acertos_hora, hora, acerto)
+        contagem_hora += np.bincount(hora, minlength=24)
+
+    n = len(inicios)
+    por_horizonte = pd.DataFrame({
+        'horizonte': offsets + 1,
+        'rmse': np.sqrt(soma_quad / max(n, 1)),
+        'mae': soma_abs / max(n, 1),
+        'acerto_direcao': acertos / max(n, 1),
+        'amostras': n,
+    })
+
+    contagem = np.maximum(contagem_hora, 1)[:, None]
+    por_hora = pd.DataFrame({
+        'hora': np.repeat(np.arange(24), horizonte),
+        'horizonte': np.tile(offsets + 1, 24),
+        'rmse': np.sqrt(soma_quad_hora / contagem).ravel(),
+        'mae': (soma_abs_hora / contagem).ravel(),
+        'acerto_direcao': (acertos_hora / contagem).ravel(),
+        'amostras': np.repeat(contagem_hora, horizonte).astype(np.int64),
+    })
+    return por_horizonte, por_hora
+
+
+# --- 3. Execução sobre o Conjunto de Teste ---
+if __name__ == '__main__':
+    from previsao_multipasso import PrevisorMultipasso
+    from registro_modelos import carregar_atual
+    from Data.armazem_candles import carregar_conjunto
+
+    print("Carregando o modelo treinado...")
+    try:
+        versao, model, scaler = carregar_atual(MODEL_FILE, usar_tensorflow=True)
+        teste = carregar_conjunto('teste')
+    except Exception as e:
+        print(f"Erro ao carregar arquivos: {e}")
+        exit()
+
+    previsor = PrevisorMultipasso(model, scaler.look_back)
+    print(f"Rodando o backtest de t+1 até t+{HORIZONTE} sobre {len(teste['close'])} minutos de teste...")
+    por_horizonte, por_hora = backtest(previsor, scaler, teste['close'], teste['timestamp'], HORIZONTE, PASSO)
+
+    print("\n" + "="*60)
+    print("       Métricas por Horizonte")
+    print("="*60)
+    print(por_horizonte.to_string(index=False))
+    print("="*60)
+
+    por_horizonte.to_csv(SAIDA_HORIZONTE, index=False)
+    por_hora.to_csv(SAIDA_HORA, index=False)
+    print(f"\nResultados salvos em '{SAIDA_HORIZONTE}' e '{SAIDA_HORA}'.")
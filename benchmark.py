@@ -0,0 +1,289 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+
+from dados_sinteticos import gerar_armazem, gerar_candles, gerar_csvs_anuais, minutos_no_ano
+from normalizador import Normalizador
+from sequencias import create_sequences
+
+# --- 1. Configurações ---
+MODEL_FILE = 'modelo_ethereum.h5'
+LOOK_BACK = 30
+HORIZONTE = 10
+SAIDA_PADRAO = 'resultados_benchmark.json'
+
+DIRETORIO_RAIZ = os.path.dirname(os.path.abspath(__file__))
+
+
+# --- 2. Medições ---
+def medir(funcao, repeticoes=3):
+    """Tempo (melhor de `repeticoes`) e pico de memória alocada (tracemalloc) de uma chamada."""
+    tempos = []
+    pico = 0
+    for _ in range(repeticoes):
+        tracemalloc.start()
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+        pico = max(pico, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return {'segundos': min(tempos), 'pico_mb': pico / 2**20}
+
+
+def medir_latencias(funcao, repeticoes=200, aquecimento=5):
+    """Latência por chamada em ms (p50, p99) depois de algumas chamadas de aquecimento."""
+    for _ in range(aquecimento):
+        funcao()
+    latencias = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        latencias.append((time.perf_counter() - inicio) * 1000)
+    return {'p50_ms': float(np.percentile(latencias, 50)), 'p99_ms': float(np.percentile(latencias, 99))}
+
+
+# Roda um script a partir de um processo intermediário pequeno e mede o tempo e o pico de RSS do script
+# e de todos os processos que ele criar (o pool do editData.py, por exemplo). O intermediário é preciso
+# porque no Linux o ru_maxrss de um processo herda o do pai no fork: medido direto daqui, ele mostraria
+# o pico deste benchmark. Com /proc, a soma do RSS da árvore é amostrada a cada 20 ms; sem /proc, vale
+# o RUSAGE_CHILDREN (o maior processo da árvore, não a soma).
+CODIGO_EXECUTOR = """
+import json, os, resource, subprocess, sys, time
+
+def rss_arvore(raiz):
+    filhos, rss = {}, {}
+    for pid in filter(str.isdigit, os.listdir('/proc')):
+        try:
+            with open(f'/proc/{pid}/stat') as f:
+                campos = f.read().rsplit(')', 1)[1].split()
+        except OSError:
+            continue
+        filhos.setdefault(int(campos[1]), []).append(int(pid))
+        rss[int(pid)] = int(campos[21]) * os.sysconf('SC_PAGE_SIZE')
+    total, pendentes = 0, [raiz]
+    while pendentes:
+        pid = pendentes.pop()
+        total += rss.get(pid, 0)
+        pendentes += filhos.get(pid, [])
+    return total
+
+amostrar = os.path.isdir('/proc')
+inicio = time.perf_counter()
+processo = subprocess.Popen([sys.executable, sys.argv[1]], stdout=subprocess.DEVNULL)
+pico = 0
+while processo.poll() is None:
+    if amostrar:
+        pico = max(pico, rss_arvore(processo.pid))
+    time.sleep(0.02)
+segundos = time.perf_counter() - inicio
+if processo.returncode:
+    sys.exit(processo.returncode)
+pico_filhos = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * 1024
+print(json.dumps({'segundos': segundos, 'pico_rss_mb': max(pico, pico_filhos) / 2**20}))
+"""
+
+
+def medir_script(script, cwd):
+    saida = subprocess.run([sys.executable, '-c', CODIGO_EXECUTOR, script], cwd=cwd,
+                           capture_output=True, text=True, check=True)
+    return json.loads(saida.stdout.strip().splitlines()[-1])
+
+
+# --- 3. Benchmarks ---
+def bench_dados(anos, simbolos, resultados):
+    """Pipeline de dados: importação dos CSVs (editData.py), divisão (gerarDadaFrame.py) e leituras do armazém."""
+    with tempfile.TemporaryDirectory() as tmp:
+        # Copia os scripts de Data/ para que o armazém criado por eles fique no diretório temporário
+        for nome in ('armazem_candles.py', 'mesclagem.py', 'editData.py', 'gerarDadaFrame.py'):
+            shutil.copy(os.path.join(DIRETORIO_RAIZ, 'Data', nome), tmp)
+        gerar_csvs_anuais(tmp, anos)
+        linhas = sum(minutos_no_ano(ano) for ano in anos)
+
+        resultados.append({'nome': 'editData.py', 'linhas': linhas, **medir_script('editData.py', tmp)})
+        resultados.append({'nome': 'gerarDadaFrame.py', 'linhas': linhas, **medir_script('gerarDadaFrame.py', tmp)})
+
+        armazens = gerar_armazem(os.path.join(tmp, 'multi'), anos, simbolos)
+        for symbol, armazem in armazens.items():
+            resultados.append({'nome': f'armazem.ler_intervalo close ({symbol})', 'linhas': len(armazem),
+                               **medir(lambda: np.asarray(armazem.ler_intervalo(colunas=('close',))['close']).sum())})
+
+
+def create_sequences_antigo(data, look_back=LOOK_BACK):
+    # Versão original (loop Python, copiada do treinar_modelo.py antes das views): referência de desempenho
+    # aqui e de resultado nos testes (tests/test_sequencias.py)
+    X, y = [], []
+    for i in range(len(data) - look_back):
+        X.append(data[i:(i + look_back), 0])
+        y.append(data[i + look_back, 0])
+    X, y = np.array(X), np.array(y)
+    return np.reshape(X, (X.shape[0], X.shape[1], 1)), y
+
+
+def bench_sequencias(amostras, resultados):
+    serie = np.random.default_rng(0).random((amostras, 1))
+    resultados.append({'nome': 'create_sequences (loop antigo)', 'linhas': amostras,
+                       **medir(lambda: create_sequences_antigo(serie), repeticoes=1)})
+    resultados.append({'nome': 'create_sequences (views)', 'linhas': amostras,
+                       **medir(lambda: create_sequences(serie, LOOK_BACK))})
+
+
+class ExchangeFalsa:
+    """Corretora falsa para o ciclo por minuto: serve candles sintéticos e tem relógio manual."""
+
+    def __init__(self, candles):
+        self.candles = candles
+        self.timestamps = candles[:, 0].astype(np.int64)
+        self.agora = int(self.timestamps[LOOK_BACK + 5]) + 3_000
+
+    def milliseconds(self):
+        return self.agora
+
+    def fetch_ohlcv(self, symbol, timeframe, since=None, limit=500):
+        fim = int(np.searchsorted(self.timestamps, self.agora, side='right'))
+        inicio = max(0, fim - limit) if since is None else int(np.searchsorted(self.timestamps, since))
+        return self.candles[inicio:min(fim, inicio + limit)].tolist()
+
+
+def bench_modelos(resultados, amostras_treino):
+    from lstm_numpy import carregar_modelo
+    from previsao_multipasso import PrevisorMultipasso
+    from preditor_continuo import PreditorContinuo
+    from fontes_candles import FonteBinance
+
+    janela = np.random.default_rng(1).random((1, LOOK_BACK, 1)).astype(np.float32)
+    lote = np.random.default_rng(2).random((1024, LOOK_BACK, 1)).astype(np.float32)
+
+    modelo_numpy = carregar_modelo(MODEL_FILE)
+    resultados.append({'nome': 'numpy propagar (1 janela)', **medir_latencias(lambda: modelo_numpy.propagar(janela))})
+    resultados.append({'nome': 'numpy propagar (1024 janelas)',
+                       **medir_latencias(lambda: modelo_numpy.propagar(lote), repeticoes=20)})
+    previsor_numpy = PrevisorMultipasso(modelo_numpy, LOOK_BACK)
+    resultados.append({'nome': f'{HORIZONTE} passos autorregressivos (numpy)',
+                       **medir_latencias(lambda: previsor_numpy.prever(janela[0, :, 0], HORIZONTE), repeticoes=50)})
+
+    try:
+        from tensorflow.keras.models import load_model
+        from modelo import construir_modelo
+    except ImportError:
+        resultados.append({'nome': 'tensorflow', 'erro': 'TensorFlow não instalado; benchmarks do Keras ignorados'})
+        model = None
+    else:
+        model = load_model(MODEL_FILE, compile=False)
+        resultados.append({'nome': 'model.predict (1 janela)',
+                           **medir_latencias(lambda: model.predict(janela, verbose=0), repeticoes=50)})
+        resultados.append({'nome': 'model.predict (1024 janelas)',
+                           **medir_latencias(lambda: model.predict(lote, verbose=0), repeticoes=20)})
+
+        def loop_antigo():
+            sequencia = janela[0]
+            for _ in range(HORIZONTE):
+                proximo = model.predict(np.reshape(sequencia, (1, LOOK_BACK, 1)), verbose=0)
+                sequencia = np.append(sequencia[1:], proximo, axis=0)
+
+        resultados.append({'nome': f'{HORIZONTE} passos autorregressivos (model.predict)',
+                           **medir_latencias(loop_antigo, repeticoes=20)})
+        previsor = PrevisorMultipasso(model, LOOK_BACK)
+        resultados.append({'nome': f'{HORIZONTE} passos autorregressivos (tf.function)',
+                           **medir_latencias(lambda: previsor.prever(janela[0, :, 0], HORIZONTE), repeticoes=50)})
+        resultados.append({'nome': f'{HORIZONTE} passos autorregressivos (tf.function, 1000 janelas)',
+                           **medir_latencias(lambda: previsor.prever(lote[:1000, :, 0], HORIZONTE), repeticoes=10)})
+
+        # Uma época de treino sobre uma amostra fixa, com a mesma arquitetura do treinar_modelo.py
+        serie = np.random.default_rng(3).random((amostras_treino + LOOK_BACK, 1)).astype(np.float32)
+        X, y = create_sequences(serie, LOOK_BACK)
+        modelo_treino = construir_modelo(LOOK_BACK)
+        modelo_treino.fit(X[:128], y[:128], epochs=1, batch_size=128, verbose=0) # aquecimento
+        resultados.append({'nome': 'treino 1 época', 'linhas': amostras_treino,
+                           **medir(lambda: modelo_treino.fit(X, y, epochs=1, batch_size=128, verbose=0),
+                                   repeticoes=1)})
+
+    # Ciclo por minuto do loop em tempo real contra uma corretora falsa (sem rede, sem gráfico)
+    candles = gerar_candles(1_700_000_000_000, 10_000)
+    scaler = Normalizador([candles[:, 4].min()], [candles[:, 4].max()], look_back=LOOK_BACK)
+    exchange = ExchangeFalsa(candles)
+    preditor = PreditorContinuo(modelo_numpy, scaler, FonteBinance(exchange=exchange))
+    preditor.inicializar()
+
+    def ciclo():
+        exchange.agora += 60_000
+        preditor.aguardar_proximo_candle()
+        preditor.prever()
+
+    resultados.append({'nome': 'ciclo por minuto (PreditorContinuo, numpy)',
+                       **medir_latencias(ciclo, repeticoes=1000)})
+
+
+# --- 4. Comparação entre Execuções ---
+def comparar(base, novo):
+    with open(base) as f:
+        antes = {r['nome']: r for r in json.load(f)['resultados']}
+    with open(novo) as f:
+        depois = {r['nome']: r for r in json.load(f)['resultados']}
+
+    print(f"{'benchmark':60s} {'métrica':10s} {'antes':>10s} {'depois':>10s} {'razão':>8s}")
+    for nome, resultado in depois.items():
+        if nome not in antes:
+            continue
+        for metrica in ('segundos', 'p50_ms', 'p99_ms', 'pico_mb', 'pico_rss_mb'):
+            if metrica in resultado and metrica in antes[nome]:
+                a, d = antes[nome][metrica], resultado[metrica]
+                razao = d / a if a else float('nan')
+                print(f"{nome[:60]:60s} {metrica:10s} {a:10.3f} {d:10.3f} {razao:8.2f}")
+
+
+def commit_atual():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=DIRETORIO_RAIZ,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmarks dos caminhos críticos de dados e inferência.')
+    parser.add_argument('--anos', type=int, nargs='+', default=[2024], help='anos de candles sintéticos')
+    parser.add_argument('--simbolos', nargs='+', default=['ETH/USDT'], help='símbolos do armazém sintético')
+    parser.add_argument('--amostras-sequencias', type=int, default=500_000)
+    parser.add_argument('--amostras-treino', type=int, default=50_000)
+    parser.add_argument('--saida', default=SAIDA_PADRAO)
+    parser.add_argument('--comparar', nargs=2, metavar=('BASE', 'NOVO'), help='compara dois arquivos de resultados')
+    args = parser.parse_args()
+
+    if args.comparar:
+        comparar(*args.comparar)
+        sys.exit()
+
+    resultados = []
+    print("Benchmark do pipeline de dados...")
+    bench_dados(args.anos, args.simbolos, resultados)
+    print("Benchmark das sequências...")
+    bench_sequencias(args.amostras_sequencias, resultados)
+    print("Benchmark dos modelos e do ciclo em tempo real...")
+    bench_modelos(resultados, args.amostras_treino)
+
+    relatorio = {
+        'commit': commit_atual(),
+        'data': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'maquina': platform.platform(),
+        'argumentos': {k: v for k, v in vars(args).items() if k != 'comparar'},
+        'resultados': resultados,
+    }
+    with open(args.saida, 'w') as f:
+        json.dump(relatorio, f, indent=2)
+
+    for resultado in resultados:
+        metricas = ', '.join(f'{k}={v:.3f}' for k, v in resultado.items() if isinstance(v, float))
+        print(f" - {resultado['nome']}: {metricas or resultado.get('erro', '')}")
+    print(f"\nResultados salvos em '{args.saida}'.")
@@ -0,0 +1,38 @@
+import numpy as np
+
+
+# --- Buffer Circular de Tamanho Fixo ---
+# Guarda os últimos `capacidade` valores (já normalizados) sem realocar memória a cada minuto.
+# Cada valor é escrito duas vezes (posição i e i + capacidade), assim a janela ordenada
+# do mais antigo ao mais novo é sempre uma fatia contígua do array: janela() não copia nada.
+class BufferCircular:
+    def __init__(self, capacidade, dtype=np.float32):
+        self.capacidade = capacidade
+        self._dados = np.zeros(2 * capacidade, dtype=dtype)
+        self._pos = 0
+        self.tamanho = 0
+
+    @property
+    def cheio(self):
+        return self.tamanho == self.capacidade
+
+    def adicionar(self, valor):
+        self._dados[self._pos] = valor
+        self._dados[self._pos + self.capacidade] = valor
+        self._pos = (self._pos + 1) % self.capacidade
+        self.tamanho = min(self.tamanho + 1, self.capacidade)
+
+    def estender(self, valores):
+        valores = np.asarray(valores, dtype=self._dados.dtype).reshape(-1)[-self.capacidade:]
+        for valor in valores:
+            self.adicionar(valor)
+
+    def janela(self):
+        """View somente-leitura com os valores armazenados, do mais antigo ao mais novo."""
+        fim = self._pos + self.capacidade
+        view = self._dados[fim - self.tamanho:fim]
+        view.flags.writeable = False
+        return view
+
+    def ultimo(self):
+        return self._dados[self._pos - 1 + self.capacidade]
@@ -0,0 +1,78 @@
+import json
+import sqlite3
+import time
+
+from normalizador import caminho_artefato, hash_arquivo
+
+# --- Cache de Previsões Compartilhado entre Processos ---
+# SQLite (um arquivo local, sem servidor): vários processos (pessoas, cron) leem e escrevem ao mesmo tempo.
+# A chave é (hash do modelo, hash do normalizador, símbolo, timestamp do último candle fechado, horizonte):
+# o mesmo minuto com o mesmo modelo sempre dá a mesma previsão, então ela só é calculada uma vez.
+# Quando um processo começa a calcular uma chave, ele registra uma "reserva"; os outros esperam
+# o resultado em vez de buscar na Binance e rodar o modelo de novo.
+
+ARQUIVO_CACHE = 'cache_previsoes.sqlite'
+TTL_SEGUNDOS = 180 # A previsão de um minuto só interessa por pouco tempo
+PRAZO_RESERVA_SEGUNDOS = 30 # Se quem reservou morrer, a reserva expira e outro processo calcula
+
+
+def chave_previsao(model_file, symbol, ultimo_timestamp, horizonte):
+    """Chave do cache: muda sozinha quando o modelo ou o normalizador são retreinados."""
+    return '|'.join([
+        hash_arquivo(model_file), hash_arquivo(caminho_artefato(model_file)),
+        symbol, str(int(ultimo_timestamp)), str(int(horizonte)),
+    ])
+
+
+class CachePrevisoes:
+    def __init__(self, caminho=ARQUIVO_CACHE, ttl=TTL_SEGUNDOS):
+        self.ttl = ttl
+        self._conexao = sqlite3.connect(caminho, timeout=10, isolation_level=None)
+        # WAL: leitores não bloqueiam o escritor (e vice-versa)
+        self._conexao.execute('PRAGMA journal_mode=WAL')
+        self._conexao.execute('CREATE TABLE IF NOT EXISTS previsoes (chave TEXT PRIMARY KEY, valor TEXT, expira REAL)')
+        self._conexao.execute('CREATE TABLE IF NOT EXISTS reservas (chave TEXT PRIMARY KEY, expira REAL)')
+
+    def obter(self, chave):
+        linha = self._conexao.execute(
+            'SELECT valor FROM previsoes WHERE chave = ? AND expira > ?', (chave, time.time())
+        ).fetchone()
+        return None if linha is None else json.loads(linha[0])
+
+    def guardar(self, chave, valor):
+        agora = time.time()
+        with self._conexao:
+            self._conexao.execute('DELETE FROM previsoes WHERE expira <= ?', (agora,))
+            self._conexao.execute('INSERT OR REPLACE INTO previsoes VALUES (?, ?, ?)',
+                                  (chave, json.dumps(valor), agora + self.ttl))
+
+    def _reservar(self, chave):
+        agora = time.time()
+        with self._conexao:
+            self._conexao.execute('DELETE FROM reservas WHERE expira <= ?', (agora,))
+            try:
+                self._conexao.execute('INSERT INTO reservas VALUES (?, ?)', (chave, agora + PRAZO_RESERVA_SEGUNDOS))
+                return True
+            except sqlite3.IntegrityError:
+                return False
+
+    def _liberar(self, chave):
+        self._conexao.execute('DELETE FROM reservas WHERE chave = ?', (chave,))
+
+    def obter_ou_calcular(self, chave, calcular, intervalo=0.05):
+        """Devolve (valor, veio_do_cache). Em uma falta, só um processo roda `calcular()`; os outros esperam."""
+        while True:
+            valor = self.obter(chave)
+            if valor is not None:
+                return valor, True
+            if self._reservar(chave):
+                try:
+                    valor = calcular()
+                    self.guardar(chave, valor)
+                    return valor, False
+                finally:
+                    self._liberar(chave)
+            time.sleep(intervalo)
+
+    def fechar(self):
+        self._conexao.close()
@@ -0,0 +1 @@
+# Faz o pytest pôr a raiz do projeto no sys.path: os testes em tests/ importam os módulos daqui
@@ -0,0 +1,64 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from Data.armazem_candles import ArmazemCandles
+
+# --- Gerador de Candles Sintéticos ---
+# Os CSVs em Data/ são ponteiros do Git LFS, então um checkout novo não tem dados para rodar o pipeline.
+# Estes candles de 1 minuto seguem um passeio aleatório geométrico com volume log-normal: não servem
+# para avaliar o modelo, mas têm o tamanho e o formato exatos dos dados reais (para benchmarks).
+def gerar_candles(inicio, minutos, preco_inicial=2000.0, volatilidade=0.0008, seed=0):
+    """Gera `minutos` candles a partir de `inicio` (ms). Retorna um array (n, 6) no formato do ccxt."""
+    rng = np.random.default_rng(seed)
+    timestamps = inicio - inicio % 60_000 + np.arange(minutos, dtype=np.int64) * 60_000
+    retornos = rng.normal(0.0, volatilidade, minutos)
+    close = preco_inicial * np.exp(np.cumsum(retornos))
+    open_ = np.empty_like(close)
+    open_[0] = preco_inicial
+    open_[1:] = close[:-1]
+    amplitude = np.abs(rng.normal(0.0, volatilidade / 2, minutos)) * close
+    high = np.maximum(open_, close) + amplitude
+    low = np.minimum(open_, close) - amplitude
+    volume = rng.lognormal(3.0, 1.0, minutos)
+    return np.column_stack([timestamps, open_, high, low, close, volume])
+
+
+def _inicio_do_ano(ano):
+    return int(pd.Timestamp(f'{ano}-01-01').value // 10**6)
+
+
+def minutos_no_ano(ano):
+    return (_inicio_do_ano(ano + 1) - _inicio_do_ano(ano)) // 60_000
+
+
+def gerar_csvs_anuais(diretorio, anos, symbol='ETH/USDT', seed=0):
+    """Escreve um CSV por ano no mesmo formato do antigo getVelueEth.py (eth_usdt_1m_data_<ano>.csv)."""
+    os.makedirs(diretorio, exist_ok=True)
+    prefixo = symbol.replace('/', '_').lower()
+    arquivos = []
+    preco = 2000.0
+    for i, ano in enumerate(anos):
+        candles = gerar_candles(_inicio_do_ano(ano), minutos_no_ano(ano), preco, seed=seed + i)
+        preco = candles[-1, 4]
+        df = pd.DataFrame(candles, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+        df['timestamp'] = pd.to_datetime(df['timestamp'].astype(np.int64), unit='ms')
+        caminho = os.path.join(diretorio, f'{prefixo}_1m_data_{ano}.csv')
+        df.to_csv(caminho, index=False)
+        arquivos.append(caminho)
+    return arquivos
+
+
+def gerar_armazem(raiz, anos, symbols=('ETH/USDT',), seed=0):
+    """Cria um armazém colunar com `anos` de candles sintéticos para cada símbolo."""
+    armazens = {}
+    for k, symbol in enumerate(symbols):
+        armazem = ArmazemCandles(symbol, '1m', raiz=raiz)
+        preco = 2000.0 / (k + 1)
+        for i, ano in enumerate(anos):
+            candles = gerar_candles(_inicio_do_ano(ano), minutos_no_ano(ano), preco, seed=seed + 1000 * k + i)
+            preco = candles[-1, 4]
+            armazem.adicionar(candles)
+        armazens[symbol] = armazem
+    return armazens
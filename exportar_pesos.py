@@ -0,0 +1,91 @@
+import json
+import os
+
+import h5py
+import numpy as np
+
+from normalizador import hash_arquivo
+
+# --- 1. Configurações ---
+MODEL_FILE = 'modelo_ethereum.h5'
+
+# Tipos de camada que a inferência em NumPy (lstm_numpy.py) sabe executar
+CAMADAS_SUPORTADAS = ('LSTM', 'Dropout', 'Dense')
+
+
+def caminho_pesos(model_file):
+    """'modelo_ethereum.h5' -> 'modelo_ethereum_pesos.npz'"""
+    return os.path.splitext(model_file)[0] + '_pesos.npz'
+
+
+def _texto(valor):
+    return valor.decode() if isinstance(valor, bytes) else str(valor)
+
+
+# --- 2. Leitura do .h5 ---
+# Lê a arquitetura (model_config) e os pesos direto do arquivo com h5py, sem TensorFlow.
+# Funciona com os .h5 gravados pelo Keras 2 e pelo Keras 3 (mesma estrutura de grupos).
+def ler_modelo_h5(model_file):
+    with h5py.File(model_file, 'r') as f:
+        config = json.loads(_texto(f.attrs['model_config']))
+        grupo_pesos = f['model_weights'] if 'model_weights' in f else f
+
+        camadas = []
+        look_back = None
+        for camada in config['config']['layers']:
+            tipo, cfg = camada['class_name'], camada['config']
+            if tipo == 'InputLayer':
+                forma = cfg.get('batch_shape') or cfg.get('batch_input_shape')
+                look_back = forma[1]
+                continue
+            if tipo not in CAMADAS_SUPORTADAS:
+                raise ValueError(f"Camada '{tipo}' não suportada pela inferência em NumPy.")
+            if look_back is None and cfg.get('batch_input_shape'):
+                look_back = cfg['batch_input_shape'][1]
+
+            grupo = grupo_pesos[cfg['name']]
+            nomes = [_texto(nome) for nome in grupo.attrs.get('weight_names', [])]
+            pesos = [np.asarray(grupo[nome], dtype=np.float32) for nome in nomes]
+            camadas.append({
+                'tipo': tipo,
+                'nome': cfg['name'],
+                'activation': cfg.get('activation'),
+                'recurrent_activation': cfg.get('recurrent_activation'),
+                'return_sequences': cfg.get('return_sequences', False),
+                'rate': cfg.get('rate'), # Dropout: usado só na amostragem Monte-Carlo (previsao_multipasso.py)
+                'n_pesos': len(pesos),
+                'pesos': pesos,
+            })
+    return camadas, look_back
+
+
+# --- 3. Exportação ---
+def exportar_pesos(model_file, destino=None):
+    """Grava a arquitetura e os pesos do modelo em um .npz compacto (float32). Retorna o caminho."""
+    camadas, look_back = ler_modelo_h5(model_file)
+    destino = destino or caminho_pesos(model_file)
+    cabecalho = {
+        'modelo_sha256': hash_arquivo(model_file),
+        'look_back': look_back,
+        'camadas': [{k: v for k, v in camada.items() if k != 'pesos'} for camada in camadas],
+    }
+    arrays = {
+        f'{i}_{j}': peso
+        for i, camada in enumerate(camadas)
+        for j, peso in enumerate(camada['pesos'])
+    }
+    # np.savez acrescenta '.npz' se faltar; gravamos num temporário e trocamos de uma vez
+    temporario = destino + '.tmp.npz'
+    np.savez(temporario, cabecalho=np.array(json.dumps(cabecalho)), **arrays)
+    os.replace(temporario, destino)
+    return destino
+
+
+if __name__ == '__main__':
+    print(f"Exportando os pesos de '{MODEL_FILE}'...")
+    try:
+        destino = exportar_pesos(MODEL_FILE)
+    except Exception as e:
+        print(f"Erro ao exportar os pesos: {e}")
+        exit()
+    print(f"Pesos salvos em '{destino}' ({os.path.getsize(destino) / 1024:.0f} KB).")
@@ -0,0 +1,148 @@
+import time
+
+import numpy as np
+
+from Data.armazem_candles import duracao_timeframe_ms
+
+
+# --- Fontes de Candles ---
+# O preditor contínuo não fala direto com a Binance: ele usa uma "fonte" com três operações.
+#   ultimos(n)              -> os n últimos candles JÁ FECHADOS, no formato do ccxt
+#   desde(since)            -> candles fechados com timestamp >= since
+#   esperar_fechamento(ts)  -> bloqueia até o candle que abre em `ts` estar fechado
+# Assim o mesmo código roda contra a Binance ou contra um replay local de dados históricos.
+
+class FonteBinance:
+    """Candles ao vivo via ccxt, reaproveitando um único cliente da corretora."""
+
+    def __init__(self, symbol='ETH/USDT', timeframe='1m', exchange=None, margem_segundos=2):
+        if exchange is None:
+            import ccxt
+            exchange = ccxt.binance()
+        self.exchange = exchange
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.duracao = duracao_timeframe_ms(timeframe)
+        self.margem_segundos = margem_segundos
+
+    def _fechados(self, ohlcv):
+        agora = self.exchange.milliseconds()
+        return [candle for candle in ohlcv if candle[0] + self.duracao <= agora]
+
+    def ultimos(self, n):
+        # Pede um candle a mais, porque o último devolvido pela API normalmente ainda está em formação
+        ohlcv = self.exchange.fetch_ohlcv(self.symbol, self.timeframe, limit=n + 1)
+        return self._fechados(ohlcv)[-n:]
+
+    def desde(self, since):
+        ohlcv = self.exchange.fetch_ohlcv(self.symbol, self.timeframe, since=since, limit=5)
+        return [candle for candle in self._fechados(ohlcv) if candle[0] >= since]
+
+    def esperar_fechamento(self, timestamp):
+        fechamento = (timestamp + self.duracao) / 1000 + self.margem_segundos
+        espera = fechamento - self.exchange.milliseconds() / 1000
+        if espera > 0:
+            time.sleep(espera)
+
+
+class FonteCompartilhada:
+    """Lê os candles da memória compartilhada mantida pelo alimentador (janela_compartilhada.py).
+
+    Sem requisições: vários scripts no mesmo computador dividem uma única busca por minuto. Quando não há
+    alimentador rodando (ou ele parou de dar sinal), cai para uma FonteBinance, criada só nessa hora.
+    """
+
+    def __init__(self, symbol='ETH/USDT', timeframe='1m', margem_segundos=3):
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.duracao = duracao_timeframe_ms(timeframe)
+        self.margem_segundos = margem_segundos # Um pouco mais que a do alimentador
+        self._leitor = None
+        self._direta = None
+
+    def _janela(self):
+        if self._leitor is None:
+            from janela_compartilhada import LeitorJanela
+            try:
+                self._leitor = LeitorJanela(self.symbol, self.timeframe)
+            except FileNotFoundError:
+                return None
+        if not self._leitor.vivo:
+            # Alimentador parado: solta o segmento e procura de novo na próxima chamada
+            self._leitor.fechar()
+            self._leitor = None
+            return None
+        return self._leitor
+
+    @property
+    def compartilhada(self):
+        """True quando os candles vêm do alimentador (False: busca direta na Binance)."""
+        return self._janela() is not None
+
+    def _fonte_direta(self):
+        if self._direta is None:
+            self._direta = FonteBinance(self.symbol, self.timeframe, margem_segundos=self.margem_segundos)
+        return self._direta
+
+    def ultimos(self, n):
+        janela = self._janela()
+        if janela is not None and n < janela.capacidade:
+            return janela.ultimos(n)
+        return self._fonte_direta().ultimos(n)
+
+    def desde(self, since):
+        janela = self._janela()
+        return janela.desde(since) if janela is not None else self._fonte_direta().desde(since)
+
+    def esperar_fechamento(self, timestamp):
+        fechamento = (timestamp + self.duracao) / 1000 + self.margem_segundos
+        espera = fechamento - time.time()
+        if espera > 0:
+            time.sleep(espera)
+
+
+class FonteReplay:
+    """Reproduz candles históricos como se fossem ao vivo, com um relógio simulado.
+
+    `velocidade` é quantas vezes mais rápido que o tempo real o replay anda
+    (None = sem espera nenhuma, o mais rápido possível).
+    """
+
+    def __init__(self, ohlcv, inicio=None, timeframe='1m', velocidade=None):
+        self._dados = np.asarray(ohlcv, dtype=np.float64).reshape(-1, 6)
+        self._timestamps = self._dados[:, 0].astype(np.int64)
+        self.timeframe = timeframe
+        self.duracao = duracao_timeframe_ms(timeframe)
+        self.velocidade = velocidade
+        # O relógio começa logo depois do fechamento do candle de `inicio` (padrão: o primeiro)
+        inicio = int(self._timestamps[0]) if inicio is None else int(inicio)
+        self.agora = inicio + self.duracao
+
+    @classmethod
+    def do_armazem(cls, armazem, t0=None, t1=None, inicio=None, velocidade=None):
+        dados = armazem.ler_intervalo(t0, t1, colunas=('open', 'high', 'low', 'close', 'volume'))
+        ohlcv = np.column_stack([dados[c] for c in ('timestamp', 'open', 'high', 'low', 'close', 'volume')])
+        return cls(ohlcv, inicio=inicio, timeframe=armazem.timeframe, velocidade=velocidade)
+
+    def _ate_agora(self):
+        # Índice do primeiro candle ainda não fechado no relógio simulado
+        return int(np.searchsorted(self._timestamps, self.agora - self.duracao, side='right'))
+
+    def ultimos(self, n):
+        fim = self._ate_agora()
+        return self._dados[max(0, fim - n):fim].tolist()
+
+    def desde(self, since):
+        inicio = int(np.searchsorted(self._timestamps, since, side='left'))
+        return self._dados[inicio:self._ate_agora()].tolist()
+
+    def esperar_fechamento(self, timestamp):
+        fechamento = timestamp + self.duracao
+        if fechamento > self.agora:
+            if self.velocidade:
+                time.sleep((fechamento - self.agora) / 1000 / self.velocidade)
+            self.agora = fechamento
+
+    @property
+    def terminou(self):
+        return self._ate_agora() >= len(self._timestamps)
@@ -0,0 +1,85 @@
+import threading
+import time
+
+from buffer_circular import BufferCircular
+
+MS_POR_DIA = 86_400_000
+
+
+# --- Gráfico ao Vivo Incremental ---
+# As linhas são criadas uma única vez; a cada atualização só os dados delas mudam (set_data)
+# e os limites dos eixos são recalculados. A janela mostrada tem no máximo `pontos` minutos,
+# então o custo de desenhar não cresce com a duração da sessão.
+# `adicionar` é chamado pelo loop de previsão (só copia três números, sob uma trava);
+# `desenhar` roda na thread principal, que é a única que pode mexer na janela do matplotlib.
+class GraficoAoVivo:
+    def __init__(self, pontos=240, titulo='Previsão em Tempo Real', metricas=None):
+        import matplotlib.dates as mdates
+        import matplotlib.pyplot as plt
+
+        self.plt = plt
+        self.metricas = metricas
+        self._trava = threading.Lock()
+        self._x = BufferCircular(pontos, dtype='f8')
+        self._real = BufferCircular(pontos, dtype='f8')
+        self._previsto = BufferCircular(pontos, dtype='f8')
+        self._mudou = False
+        self._titulo = titulo
+
+        plt.ion() # LIGA o modo interativo
+        self.fig, self.ax = plt.subplots(figsize=(15, 8))
+        self.linha_real, = self.ax.plot([], [], 'bo-', label='Preço Real', markersize=5)
+        self.linha_prevista, = self.ax.plot([], [], 'ro-', label='Preço Previsto', alpha=0.7, markersize=5)
+
+        # Formatação (feita uma única vez)
+        self.ax.xaxis_date()
+        self.ax.xaxis.set_major_formatter(mdates.DateFormatter('%H:%M'))
+        self.ax.set_ylabel('Preço (USD)')
+        self.ax.legend(loc='upper left')
+        self.ax.grid(True)
+        self.ax.set_title(titulo)
+        self.fig.autofmt_xdate(rotation=30)
+        self.fig.tight_layout()
+
+    def adicionar(self, timestamp_ms, real, previsto):
+        """Anexa um ponto (chamado pela thread de previsão; não desenha nada)."""
+        with self._trava:
+            # Datas do matplotlib: dias desde 1970-01-01
+            self._x.adicionar(timestamp_ms / MS_POR_DIA)
+            self._real.adicionar(real)
+            self._previsto.adicionar(previsto)
+            self._mudou = True
+
+    def desenhar(self):
+        """Atualiza as linhas se chegou ponto novo. Precisa rodar na thread principal."""
+        with self._trava:
+            if not self._mudou:
+                return False
+            x, real, previsto = self._x.janela().copy(), self._real.janela().copy(), self._previsto.janela().copy()
+            self._mudou = False
+
+        inicio = time.perf_counter()
+        self.linha_real.set_data(x, real)
+        self.linha_prevista.set_data(x, previsto)
+        self.ax.relim()
+        self.ax.autoscale_view()
+        self.ax.set_title(f"{self._titulo} (Última Atualização: {time.strftime('%H:%M:%S')})")
+        self.fig.canvas.draw_idle()
+        self.fig.canvas.flush_events()
+        if self.metricas is not None:
+            self.metricas.observar('renderizacao_segundos', time.perf_counter() - inicio,
+                                   ajuda='Tempo para atualizar o gráfico')
+        return True
+
+    def acompanhar(self, thread, intervalo=0.5):
+        """Mantém a janela responsiva e desenha os pontos novos enquanto `thread` estiver rodando."""
+        while thread.is_alive():
+            self.desenhar()
+            self.plt.pause(intervalo)
+        self.desenhar()
+
+    def finalizar(self, arquivo=None):
+        if arquivo:
+            self.fig.savefig(arquivo)
+        self.plt.ioff() # DESLIGA o modo interativo
+        self.plt.show() # Mostra o gráfico final e bloqueia o script até fechar
@@ -0,0 +1,229 @@
+import os
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from Data.armazem_candles import duracao_timeframe_ms
+
+# --- 1. Configurações do Alimentador ---
+SIMBOLOS = ['ETH/USDT']
+TIMEFRAME = '1m'
+CAPACIDADE = 1000 # Candles guardados por símbolo (a Binance entrega 1000 em uma requisição)
+MARGEM_SEGUNDOS = 2 # Espera depois do fechamento do candle antes de buscar
+SEGUNDOS_SEM_BATIMENTO = 30 # Sem sinal do alimentador por mais tempo que isso, os leitores buscam direto
+
+# --- Janela de Candles em Memória Compartilhada ---
+# Um único processo (o alimentador, ao rodar este arquivo) busca os candles fechados na Binance e os
+# grava em um buffer circular na memória compartilhada, um por símbolo. Os scripts de previsão do mesmo
+# computador leem dali a janela de LOOK_BACK candles, sem requisição nenhuma.
+# Como no BufferCircular, cada candle é escrito duas vezes (posição i e i + capacidade): a janela dos
+# n mais recentes é sempre uma fatia contígua, devolvida como view (sem cópia). A escrita só alcança
+# essa fatia depois de `capacidade - n` candles novos, então a view continua válida por horas.
+# Sincronização sem trava (seqlock): o alimentador soma 1 ao contador `seq` antes de escrever e mais 1
+# depois. O leitor lê seq, monta a view e lê seq de novo; se mudou (ou era ímpar), tenta outra vez.
+MAGICO = 0x45544843414E444C # Identifica o layout do cabeçalho
+CAB_MAGICO, CAB_CAPACIDADE, CAB_SEQ, CAB_TOTAL, CAB_POS, CAB_ULTIMO, CAB_BATIMENTO, CAB_PID = range(8)
+TAMANHO_CABECALHO = 8 * 8
+COLUNAS = 6 # timestamp, open, high, low, close, volume
+
+
+def nome_memoria(symbol, timeframe):
+    """'ETH/USDT', '1m' -> 'eth_oracle_ETHUSDT_1m'"""
+    return f"eth_oracle_{symbol.replace('/', '')}_{timeframe}"
+
+
+def _agora_ms():
+    return int(time.time() * 1000)
+
+
+def _anexar(nome):
+    try:
+        return shared_memory.SharedMemory(name=nome, track=False) # Python 3.13+
+    except TypeError:
+        # Antes do 3.13 o resource_tracker de quem só lê apagaria o segmento ao sair
+        from multiprocessing import resource_tracker
+
+        memoria = shared_memory.SharedMemory(name=nome)
+        resource_tracker.unregister(memoria._name, 'shared_memory')
+        return memoria
+
+
+def _processo_vivo(pid):
+    try:
+        os.kill(pid, 0) # Sinal 0: só confere se o processo existe
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True # Existe, mas é de outro usuário
+    return True
+
+
+class _Janela:
+    def _mapear(self, memoria):
+        self._memoria = memoria
+        self._cab = np.ndarray((8,), dtype=np.int64, buffer=memoria.buf)
+        capacidade = int(self._cab[CAB_CAPACIDADE])
+        self.capacidade = capacidade
+        self._dados = np.ndarray((2 * capacidade, COLUNAS), dtype=np.float64, buffer=memoria.buf,
+                                 offset=TAMANHO_CABECALHO)
+
+    def fechar(self):
+        # As views numpy precisam sumir antes de fechar o mapeamento
+        self._cab = self._dados = None
+        self._memoria.close()
+
+
+class JanelaCompartilhada(_Janela):
+    """Lado do alimentador: cria o segmento e anexa candles fechados."""
+
+    def __init__(self, symbol='ETH/USDT', timeframe='1m', capacidade=CAPACIDADE):
+        nome = nome_memoria(symbol, timeframe)
+        try:
+            memoria = shared_memory.SharedMemory(name=nome, create=True,
+                                                 size=TAMANHO_CABECALHO + 2 * capacidade * COLUNAS * 8)
+        except FileExistsError:
+            antiga = _anexar(nome)
+            cab = np.ndarray((8,), dtype=np.int64, buffer=antiga.buf) if antiga.size >= TAMANHO_CABECALHO else None
+            if cab is not None and cab[CAB_MAGICO] == MAGICO:
+                pid, batimento = int(cab[CAB_PID]), int(cab[CAB_BATIMENTO])
+                if _processo_vivo(pid) and _agora_ms() - batimento < SEGUNDOS_SEM_BATIMENTO * 1000:
+                    # Outro alimentador está vivo: remover o segmento dele deixaria os leitores já
+                    # anexados lendo uma cópia que ninguém mais atualiza
+                    del cab
+                    antiga.close()
+                    raise RuntimeError(f"Já há um alimentador (PID {pid}) gravando em '{nome}'.")
+            # Sobra de um alimentador que morreu sem limpar: recria do zero
+            del cab
+            antiga.unlink()
+            antiga.close()
+            memoria = shared_memory.SharedMemory(name=nome, create=True,
+                                                 size=TAMANHO_CABECALHO + 2 * capacidade * COLUNAS * 8)
+        cab = np.ndarray((8,), dtype=np.int64, buffer=memoria.buf)
+        cab[:] = 0
+        cab[CAB_CAPACIDADE] = capacidade
+        cab[CAB_PID] = os.getpid()
+        cab[CAB_MAGICO] = MAGICO # Por último: só agora os leitores aceitam o segmento
+        del cab
+        self._mapear(memoria)
+        self.bater()
+
+    def bater(self):
+        """Batimento: avisa os leitores que o alimentador está vivo (mesmo sem candle novo)."""
+        self._cab[CAB_BATIMENTO] = _agora_ms()
+
+    def adicionar(self, candles):
+        """Anexa candles fechados ([timestamp, open, high, low, close, volume]); ignora os já gravados."""
+        cab, capacidade = self._cab, self.capacidade
+        novos = [candle for candle in candles if cab[CAB_TOTAL] == 0 or candle[0] > cab[CAB_ULTIMO]]
+        if not novos:
+            return 0
+        cab[CAB_SEQ] += 1 # Ímpar: escrita em andamento
+        pos, total = int(cab[CAB_POS]), int(cab[CAB_TOTAL])
+        for candle in novos[-capacidade:]:
+            self._dados[pos] = candle
+            self._dados[pos + capacidade] = candle
+            pos = (pos + 1) % capacidade
+            total += 1
+        cab[CAB_POS], cab[CAB_TOTAL], cab[CAB_ULTIMO] = pos, total, int(novos[-1][0])
+        cab[CAB_SEQ] += 1 # Par: consistente de novo
+        self.bater()
+        return len(novos)
+
+    def remover(self):
+        memoria = self._memoria
+        self.fechar()
+        memoria.unlink()
+
+
+class LeitorJanela(_Janela):
+    """Lado dos scripts de previsão: só lê, sem trava. Levanta FileNotFoundError se não há alimentador."""
+
+    def __init__(self, symbol='ETH/USDT', timeframe='1m'):
+        memoria = _anexar(nome_memoria(symbol, timeframe))
+        if memoria.size < TAMANHO_CABECALHO or np.ndarray((1,), np.int64, memoria.buf)[0] != MAGICO:
+            memoria.close()
+            raise FileNotFoundError(f"A memória '{memoria.name}' não é de um alimentador de candles.")
+        self._mapear(memoria)
+
+    @property
+    def vivo(self):
+        return _agora_ms() - int(self._cab[CAB_BATIMENTO]) < SEGUNDOS_SEM_BATIMENTO * 1000
+
+    def ultimos(self, n):
+        """View somente-leitura (k, 6) com os k <= n candles mais recentes, do mais antigo ao mais novo.
+
+        A view não é copiada: ela continua válida enquanto o alimentador gravar menos de `capacidade - n`
+        candles novos. Para guardar por mais tempo, copie.
+        """
+        n = min(n, self.capacidade - 1)
+        for tentativa in range(1000):
+            seq = int(self._cab[CAB_SEQ])
+            if seq % 2 == 0:
+                fim = int(self._cab[CAB_POS]) + self.capacidade
+                k = min(n, int(self._cab[CAB_TOTAL]))
+                view = self._dados[fim - k:fim]
+                if int(self._cab[CAB_SEQ]) == seq:
+                    view.flags.writeable = False
+                    return view
+            time.sleep(0) # O alimentador está no meio de uma escrita (dura microssegundos)
+        raise RuntimeError("A janela compartilhada não ficou consistente (alimentador travado?).")
+
+    def desde(self, since):
+        """Candles com timestamp >= since, como lista (são poucos: normalmente só o que acabou de fechar)."""
+        candles = self.ultimos(self.capacidade)
+        return candles[int(np.searchsorted(candles[:, 0], since, side='left')):].tolist()
+
+
+# --- Execução do Alimentador ---
+def alimentar(simbolos=SIMBOLOS, timeframe=TIMEFRAME, capacidade=CAPACIDADE, exchange=None, ciclos=None):
+    """Mantém a janela de cada símbolo em dia: uma requisição por símbolo por candle, seja qual for o número
+    de leitores. `ciclos` limita quantos candles esperar (None = para sempre)."""
+    from fontes_candles import FonteBinance
+
+    if exchange is None:
+        import ccxt
+        exchange = ccxt.binance()
+    fontes = {symbol: FonteBinance(symbol, timeframe, exchange=exchange, margem_segundos=MARGEM_SEGUNDOS)
+              for symbol in simbolos}
+    duracao = duracao_timeframe_ms(timeframe)
+    janelas = {}
+    try:
+        for symbol in simbolos:
+            janelas[symbol] = JanelaCompartilhada(symbol, timeframe, capacidade)
+        for symbol, fonte in fontes.items():
+            iniciais = janelas[symbol].adicionar(fonte.ultimos(capacidade))
+            print(f"{symbol}: {iniciais} candles iniciais em '{nome_memoria(symbol, timeframe)}'.")
+
+        ciclo = 0
+        while ciclos is None or ciclo < ciclos:
+            # Dorme até o próximo fechamento, acordando a cada poucos segundos para o batimento
+            proximo = (exchange.milliseconds() // duracao + 1) * duracao + MARGEM_SEGUNDOS * 1000
+            while exchange.milliseconds() < proximo:
+                for janela in janelas.values():
+                    janela.bater()
+                time.sleep(min(5.0, max(0.0, (proximo - exchange.milliseconds()) / 1000)))
+
+            for symbol, fonte in fontes.items():
+                janela = janelas[symbol]
+                try:
+                    candles = fonte.desde(int(janela._cab[CAB_ULTIMO]) + duracao)
+                except Exception as e:
+                    # Fica para o próximo ciclo: o 'desde' pega o que faltou
+                    print(f"{symbol}: erro ao buscar candles: {e}")
+                    continue
+                janela.adicionar(candles)
+            ciclo += 1
+    finally:
+        for janela in janelas.values():
+            janela.remover()
+
+
+if __name__ == '__main__':
+    print(f"Alimentando {', '.join(SIMBOLOS)} ({TIMEFRAME}) na memória compartilhada. Ctrl+C para parar.")
+    try:
+        alimentar()
+    except KeyboardInterrupt:
+        pass
+    except Exception as e:
+        print(f"Erro fatal: {e}")
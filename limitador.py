@@ -0,0 +1,50 @@
+import asyncio
+import time
+
+
+# --- Limitador de Taxa (Token Bucket) ---
+# Compartilhado por todas as tarefas que falam com a mesma corretora: cada requisição consome
+# `peso` fichas; as fichas voltam a `taxa` por segundo até o máximo de `capacidade` (rajada).
+# Assim dezenas de buscas concorrentes nunca passam do limite da API, mesmo somadas.
+class LimitadorTaxa:
+    def __init__(self, taxa, capacidade=None):
+        self.taxa = float(taxa)
+        self.capacidade = float(capacidade if capacidade is not None else taxa)
+        self._fichas = self.capacidade
+        self._atualizado = time.monotonic()
+        self._trava = None
+        # Total de requisições liberadas e de segundos esperando (para acompanhar a pressão no limite)
+        self.liberadas = 0
+        self.espera_total = 0.0
+
+    def _repor(self):
+        agora = time.monotonic()
+        self._fichas = min(self.capacidade, self._fichas + (agora - self._atualizado) * self.taxa)
+        self._atualizado = agora
+
+    async def adquirir(self, peso=1):
+        if self._trava is None:
+            self._trava = asyncio.Lock()
+        # A trava mantém a ordem de chegada: quem está esperando fichas não é ultrapassado
+        async with self._trava:
+            self._repor()
+            # Em laço: um pausar() chamado durante a espera esvazia o balde de novo e a espera se estende
+            while self._fichas < peso:
+                espera = (peso - self._fichas) / self.taxa
+                self.espera_total += espera
+                await asyncio.sleep(espera)
+                self._repor()
+            self._fichas -= peso
+            self.liberadas += 1
+
+    def pausar(self, segundos):
+        """Esvazia o balde: ninguém é liberado pelos próximos `segundos` (ex.: a corretora acusou excesso de pedidos)."""
+        self._repor()
+        self._fichas = min(self._fichas, -segundos * self.taxa)
+
+    async def __aenter__(self):
+        await self.adquirir()
+        return self
+
+    async def __aexit__(self, *excecao):
+        return False
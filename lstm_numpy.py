@@ -0,0 +1,128 @@
+import json
+
+import numpy as np
+
+from normalizador import ArtefatoIncompativel, hash_arquivo
+
+# --- Inferência do LSTM só com NumPy ---
+# Reproduz o forward pass do modelo do treinar_modelo.py (LSTM -> Dropout -> LSTM -> Dropout -> Dense)
+# a partir dos pesos exportados pelo exportar_pesos.py. Não importa TensorFlow, então sobe em
+# milissegundos e cabe num contêiner pequeno. Na inferência o Dropout é a identidade, a não ser
+# que a previsão peça as máscaras aleatórias do treino (Monte-Carlo dropout, ver previsao_multipasso.py).
+
+ATIVACOES = {
+    'tanh': np.tanh,
+    'sigmoid': lambda x: 1 / (1 + np.exp(-x)),
+    'linear': lambda x: x,
+    'relu': lambda x: np.maximum(x, 0),
+}
+
+
+def _ativacao(nome):
+    if nome not in ATIVACOES:
+        raise ValueError(f"Ativação '{nome}' não suportada pela inferência em NumPy.")
+    return ATIVACOES[nome]
+
+
+class ModeloNumpy:
+    """Modelo sequencial (LSTM/Dropout/Dense) executado em NumPy, em lote.
+
+    `dtype` controla a precisão dos cálculos: float32 (padrão, mais rápido) ou float64.
+    """
+
+    def __init__(self, camadas, look_back, dtype=np.float32):
+        self.dtype = np.dtype(dtype)
+        self.look_back = look_back
+        self.input_shape = (None, look_back, 1)
+        self.camadas = []
+        for camada in camadas:
+            pesos = [np.asarray(p, dtype=self.dtype) for p in camada['pesos']]
+            self.camadas.append({**camada, 'pesos': pesos})
+        self.gerador = np.random.default_rng()
+
+    @classmethod
+    def carregar(cls, caminho, dtype=np.float32, modelo_sha256=None):
+        """Carrega os pesos exportados (arquivo .npz do exportar_pesos.py).
+
+        Se `modelo_sha256` for informado, confere se os pesos vieram desse arquivo .h5.
+        """
+        with np.load(caminho) as arquivo:
+            cabecalho = json.loads(str(arquivo['cabecalho']))
+            if modelo_sha256 is not None and cabecalho.get('modelo_sha256') != modelo_sha256:
+                raise ArtefatoIncompativel(f"Os pesos em '{caminho}' não correspondem ao modelo atual.")
+            camadas = [
+                {**camada, 'pesos': [arquivo[f'{i}_{j}'] for j in range(camada['n_pesos'])]}
+                for i, camada in enumerate(cabecalho['camadas'])
+            ]
+        if any(camada['tipo'] == 'Dropout' and 'rate' not in camada for camada in camadas):
+            # Exportado antes da taxa de Dropout fazer parte do cabeçalho: o carregar_modelo exporta de novo
+            raise ArtefatoIncompativel(f"Os pesos em '{caminho}' não têm a taxa de Dropout.")
+        return cls(camadas, cabecalho['look_back'], dtype)
+
+    @staticmethod
+    def _lstm(x, kernel, recurrent_kernel, bias, ativacao, ativacao_recorrente, return_sequences):
+        # Ordem dos portões no Keras: input, forget, cell, output
+        n, passos, _ = x.shape
+        unidades = recurrent_kernel.shape[0]
+        # A projeção da entrada de todos os passos é feita de uma vez só
+        entrada = x @ kernel + bias
+        h = np.zeros((n, unidades), dtype=x.dtype)
+        c = np.zeros((n, unidades), dtype=x.dtype)
+        saidas = np.empty((n, passos, unidades), dtype=x.dtype) if return_sequences else None
+        for t in range(passos):
+            z = entrada[:, t] + h @ recurrent_kernel
+            i = ativacao_recorrente(z[:, :unidades])
+            f = ativacao_recorrente(z[:, unidades:2 * unidades])
+            g = ativacao(z[:, 2 * unidades:3 * unidades])
+            o = ativacao_recorrente(z[:, 3 * unidades:])
+            c = f * c + i * g
+            h = o * ativacao(c)
+            if return_sequences:
+                saidas[:, t] = h
+        return saidas if return_sequences else h
+
+    def propagar(self, janelas, dropout=False):
+        """Forward pass em lote: janelas com shape (N, look_back, 1) -> previsões com shape (N, 1).
+
+        Com `dropout=True` cada camada Dropout zera unidades ao acaso como no treino (uma máscara por janela).
+        """
+        x = np.asarray(janelas, dtype=self.dtype).reshape(-1, self.look_back, 1)
+        for camada in self.camadas:
+            if camada['tipo'] == 'LSTM':
+                x = self._lstm(x, *camada['pesos'], _ativacao(camada['activation']),
+                               _ativacao(camada['recurrent_activation']), camada['return_sequences'])
+            elif camada['tipo'] == 'Dense':
+                kernel, bias = camada['pesos']
+                x = _ativacao(camada['activation'])(x @ kernel + bias)
+            elif camada['tipo'] == 'Dropout' and dropout and camada['rate']:
+                # Mesmo Dropout do Keras com training=True: mantém com probabilidade 1 - rate e reescala
+                manter = self.dtype.type(1 - camada['rate'])
+                x = x * (self.gerador.random(x.shape, dtype=self.dtype) < manter) / manter
+            # Dropout: identidade na inferência
+        return x
+
+    def predict(self, janelas, verbose=0):
+        """Mesma assinatura do model.predict do Keras, para os scripts trocarem de modelo sem mudanças."""
+        return self.propagar(janelas)
+
+    predict_on_batch = propagar
+
+
+def carregar_modelo(model_file, usar_tensorflow=False, dtype=np.float32):
+    """Carrega o modelo com Keras ou, por padrão, a versão em NumPy dos mesmos pesos.
+
+    Os pesos em NumPy são (re)exportados do .h5 automaticamente quando faltam ou estão desatualizados.
+    """
+    if usar_tensorflow:
+        from tensorflow.keras.models import load_model
+        return load_model(model_file)
+
+    from exportar_pesos import caminho_pesos, exportar_pesos
+
+    pesos = caminho_pesos(model_file)
+    modelo_sha256 = hash_arquivo(model_file)
+    try:
+        return ModeloNumpy.carregar(pesos, dtype, modelo_sha256)
+    except (FileNotFoundError, ArtefatoIncompativel):
+        exportar_pesos(model_file, pesos)
+        return ModeloNumpy.carregar(pesos, dtype, modelo_sha256)
@@ -0,0 +1,127 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# --- Métricas de Latência e Vazão ---
+# Registro leve (sem dependências) de contadores, medidores e histogramas com rótulos.
+# Exporta no formato de texto do Prometheus (para o textfile collector do node_exporter ou
+# para um endpoint /metrics) e como uma linha JSON por ciclo (fácil de analisar com pandas).
+
+# Limites dos histogramas de tempo, em segundos (de 1 ms a 2 minutos)
+LIMITES_SEGUNDOS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+# Limites do histograma de erro de previsão, em USD
+LIMITES_ERRO = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 25.0, 50.0, 100.0)
+
+
+def _rotulos(rotulos):
+    return tuple(sorted(rotulos.items()))
+
+
+def _formatar_rotulos(rotulos, extra=()):
+    pares = list(rotulos) + list(extra)
+    if not pares:
+        return ''
+    return '{' + ','.join(f'{k}="{v}"' for k, v in pares) + '}'
+
+
+class Histograma:
+    def __init__(self, limites):
+        self.limites = tuple(limites)
+        self.contagens = [0] * (len(self.limites) + 1) # o último é o +Inf
+        self.soma = 0.0
+        self.contagem = 0
+
+    def observar(self, valor):
+        i = 0
+        while i < len(self.limites) and valor > self.limites[i]:
+            i += 1
+        self.contagens[i] += 1
+        self.soma += valor
+        self.contagem += 1
+
+    def acumuladas(self):
+        total = 0
+        for contagem in self.contagens:
+            total += contagem
+            yield total
+
+
+class Metricas:
+    def __init__(self, prefixo='eth_oracle'):
+        self.prefixo = prefixo
+        self._trava = threading.Lock()
+        self._familias = {} # nome -> (tipo, ajuda, {rótulos: valor ou Histograma})
+        self.ultimos = {} # última duração (s) de cada etapa cronometrada, para o log JSON
+
+    def _familia(self, nome, tipo, ajuda):
+        nome = f'{self.prefixo}_{nome}'
+        if nome not in self._familias:
+            self._familias[nome] = (tipo, ajuda, {})
+        return self._familias[nome][2]
+
+    def incrementar(self, nome, valor=1, ajuda='', **rotulos):
+        with self._trava:
+            serie = self._familia(nome, 'counter', ajuda)
+            chave = _rotulos(rotulos)
+            serie[chave] = serie.get(chave, 0) + valor
+
+    def definir(self, nome, valor, ajuda='', **rotulos):
+        with self._trava:
+            self._familia(nome, 'gauge', ajuda)[_rotulos(rotulos)] = valor
+
+    def observar(self, nome, valor, limites=LIMITES_SEGUNDOS, ajuda='', **rotulos):
+        with self._trava:
+            serie = self._familia(nome, 'histogram', ajuda)
+            chave = _rotulos(rotulos)
+            if chave not in serie:
+                serie[chave] = Histograma(limites)
+            serie[chave].observar(valor)
+
+    @contextmanager
+    def cronometrar(self, etapa):
+        """Mede a duração do bloco e a registra no histograma `etapa_segundos{etapa=...}`."""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            duracao = time.perf_counter() - inicio
+            self.observar('etapa_segundos', duracao, ajuda='Duração de cada etapa do ciclo', etapa=etapa)
+            self.ultimos[etapa] = duracao
+
+    def medias(self, nome, rotulo):
+        """{valor do rótulo: (contagem, média)} de um histograma, para resumos no terminal."""
+        with self._trava:
+            serie = self._familias.get(f'{self.prefixo}_{nome}', (None, None, {}))[2]
+            return {dict(chave).get(rotulo): (h.contagem, h.soma / h.contagem) for chave, h in serie.items() if h.contagem}
+
+    def exportar_prometheus(self):
+        linhas = []
+        with self._trava:
+            for nome, (tipo, ajuda, serie) in sorted(self._familias.items()):
+                if ajuda:
+                    linhas.append(f'# HELP {nome} {ajuda}')
+                linhas.append(f'# TYPE {nome} {tipo}')
+                for chave, valor in sorted(serie.items()):
+                    if tipo != 'histogram':
+                        linhas.append(f'{nome}{_formatar_rotulos(chave)} {valor}')
+                        continue
+                    for limite, acumulada in zip(valor.limites + ('+Inf',), valor.acumuladas()):
+                        linhas.append(f'{nome}_bucket{_formatar_rotulos(chave, [("le", limite)])} {acumulada}')
+                    linhas.append(f'{nome}_sum{_formatar_rotulos(chave)} {valor.soma}')
+                    linhas.append(f'{nome}_count{_formatar_rotulos(chave)} {valor.contagem}')
+        return '\n'.join(linhas) + '\n'
+
+    def salvar_prometheus(self, caminho):
+        # Escrita atômica: o coletor nunca lê um arquivo pela metade
+        temporario = caminho + '.tmp'
+        with open(temporario, 'w') as f:
+            f.write(self.exportar_prometheus())
+        os.replace(temporario, caminho)
+
+    def registrar_json(self, caminho, **campos):
+        """Anexa uma linha JSON com os campos dados e a duração mais recente de cada etapa."""
+        registro = {'ts': time.time(), **campos, 'etapas_segundos': dict(self.ultimos)}
+        with open(caminho, 'a') as f:
+            f.write(json.dumps(registro) + '\n')
@@ -0,0 +1,104 @@
+import asyncio
+
+import numpy as np
+
+
+# --- Micro-Lotes Dinâmicos ---
+# Pedidos de previsão que chegam juntos são agrupados em UM forward pass em lote.
+# O primeiro pedido da fila abre uma janela de no máximo `max_espera_ms`; o lote é enviado
+# ao modelo quando essa janela fecha ou quando ele atinge `max_lote` pedidos.
+# Assim a latência extra fica limitada pela janela e a vazão cresce com o tamanho do lote.
+class MicroLote:
+    def __init__(self, previsor, max_lote=64, max_espera_ms=5.0):
+        self.previsor = previsor
+        self.max_lote = max_lote
+        self.max_espera = max_espera_ms / 1000
+        self._fila = None
+        self._tarefa = None
+        self._parando = False
+        self._drenando = False
+        # Estatísticas simples para acompanhar o tamanho médio dos lotes
+        self.lotes = 0
+        self.pedidos = 0
+
+    def iniciar(self):
+        self._fila = asyncio.Queue()
+        self._tarefa = asyncio.get_running_loop().create_task(self._executar())
+
+    async def parar(self, drenar=False):
+        """Para de aceitar pedidos, deixa o lote em andamento terminar e falha os que ainda estão na fila.
+
+        Com `drenar` (troca de versão do modelo), todos os pedidos já enfileirados são respondidos antes de parar.
+        """
+        if self._tarefa is None:
+            return
+        self._parando = True
+        self._drenando = drenar
+        # Sem cancelar a tarefa: um cancelamento no meio do lote deixaria os futuros dele sem resposta.
+        # O aviso de parada vai para o fim da fila: com `drenar`, a tarefa para ao chegar nele
+        self._fila.put_nowait(None)
+        await self._tarefa
+        self._tarefa = None
+        erro = RuntimeError("O micro-lote foi parado antes de processar o pedido.")
+        while not self._fila.empty():
+            pedido = self._fila.get_nowait()
+            if pedido is not None and not pedido[2].done():
+                pedido[2].set_exception(erro)
+
+    async def prever(self, janela, horizonte=1):
+        """Enfileira uma janela JÁ NORMALIZADA e aguarda as `horizonte` previsões normalizadas."""
+        if self._parando:
+            raise RuntimeError("O micro-lote foi parado.")
+        futuro = asyncio.get_running_loop().create_future()
+        await self._fila.put((np.asarray(janela, dtype=np.float32), horizonte, futuro))
+        return await futuro
+
+    async def _coletar_lote(self):
+        loop = asyncio.get_running_loop()
+        primeiro = await self._fila.get()
+        if primeiro is None: # Aviso de parada
+            return None
+        lote = [primeiro]
+        prazo = loop.time() + self.max_espera
+        while len(lote) < self.max_lote and (self._drenando or not self._parando):
+            restante = prazo - loop.time()
+            if restante <= 0:
+                break
+            try:
+                pedido = await asyncio.wait_for(self._fila.get(), restante)
+            except asyncio.TimeoutError:
+                break
+            if pedido is None:
+                self._fila.put_nowait(None) # Devolvido: a próxima coleta encerra a tarefa
+                break
+            lote.append(pedido)
+        return lote
+
+    async def _executar(self):
+        loop = asyncio.get_running_loop()
+        while self._drenando or not self._parando:
+            lote = await self._coletar_lote()
+            if lote is None:
+                break
+            # Agrupado por horizonte: um pedido de 60 passos não faz os de 1 passo esperarem 60 forward
+            # passes. Os horizontes menores rodam primeiro e já são respondidos antes dos maiores
+            grupos = {}
+            for pedido in lote:
+                grupos.setdefault(pedido[1], []).append(pedido)
+            for horizonte in sorted(grupos):
+                grupo = grupos[horizonte]
+                janelas = np.stack([pedido[0] for pedido in grupo])
+                try:
+                    # O modelo roda em uma thread para não travar o event loop enquanto o próximo lote se forma
+                    previsoes = await loop.run_in_executor(None, self.previsor.prever, janelas, horizonte)
+                except Exception as e:
+                    for _, _, futuro in grupo:
+                        if not futuro.done():
+                            futuro.set_exception(e)
+                    continue
+
+                self.lotes += 1
+                self.pedidos += len(grupo)
+                for k, (_, _, futuro) in enumerate(grupo):
+                    if not futuro.done():
+                        futuro.set_result(previsoes[k])
@@ -0,0 +1,25 @@
+from tensorflow.keras.models import Sequential
+from tensorflow.keras.layers import LSTM, Dense, Dropout
+
+
+# --- Arquitetura do Modelo LSTM ---
+# Usada pelo treinar_modelo.py e por todo código que precisa de um modelo novo com a mesma arquitetura.
+def construir_modelo(look_back, unidades=50, dropout=0.2):
+    model = Sequential()
+
+    # Camada LSTM 1 com Dropout para evitar overfitting
+    model.add(LSTM(units=unidades, return_sequences=True, input_shape=(look_back, 1)))
+    model.add(Dropout(dropout))
+
+    # Camada LSTM 2
+    model.add(LSTM(units=unidades, return_sequences=False))
+    model.add(Dropout(dropout))
+
+    # Camada de Saída (Dense)
+    # A saída é 1, pois queremos prever um único valor (o próximo preço de 'close')
+    model.add(Dense(units=1))
+
+    # Compilação do modelo
+    # Usamos 'adam' como otimizador e 'mean_squared_error' como função de perda para regressão
+    model.compile(optimizer='adam', loss='mean_squared_error')
+    return model
@@ -0,0 +1,148 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+
+# --- Artefato do Normalizador ---
+# O treinar_modelo.py grava, ao lado do modelo, os parâmetros do MinMaxScaler ajustado no treino
+# e o LOOK_BACK usado. Assim a inferência não precisa reler o conjunto de treino só para refazer o fit.
+VERSAO_ARTEFATO = 1
+
+
+class ArtefatoIncompativel(Exception):
+    """O artefato do normalizador não corresponde ao modelo carregado."""
+
+
+def caminho_artefato(model_file):
+    """'modelo_ethereum.h5' -> 'modelo_ethereum_normalizador.json'"""
+    return os.path.splitext(model_file)[0] + '_normalizador.json'
+
+
+def hash_arquivo(caminho):
+    sha = hashlib.sha256()
+    with open(caminho, 'rb') as f:
+        for bloco in iter(lambda: f.read(1 << 20), b''):
+            sha.update(bloco)
+    return sha.hexdigest()
+
+
+class Normalizador:
+    """Equivalente ao MinMaxScaler já ajustado (mesmas fórmulas de transform/inverse_transform)."""
+
+    def __init__(self, data_min, data_max, feature_range=(0, 1), look_back=None, corte_treino=None):
+        self.data_min_ = np.asarray(data_min, dtype=np.float64)
+        self.data_max_ = np.asarray(data_max, dtype=np.float64)
+        self.feature_range = tuple(feature_range)
+        self.look_back = look_back
+        self.corte_treino = corte_treino # timestamp (ms) do último candle visto no treino
+        data_range = self.data_max_ - self.data_min_
+        data_range = np.where(data_range == 0, 1.0, data_range)
+        self.scale_ = (self.feature_range[1] - self.feature_range[0]) / data_range
+        self.min_ = self.feature_range[0] - self.data_min_ * self.scale_
+
+    def transform(self, X):
+        return np.asarray(X, dtype=np.float64) * self.scale_ + self.min_
+
+    def inverse_transform(self, X):
+        return (np.asarray(X, dtype=np.float64) - self.min_) / self.scale_
+
+
+def salvar_normalizador(scaler, look_back, model_file, corte_treino=None, novo_modelo=None):
+    """Grava o artefato do normalizador ligado ao arquivo de modelo atual (pelo hash SHA-256).
+
+    `corte_treino` é o timestamp do último candle usado no treino (ponto de partida do retreino incremental).
+    `novo_modelo` é o arquivo que vai substituir `model_file` (o hash sai dele): assim o artefato é gravado antes
+    da troca e o modelo novo nunca fica no ar sem o seu normalizador.
+    """
+    artefato = {
+        'versao': VERSAO_ARTEFATO,
+        'look_back': int(look_back),
+        'feature_range': list(scaler.feature_range),
+        'data_min': np.asarray(scaler.data_min_).tolist(),
+        'data_max': np.asarray(scaler.data_max_).tolist(),
+        'modelo_sha256': hash_arquivo(novo_modelo or model_file),
+        'corte_treino': None if corte_treino is None else int(corte_treino),
+    }
+    caminho = caminho_artefato(model_file)
+    with open(caminho + '.tmp', 'w') as f:
+        json.dump(artefato, f, indent=2)
+    os.replace(caminho + '.tmp', caminho)
+    return caminho
+
+
+def carregar_normalizador(model_file, model=None):
+    """Carrega o artefato do normalizador e confere se ele pertence ao modelo.
+
+    Levanta ArtefatoIncompativel se a versão, o hash do modelo ou o LOOK_BACK não baterem.
+    """
+    caminho = caminho_artefato(model_file)
+    if not os.path.exists(caminho):
+        raise FileNotFoundError(
+            f"Artefato do normalizador '{caminho}' não encontrado. Gere com: python normalizador.py {model_file}"
+        )
+    with open(caminho) as f:
+        artefato = json.load(f)
+
+    if artefato.get('versao') != VERSAO_ARTEFATO:
+        raise ArtefatoIncompativel(
+            f"'{caminho}' tem versão {artefato.get('versao')}, esperada {VERSAO_ARTEFATO}. Treine o modelo novamente."
+        )
+    if artefato['modelo_sha256'] != hash_arquivo(model_file):
+        raise ArtefatoIncompativel(
+            f"'{caminho}' não corresponde a '{model_file}' (o modelo mudou depois do treino). Treine o modelo novamente."
+        )
+    if model is not None and model.input_shape[1] != artefato['look_back']:
+        raise ArtefatoIncompativel(
+            f"O modelo espera {model.input_shape[1]} passos, mas o artefato tem LOOK_BACK={artefato['look_back']}."
+        )
+
+    return Normalizador(artefato['data_min'], artefato['data_max'], artefato['feature_range'], artefato['look_back'],
+                        artefato.get('corte_treino'))
+
+
+def ajustar_no_treino(look_back, csv=None):
+    """Normalizador ajustado nos closes de treino, como no treinar_modelo.py.
+
+    Com `csv`, usa a coluna 'close' desse arquivo (o modelo_ethereum.h5 do repositório foi treinado com o
+    Data/dados_treino.csv). Senão, usa o da saída do Data/preprocessar.py quando ela está em dia e tem o mesmo
+    LOOK_BACK, ou o min/max do conjunto de treino do armazém. Retorna (normalizador, último timestamp de treino).
+    """
+    if csv is not None:
+        import pandas as pd
+
+        df = pd.read_csv(csv)
+        corte_treino = int(df['timestamp'].iloc[-1]) if 'timestamp' in df else None
+        return Normalizador([float(df['close'].min())], [float(df['close'].max())]), corte_treino
+
+    from Data.armazem_candles import carregar_conjunto, carregar_preprocessado, ler_manifesto, preprocessado_atualizado
+
+    manifesto = ler_manifesto()
+    if manifesto is not None and manifesto['look_back'] == look_back and preprocessado_atualizado(manifesto):
+        treino = carregar_preprocessado('treino')
+        return Normalizador(**manifesto['normalizador']), int(treino['timestamp'][-1])
+    treino = carregar_conjunto('treino')
+    return Normalizador([float(treino['close'].min())], [float(treino['close'].max())]), int(treino['timestamp'][-1])
+
+
+# --- Gerar o Artefato de um Modelo Já Treinado ---
+# Para modelos que chegaram sem o artefato, como o modelo_ethereum.h5 versionado no repositório.
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Gera o artefato do normalizador para um modelo já treinado.')
+    parser.add_argument('model_file', nargs='?', default='modelo_ethereum.h5')
+    parser.add_argument('--csv', help="ajusta nos closes deste CSV em vez do conjunto de treino do armazém")
+    args = parser.parse_args()
+
+    from lstm_numpy import carregar_modelo
+
+    try:
+        look_back = carregar_modelo(args.model_file).input_shape[1]
+        scaler, corte_treino = ajustar_no_treino(look_back, args.csv)
+    except FileNotFoundError as e:
+        print(f"Erro: {e}")
+        exit()
+    caminho = salvar_normalizador(scaler, look_back, args.model_file, corte_treino=corte_treino)
+    print(f"Normalizador (LOOK_BACK={look_back}, min={scaler.data_min_[0]:.2f}, max={scaler.data_max_[0]:.2f}) "
+          f"salvo em '{caminho}'.")
@@ -0,0 +1,102 @@
+import time
+from contextlib import nullcontext
+
+import numpy as np
+
+from buffer_circular import BufferCircular
+from previsao_multipasso import PrevisorMultipasso
+
+
+# --- Preditor Contínuo ---
+# Processo de longa duração: carrega a janela de LOOK_BACK candles uma única vez e depois,
+# a cada minuto, anexa só o candle que acabou de fechar ao buffer circular (já normalizado)
+# e faz um único forward pass. O trabalho por minuto é uma requisição pequena + uma previsão.
+class PreditorContinuo:
+    def __init__(self, model, scaler, fonte, look_back=None, tentativas=5, pausa_tentativa=1.0, metricas=None):
+        self.model = model
+        self.scaler = scaler
+        self.fonte = fonte
+        self.look_back = look_back or scaler.look_back
+        self.tentativas = tentativas
+        self.pausa_tentativa = pausa_tentativa
+        self.metricas = metricas # metricas.Metricas opcional: cronometra cada etapa
+
+        self.janela = BufferCircular(self.look_back)
+        self.ultimo_timestamp = None
+        self.ultimo_close = None
+        self.previsor = PrevisorMultipasso(model, self.look_back)
+
+    def _etapa(self, nome):
+        return self.metricas.cronometrar(nome) if self.metricas else nullcontext()
+
+    def adicionar_candles(self, candles):
+        """Anexa candles fechados à janela (usado também por fluxos de streaming, ver streaming.prever_ao_fechar)."""
+        with self._etapa('normalizacao'):
+            # Lista do ccxt ou view (k, 6) da janela compartilhada (nesse caso sem cópia)
+            closes = np.asarray(candles, dtype=np.float64)[:, 4:5]
+            self.janela.estender(self.scaler.transform(closes).ravel())
+        self.ultimo_timestamp = int(candles[-1][0])
+        self.ultimo_close = float(candles[-1][4])
+
+    def trocar_modelo(self, model, scaler):
+        """Troca o modelo entre duas previsões sem buscar a janela de novo (o LOOK_BACK precisa ser o mesmo).
+
+        A janela guarda closes normalizados: eles voltam a preço com o normalizador antigo e são
+        normalizados com o novo.
+        """
+        if scaler.look_back != self.look_back:
+            raise ValueError(f"O modelo novo usa LOOK_BACK={scaler.look_back}; a janela tem {self.look_back}.")
+        closes = self.scaler.inverse_transform(self.janela.janela().reshape(-1, 1))
+        janela = BufferCircular(self.look_back)
+        janela.estender(scaler.transform(closes).ravel())
+        self.model, self.scaler, self.janela = model, scaler, janela
+        self.previsor = PrevisorMultipasso(model, self.look_back)
+
+    def inicializar(self):
+        """Busca a janela inicial de LOOK_BACK candles fechados (feito uma única vez)."""
+        candles = self.fonte.ultimos(self.look_back)
+        if len(candles) < self.look_back:
+            raise RuntimeError(f"A fonte retornou apenas {len(candles)} candles; são necessários {self.look_back}.")
+        self.adicionar_candles(candles)
+
+    def prever(self):
+        """Prevê o close do próximo candle. Retorna (timestamp do próximo candle em ms, preço previsto)."""
+        timestamps, precos = self.prever_horizonte(1)
+        return timestamps[0], float(precos[0])
+
+    def prever_horizonte(self, horizonte):
+        """Previsão autorregressiva dos próximos `horizonte` candles. Retorna (timestamps em ms, preços)."""
+        with self._etapa('modelo'):
+            predicted_scaled = self.previsor.prever(self.janela.janela(), horizonte)
+        with self._etapa('desnormalizacao'):
+            predicted_prices = self.scaler.inverse_transform(predicted_scaled.reshape(-1, 1)).ravel()
+        timestamps = [self.ultimo_timestamp + (i + 1) * self.fonte.duracao for i in range(horizonte)]
+        return timestamps, predicted_prices
+
+    def prever_intervalos(self, horizonte=1, amostras=100, quantis=(0.05, 0.95)):
+        """Monte-Carlo dropout em um lote. Retorna (timestamps em ms, média, faixas) em preço;
+        faixas tem uma linha por quantil."""
+        with self._etapa('incerteza'):
+            media, faixas = self.previsor.prever_intervalos(self.janela.janela(), horizonte, amostras, quantis)
+            media = self.scaler.inverse_transform(media.reshape(-1, 1)).ravel()
+            # Min-max é crescente: o quantil do preço é o preço do quantil
+            faixas = self.scaler.inverse_transform(faixas.reshape(-1, 1)).reshape(faixas.shape)
+        timestamps = [self.ultimo_timestamp + (i + 1) * self.fonte.duracao for i in range(horizonte)]
+        return timestamps, media, faixas
+
+    def aguardar_proximo_candle(self):
+        """Espera o próximo candle fechar e o anexa à janela. Retorna a lista de candles novos."""
+        proximo = self.ultimo_timestamp + self.fonte.duracao
+        with self._etapa('espera_fechamento'):
+            self.fonte.esperar_fechamento(proximo)
+        for _ in range(self.tentativas):
+            # A corretora pode demorar alguns segundos para publicar o candle fechado
+            with self._etapa('busca'):
+                candles = self.fonte.desde(proximo)
+            if self.metricas:
+                self.metricas.incrementar('requisicoes_total', ajuda='Requisições de candles à fonte')
+            if candles:
+                self.adicionar_candles(candles)
+                return candles
+            time.sleep(self.pausa_tentativa)
+        return []
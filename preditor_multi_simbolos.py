@@ -0,0 +1,133 @@
+import asyncio
+
+import numpy as np
+
+from buffer_circular import BufferCircular
+from Data.armazem_candles import duracao_timeframe_ms
+from normalizador import Normalizador
+from previsao_multipasso import PrevisorMultipasso
+
+
+# --- Preditor de Vários Símbolos ---
+# Uma janela (buffer circular já normalizado) e um normalizador por símbolo. As buscas de todos os
+# símbolos rodam em paralelo (asyncio) atrás de um único limitador de taxa; as janelas prontas no
+# minuto são empilhadas em UM forward pass em lote. O custo por minuto cresce com as requisições
+# de rede, não com o número de chamadas ao modelo.
+class PreditorMultiSimbolos:
+    def __init__(self, model, exchange, simbolos, limitador, look_back, timeframe='1m', normalizadores=None,
+                 historico_normalizador=1000):
+        """`exchange` é um cliente assíncrono do ccxt (ccxt.async_support).
+
+        `normalizadores` mapeia símbolo -> normalizador já ajustado (ex.: o artefato do modelo para ETH/USDT).
+        Símbolos sem normalizador usam o min/max dos últimos `historico_normalizador` candles fechados.
+        """
+        self.model = model
+        self.exchange = exchange
+        self.simbolos = list(simbolos)
+        self.limitador = limitador
+        self.look_back = look_back
+        self.timeframe = timeframe
+        self.duracao = duracao_timeframe_ms(timeframe)
+        self.normalizadores = dict(normalizadores or {})
+        self.historico_normalizador = historico_normalizador
+
+        self.janelas = {symbol: BufferCircular(look_back) for symbol in self.simbolos}
+        self.ultimo_timestamp = {}
+        self.ultimo_close = {}
+        self.erros = {}
+        self.previsor = PrevisorMultipasso(model, look_back)
+
+    def trocar_modelo(self, model, scaler, symbol):
+        """Troca o modelo entre dois minutos sem buscar as janelas de novo (o LOOK_BACK precisa ser o mesmo).
+
+        `scaler` é o normalizador do modelo novo para `symbol` (o par em que ele foi treinado): a janela desse par
+        volta a preço com o normalizador antigo e é normalizada com o novo. Os outros pares mantêm os seus.
+        """
+        if scaler.look_back != self.look_back:
+            raise ValueError(f"O modelo novo usa LOOK_BACK={scaler.look_back}; as janelas têm {self.look_back}.")
+        antigo = self.normalizadores.get(symbol)
+        if antigo is not None and self.janelas[symbol].tamanho:
+            closes = antigo.inverse_transform(self.janelas[symbol].janela().reshape(-1, 1))
+            janela = BufferCircular(self.look_back)
+            janela.estender(scaler.transform(closes).ravel())
+            self.janelas[symbol] = janela
+        self.model = model
+        self.normalizadores[symbol] = scaler
+        self.previsor = PrevisorMultipasso(model, self.look_back)
+
+    async def _buscar(self, symbol, since=None, limit=None):
+        async with self.limitador:
+            ohlcv = await self.exchange.fetch_ohlcv(symbol, self.timeframe, since=since, limit=limit)
+        agora = self.exchange.milliseconds()
+        return [candle for candle in ohlcv if candle[0] + self.duracao <= agora]
+
+    def _adicionar(self, symbol, candles):
+        closes = np.array([candle[4] for candle in candles], dtype=np.float64).reshape(-1, 1)
+        self.janelas[symbol].estender(self.normalizadores[symbol].transform(closes).ravel())
+        self.ultimo_timestamp[symbol] = int(candles[-1][0])
+        self.ultimo_close[symbol] = float(candles[-1][4])
+
+    async def _inicializar_simbolo(self, symbol):
+        ajustar = symbol not in self.normalizadores
+        n = max(self.look_back, self.historico_normalizador) if ajustar else self.look_back
+        candles = (await self._buscar(symbol, limit=n + 1))[-n:]
+        if len(candles) < self.look_back:
+            raise RuntimeError(f"{symbol}: apenas {len(candles)} candles; são necessários {self.look_back}.")
+        if ajustar:
+            closes = [candle[4] for candle in candles]
+            self.normalizadores[symbol] = Normalizador([min(closes)], [max(closes)], look_back=self.look_back)
+        self._adicionar(symbol, candles[-self.look_back:])
+
+    async def _atualizar_simbolo(self, symbol):
+        proximo = self.ultimo_timestamp[symbol] + self.duracao
+        candles = [c for c in await self._buscar(symbol, since=proximo, limit=5) if c[0] >= proximo]
+        if candles:
+            self._adicionar(symbol, candles)
+        return len(candles)
+
+    async def _em_todos(self, funcao, simbolos):
+        # Um símbolo com erro não derruba os outros; ele fica fora da previsão até a próxima busca
+        resultados = await asyncio.gather(*(funcao(symbol) for symbol in simbolos), return_exceptions=True)
+        for symbol, resultado in zip(simbolos, resultados):
+            if isinstance(resultado, Exception):
+                self.erros[symbol] = resultado
+            else:
+                self.erros.pop(symbol, None)
+        return dict(zip(simbolos, resultados))
+
+    async def inicializar(self):
+        """Busca a janela inicial de todos os símbolos em paralelo."""
+        await self._em_todos(self._inicializar_simbolo, self.simbolos)
+
+    async def atualizar(self):
+        """Anexa os candles que fecharam desde a última busca. Retorna {símbolo: candles novos ou exceção}."""
+        prontos = [symbol for symbol in self.simbolos if symbol in self.ultimo_timestamp]
+        pendentes = [symbol for symbol in self.simbolos if symbol not in self.ultimo_timestamp]
+        resultados = await self._em_todos(self._atualizar_simbolo, prontos)
+        if pendentes:
+            # Símbolos cuja janela inicial falhou tentam de novo
+            resultados.update(await self._em_todos(self._inicializar_simbolo, pendentes))
+        return resultados
+
+    def prever(self, horizonte=1, ate=None):
+        """Prevê os próximos `horizonte` candles de todos os símbolos prontos em um único lote.
+
+        Com `ate` (ms), só entram os símbolos cujo último candle fechado é `ate` (os atrasados ficam de fora).
+        Retorna {símbolo: (timestamps em ms, preços previstos)}.
+        """
+        simbolos = [
+            symbol for symbol in self.simbolos
+            if self.janelas[symbol].cheio and symbol in self.ultimo_timestamp
+            and (ate is None or self.ultimo_timestamp[symbol] == ate)
+        ]
+        if not simbolos:
+            return {}
+        lote = np.stack([self.janelas[symbol].janela() for symbol in simbolos])
+        previsoes = self.previsor.prever(lote, horizonte)
+
+        resultado = {}
+        for symbol, previsao in zip(simbolos, previsoes):
+            precos = self.normalizadores[symbol].inverse_transform(previsao.reshape(-1, 1)).ravel()
+            timestamps = [self.ultimo_timestamp[symbol] + (i + 1) * self.duracao for i in range(horizonte)]
+            resultado[symbol] = (timestamps, precos)
+        return resultado
@@ -0,0 +1,228 @@
+import argparse
+import asyncio
+import random
+import time
+
+import numpy as np
+import pandas as pd
+
+from Data.armazem_candles import ArmazemCandles, duracao_timeframe_ms
+from limitador import LimitadorTaxa
+
+# --- 1. Configurações ---
+SYMBOL = 'ETH/USDT'
+TIMEFRAME = '1m'
+DATA_INICIAL = '2017-01-01T00:00:00Z' # Usada apenas quando o armazém ainda está vazio
+LIMITE_PAGINA = 1000 # Candles por requisição
+
+# A Binance conta "peso" por minuto (6000 por IP); cada página de klines custa 2. Fica uma folga
+# para os scripts de previsão que usam o mesmo IP.
+PESO_POR_MINUTO = 6000
+FRACAO_DO_LIMITE = 0.8
+PESO_REQUISICAO = 2
+CONCORRENCIA = 16 # Páginas em voo ao mesmo tempo
+
+# Novas tentativas com espera exponencial (e um pouco de aleatoriedade) até um teto
+TENTATIVAS = 6
+ESPERA_INICIAL = 1.0
+ESPERA_MAXIMA = 60.0
+
+# Candles acumulados antes de cada gravação no armazém
+TAMANHO_LOTE = 100_000
+
+# Nomes das exceções do ccxt que indicam excesso de pedidos (a corretora pede para todo mundo esperar)
+ERROS_DE_LIMITE = ('RateLimitExceeded', 'DDoSProtection')
+
+
+# --- 2. Preenchimento Concorrente ---
+# O intervalo é dividido em janelas de uma página cada (LIMITE_PAGINA candles), independentes entre si:
+# várias são buscadas ao mesmo tempo, todas atrás de um único limitador de taxa (token bucket) que conta
+# o peso das requisições. As janelas podem terminar fora de ordem; as prontas esperam num buffer e são
+# gravadas no armazém em ordem, assim o armazém nunca fica com um buraco no meio.
+# 'exchange' é um cliente assíncrono (ccxt.async_support) ou a ExchangeSimulada abaixo.
+def dividir_janelas(since, until, duracao, limit=LIMITE_PAGINA):
+    """[(inicio, fim)] de `limit` candles cada, cobrindo since..until (ms, inclusive)."""
+    passo = limit * duracao
+    return [(inicio, min(inicio + passo - duracao, until)) for inicio in range(since, until + 1, passo)]
+
+
+def erro_de_limite(erro):
+    return any(classe.__name__ in ERROS_DE_LIMITE for classe in type(erro).__mro__)
+
+
+async def buscar_janela(exchange, symbol, timeframe, janela, limitador, limit=LIMITE_PAGINA,
+                        peso=PESO_REQUISICAO, tentativas=TENTATIVAS, espera_inicial=ESPERA_INICIAL,
+                        espera_maxima=ESPERA_MAXIMA):
+    """Candles da janela (inicio <= timestamp <= fim). Após `tentativas` falhas seguidas, repassa o erro."""
+    inicio, fim = janela
+    for tentativa in range(tentativas):
+        await limitador.adquirir(peso)
+        try:
+            ohlcv = await exchange.fetch_ohlcv(symbol, timeframe, since=inicio, limit=limit)
+        except Exception as e:
+            if tentativa == tentativas - 1:
+                raise
+            espera = min(espera_maxima, espera_inicial * 2 ** tentativa) * random.uniform(0.5, 1.0)
+            if erro_de_limite(e):
+                # Excesso de pedidos: o balde inteiro espera, não só esta janela
+                limitador.pausar(espera)
+            await asyncio.sleep(espera)
+            continue
+        # Uma página pode passar do fim da janela (ou começar depois dela, se a corretora não tem dados ali)
+        return [candle for candle in ohlcv if inicio <= candle[0] <= fim]
+
+
+async def preencher(exchange, armazem, since, until=None, limitador=None, concorrencia=CONCORRENCIA,
+                    limit=LIMITE_PAGINA, tamanho_lote=TAMANHO_LOTE, **opcoes_busca):
+    """Busca since..until (ms, padrão: último candle fechado) em paralelo e grava no armazém em ordem.
+
+    Retorna quantos candles novos foram gravados. Se uma janela esgotar as tentativas, o que veio antes
+    dela já está gravado e o erro é repassado: rodar de novo continua do último candle armazenado.
+    """
+    duracao = duracao_timeframe_ms(armazem.timeframe)
+    if limitador is None:
+        limitador = LimitadorTaxa(PESO_POR_MINUTO * FRACAO_DO_LIMITE / 60, capacidade=PESO_REQUISICAO * concorrencia)
+    # Só candles já fechados entram no armazém
+    fim = exchange.milliseconds() // duracao * duracao - duracao
+    if until is not None:
+        fim = min(fim, until)
+    janelas = dividir_janelas(since, fim, duracao, limit) if since <= fim else []
+
+    prontas = {} # índice da janela -> candles, até chegar a vez dela
+    proxima = 0 # próxima janela a gravar
+    lote = []
+    total_novos = 0
+
+    def gravar():
+        nonlocal lote, total_novos
+        if lote:
+            total_novos += armazem.adicionar(lote)
+            ultima = pd.to_datetime(lote[-1][0], unit='ms')
+            print(f"Gravados {total_novos} candles novos (janela {proxima}/{len(janelas)}). Última data: {ultima}")
+            lote = []
+
+    pendentes = {}
+    lancadas = 0
+    try:
+        while proxima < len(janelas):
+            # Mantém `concorrencia` janelas em voo, sem deixar o buffer de fora de ordem crescer sem limite
+            while lancadas < len(janelas) and len(pendentes) < concorrencia and lancadas - proxima < 4 * concorrencia:
+                tarefa = asyncio.create_task(buscar_janela(exchange, armazem.symbol, armazem.timeframe,
+                                                           janelas[lancadas], limitador, limit, **opcoes_busca))
+                pendentes[tarefa] = lancadas
+                lancadas += 1
+
+            concluidas, _ = await asyncio.wait(pendentes, return_when=asyncio.FIRST_COMPLETED)
+            for tarefa in concluidas:
+                prontas[pendentes.pop(tarefa)] = tarefa.result() # Repassa o erro de uma janela que desistiu
+
+            while proxima in prontas:
+                lote.extend(prontas.pop(proxima))
+                proxima += 1
+                if len(lote) >= tamanho_lote:
+                    gravar()
+    finally:
+        for tarefa in pendentes:
+            tarefa.cancel()
+        gravar()
+
+    return total_novos
+
+
+# --- 3. Corretora Simulada (testes offline) ---
+# Serve candles sintéticos com latência artificial e devolve "RateLimitExceeded" quando recebe mais
+# pedidos por segundo do que aceita (e, ao acaso, em uma fração `taxa_erros` dos pedidos).
+class RateLimitExceeded(Exception):
+    pass
+
+
+class ExchangeSimulada:
+    def __init__(self, candles, latencia=0.05, pedidos_por_segundo=50, taxa_erros=0.02, seed=0):
+        self.candles = candles
+        self.timestamps = candles[:, 0].astype('i8')
+        self.latencia = latencia
+        self.pedidos_por_segundo = pedidos_por_segundo
+        self.taxa_erros = taxa_erros
+        self._aleatorio = random.Random(seed)
+        self._recentes = []
+        self.requisicoes = 0
+        self.recusadas = 0
+
+    def milliseconds(self):
+        return int(self.timestamps[-1]) + 60_000 + 1_000
+
+    async def fetch_ohlcv(self, symbol, timeframe, since=None, limit=500):
+        agora = time.monotonic()
+        self._recentes = [t for t in self._recentes if agora - t < 1.0] + [agora]
+        self.requisicoes += 1
+        await asyncio.sleep(self.latencia * self._aleatorio.uniform(0.5, 1.5))
+        if len(self._recentes) > self.pedidos_por_segundo or self._aleatorio.random() < self.taxa_erros:
+            self.recusadas += 1
+            raise RateLimitExceeded('binance 429 Too Many Requests')
+        inicio = int(np.searchsorted(self.timestamps, since))
+        return self.candles[inicio:inicio + limit].tolist()
+
+    async def close(self):
+        pass
+
+
+async def simular(minutos, niveis, latencia, pedidos_por_segundo):
+    """Preenche um armazém temporário contra a ExchangeSimulada com cada nível de concorrência."""
+    import tempfile
+
+    from dados_sinteticos import gerar_candles
+
+    inicio = int(pd.Timestamp('2024-01-01').value // 10**6)
+    candles = gerar_candles(inicio, minutos)
+    print(f"{'concorrência':>12s} {'segundos':>9s} {'requisições':>12s} {'recusadas':>10s} {'conferido':>10s}")
+    for concorrencia in niveis:
+        exchange = ExchangeSimulada(candles, latencia=latencia, pedidos_por_segundo=pedidos_por_segundo)
+        # O limitador fica um pouco abaixo do limite do servidor, como com a corretora de verdade
+        limitador = LimitadorTaxa(pedidos_por_segundo * FRACAO_DO_LIMITE, capacidade=concorrencia)
+        with tempfile.TemporaryDirectory() as raiz:
+            armazem = ArmazemCandles(SYMBOL, TIMEFRAME, raiz=raiz)
+            t0 = time.perf_counter()
+            await preencher(exchange, armazem, inicio, limitador=limitador, concorrencia=concorrencia,
+                            peso=1, espera_inicial=0.05, espera_maxima=1.0)
+            segundos = time.perf_counter() - t0
+            gravado = armazem.ler_intervalo(colunas=('timestamp', 'close'))
+            conferido = (np.array_equal(gravado['timestamp'], candles[:, 0].astype('i8'))
+                         and np.allclose(gravado['close'], candles[:, 4]))
+        print(f"{concorrencia:12d} {segundos:9.2f} {exchange.requisicoes:12d} {exchange.recusadas:10d} {str(conferido):>10s}")
+
+
+# --- 4. Execução ---
+async def main():
+    import ccxt.async_support as ccxt_async
+
+    exchange = ccxt_async.binance()
+    armazem = ArmazemCandles(SYMBOL, TIMEFRAME)
+    try:
+        ultimo = armazem.ultimo_timestamp()
+        since = exchange.parse8601(DATA_INICIAL) if ultimo is None else ultimo + duracao_timeframe_ms(TIMEFRAME)
+        print(f"Preenchendo {SYMBOL} {TIMEFRAME} a partir de {pd.to_datetime(since, unit='ms')} "
+              f"({CONCORRENCIA} páginas em paralelo).")
+        inicio = time.perf_counter()
+        novos = await preencher(exchange, armazem, since)
+        print(f"Concluído: {novos} candles novos em {time.perf_counter() - inicio:.0f}s. "
+              f"O armazém '{armazem.diretorio}' tem agora {len(armazem)} candles.")
+    finally:
+        await exchange.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Preenchimento concorrente do histórico de candles.')
+    parser.add_argument('--simulado', action='store_true', help='Roda offline contra uma corretora simulada')
+    parser.add_argument('--minutos', type=int, default=200_000, help='Candles da corretora simulada')
+    parser.add_argument('--niveis', type=int, nargs='+', default=[1, 4, 16], help='Concorrências a comparar')
+    parser.add_argument('--latencia', type=float, default=0.05, help='Latência média (s) da corretora simulada')
+    parser.add_argument('--pedidos-por-segundo', type=int, default=100, help='Limite da corretora simulada')
+    args = parser.parse_args()
+
+    if args.simulado:
+        asyncio.run(simular(args.minutos, args.niveis, args.latencia, args.pedidos_por_segundo))
+    else:
+        try:
+            asyncio.run(main())
+        except Exception as e:
+            print(f"Erro fatal: {e}")
@@ -1,42 +1,46 @@
-import ccxt
 import pandas as pd
 import numpy as np
-from sklearn.preprocessing import MinMaxScaler
-from tensorflow.keras.models import load_model
+from previsao_multipasso import PrevisorMultipasso
+from fontes_candles import FonteCompartilhada
+from registro_modelos import carregar_atual
 import matplotlib.pyplot as plt
 import time
 
 # --- 1. Configurações ---
-LOOK_BACK = 30
 FORECAST_HORIZON = 10 # Quantos minutos à frente queremos prever
 
-# Nomes dos arquivos
-TRAIN_FILE = 'Data/dados_treino.csv'
-VALIDATION_FILE = 'Data/dados_validacao.csv'
-TEST_FILE = 'Data/dados_teste.csv'
+# Nomes dos arquivos (o LOOK_BACK vem do artefato do normalizador gravado junto com o modelo;
+# com o registro de modelos, vale a versão ativa dele)
 MODEL_FILE = 'modelo_ethereum.h5'
 
+# Intervalos por Monte-Carlo dropout: as amostras de todos os passos vão em um único lote (0 desliga)
+AMOSTRAS_INCERTEZA = 200
+QUANTIS_INTERVALO = (0.05, 0.95) # Faixa de 90%
+
+# False: roda o modelo em NumPy (lstm_numpy.py), sem importar o TensorFlow (inicialização bem mais rápida)
+USAR_TENSORFLOW = False
+
 # --- 2. Carregar o Modelo e Preparar o Scaler ---
 print("Carregando o modelo e preparando o normalizador...")
 try:
-    model = load_model(MODEL_FILE)
-    df_train = pd.read_csv(TRAIN_FILE)
+    versao, model, scaler = carregar_atual(MODEL_FILE, USAR_TENSORFLOW)
 except Exception as e:
     print(f"Erro ao carregar arquivos: {e}")
     exit()
 
-scaler = MinMaxScaler(feature_range=(0, 1))
-scaler.fit(df_train['close'].values.reshape(-1, 1))
+LOOK_BACK = scaler.look_back
+previsor = PrevisorMultipasso(model, LOOK_BACK)
 
 # --- 3. Buscar Dados Iniciais e os Dados Reais Futuros ---
 points_to_fetch = LOOK_BACK + FORECAST_HORIZON
-print(f"Buscando os últimos {points_to_fetch} minutos de dados da Binance...")
 try:
-    exchange = ccxt.binance()
-    ohlcv = exchange.fetch_ohlcv('ETH/USDT', '1m', limit=points_to_fetch + 5)
-    
-    df_live = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-    df_live = df_live.tail(points_to_fetch)
+    # Da memória compartilhada quando o alimentador está rodando (janela_compartilhada.py); senão, da Binance
+    fonte = FonteCompartilhada('ETH/USDT', '1m')
+    origem = 'memória compartilhada' if fonte.compartilhada else 'Binance'
+    print(f"Buscando os últimos {points_to_fetch} minutos de dados ({origem})...")
+    ohlcv = fonte.ultimos(points_to_fetch)
+
+    df_live = pd.DataFrame(np.asarray(ohlcv), columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
 
     if len(df_live) < points_to_fetch:
         print("Não foi possível obter dados suficientes. Tente novamente.")
@@ -55,26 +59,21 @@ print("Dados obtidos. Iniciando o processo de previsão autorregressiva...")
 # Normaliza a sequência inicial
 current_sequence_scaled = scaler.transform(initial_sequence['close'].values.reshape(-1, 1))
 
-# Lista para armazenar as previsões
-future_predictions_scaled = []
-
-for i in range(FORECAST_HORIZON):
-    # Prepara a sequência para o formato do LSTM
-    X_predict = np.reshape(current_sequence_scaled, (1, LOOK_BACK, 1))
-    
-    # Faz a previsão de 1 passo à frente
-    next_prediction_scaled = model.predict(X_predict, verbose=0)
-    
-    # Armazena a previsão
-    future_predictions_scaled.append(next_prediction_scaled[0][0])
-    
-    # ** A Mágica Autorregressiva **
-    # Atualiza a sequência: remove o primeiro valor e adiciona a nova previsão no final
-    current_sequence_scaled = np.append(current_sequence_scaled[1:], next_prediction_scaled, axis=0)
+# ** A Mágica Autorregressiva **
+# Cada previsão entra no fim da janela para prever o passo seguinte. O PrevisorMultipasso faz isso
+# sobre um buffer pré-alocado, com uma chamada compilada do modelo por passo (sem model.predict)
+future_predictions_scaled = previsor.prever(current_sequence_scaled.ravel(), FORECAST_HORIZON)
+
+# Incerteza: AMOSTRAS_INCERTEZA trajetórias com o Dropout ativo, todas no mesmo lote
+if AMOSTRAS_INCERTEZA:
+    _, bands_scaled = previsor.prever_intervalos(current_sequence_scaled.ravel(), FORECAST_HORIZON,
+                                                 AMOSTRAS_INCERTEZA, QUANTIS_INTERVALO)
 
 # --- 5. Pós-processamento e Comparação ---
 # Reverte a normalização das previsões para a escala de dólares
-predicted_prices = scaler.inverse_transform(np.array(future_predictions_scaled).reshape(-1, 1))
+predicted_prices = scaler.inverse_transform(future_predictions_scaled.reshape(-1, 1))
+if AMOSTRAS_INCERTEZA:
+    lower_band, upper_band = scaler.inverse_transform(bands_scaled.reshape(-1, 1)).reshape(bands_scaled.shape)[[0, -1]]
 
 # Pega os preços reais para comparação
 real_prices = actual_future_prices['close'].values
@@ -89,6 +88,9 @@ comparison_df = pd.DataFrame({
     'Preço Real': real_prices,
     'Preço Previsto': predicted_prices.flatten() # .flatten() para transformar em 1D array
 })
+if AMOSTRAS_INCERTEZA:
+    comparison_df['Limite Inferior'] = lower_band
+    comparison_df['Limite Superior'] = upper_band
 print(comparison_df)
 print("="*60)
 
@@ -100,6 +102,9 @@ time_index = np.arange(len(real_prices))
 
 plt.plot(time_index, real_prices, 'bo-', label='Preço Real do Ethereum', markersize=5)
 plt.plot(time_index, predicted_prices, 'ro-', label='Preço Previsto pelo Modelo', alpha=0.7, markersize=5)
+if AMOSTRAS_INCERTEZA:
+    nivel = (QUANTIS_INTERVALO[-1] - QUANTIS_INTERVALO[0]) * 100
+    plt.fill_between(time_index, lower_band, upper_band, color='r', alpha=0.15, label=f'Intervalo de {nivel:.0f}%')
 
 plt.title('Previsão Autorregressiva para os Próximos 10 Minutos')
 plt.xlabel('Minutos no Futuro')
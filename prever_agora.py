@@ -1,81 +1,98 @@
-import ccxt
 import pandas as pd
 import numpy as np
-from sklearn.preprocessing import MinMaxScaler
-from tensorflow.keras.models import load_model
+from lstm_numpy import carregar_modelo
+from normalizador import carregar_normalizador
+from registro_modelos import arquivo_atual
+from cache_previsoes import CachePrevisoes, chave_previsao
+from fontes_candles import FonteCompartilhada
 import time
 
 # --- 1. Configurações ---
-# O LOOK_BACK DEVE ser o mesmo usado no treinamento
-LOOK_BACK = 30 
+# O LOOK_BACK usado no treinamento vem do artefato do normalizador gravado junto com o modelo
 
-# Nomes dos arquivos
-TRAIN_FILE = 'Data/dados_treino.csv'
-VALIDATION_FILE = 'Data/dados_validacao.csv'
-TEST_FILE = 'Data/dados_teste.csv'
+# Nomes dos arquivos (com o registro de modelos, vale a versão ativa dele; ver registro_modelos.py)
 MODEL_FILE = 'modelo_ethereum.h5'
 
-# --- 2. Carregar o Modelo e Preparar o Scaler ---
-print("Carregando o modelo e preparando o normalizador...")
-try:
-    model = load_model(MODEL_FILE)
-    df_train = pd.read_csv(TRAIN_FILE)
-except Exception as e:
-    print(f"Erro ao carregar arquivos necessários: {e}")
-    print("Certifique-se que os arquivos 'modelo_ethereum.h5' e 'dados_treino.csv' estão na pasta.")
-    exit()
+# False: roda o modelo em NumPy (lstm_numpy.py), sem importar o TensorFlow (inicialização bem mais rápida)
+USAR_TENSORFLOW = False
 
-# Ajusta o scaler com os dados de TREINO para garantir consistência
-scaler = MinMaxScaler(feature_range=(0, 1))
-scaler.fit(df_train['close'].values.reshape(-1, 1))
+# Previsões de um mesmo minuto são calculadas uma única vez e compartilhadas por todas as
+# execuções (pessoas, cron) através do cache em SQLite (ver cache_previsoes.py)
+SYMBOL = 'ETH/USDT'
+DURACAO_CANDLE_MS = 60_000
 
-# --- 3. Buscar os Dados Mais Recentes da Binance ---
-# Precisamos de 31 pontos: 30 para a entrada (input) e o 31º como o valor real a ser comparado.
-points_to_fetch = LOOK_BACK + 1
-print(f"\nBuscando os últimos {points_to_fetch} minutos de dados do Ethereum na Binance...")
-try:
-    exchange = ccxt.binance()
-    ohlcv = exchange.fetch_ohlcv('ETH/USDT', '1m', limit=points_to_fetch + 5) # Pega um pouco a mais por segurança
 
-    # Garante que temos exatamente o número de pontos necessários
-    df_live = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-    df_live = df_live.tail(points_to_fetch)
+def calcular_previsao(ultimo_fechado, model_file):
+    """Busca os dados na Binance e prevê o candle `ultimo_fechado` a partir dos LOOK_BACK anteriores."""
+    # --- 2. Carregar o Modelo e Preparar o Scaler ---
+    print("Carregando o modelo e preparando o normalizador...")
+    model = carregar_modelo(model_file, USAR_TENSORFLOW)
+    # O scaler é o mesmo ajustado nos dados de TREINO, lido do artefato (sem reler o conjunto de treino)
+    scaler = carregar_normalizador(model_file, model)
+    LOOK_BACK = scaler.look_back
 
-    if len(df_live) < points_to_fetch:
-        print(f"Erro: A API retornou apenas {len(df_live)} pontos. Tente novamente em um minuto.")
-        exit()
+    # --- 3. Buscar os Dados Mais Recentes da Binance ---
+    # Precisamos de 31 pontos: 30 para a entrada (input) e o 31º como o valor real a ser comparado.
+    # Com o alimentador rodando (janela_compartilhada.py) eles vêm da memória compartilhada, sem requisição
+    points_to_fetch = LOOK_BACK + 1
+    fonte = FonteCompartilhada(SYMBOL, '1m')
+    origem = 'memória compartilhada' if fonte.compartilhada else 'Binance'
+    print(f"\nBuscando os últimos {points_to_fetch} minutos de dados do Ethereum ({origem})...")
+    ohlcv = fonte.ultimos(points_to_fetch)
 
-except Exception as e:
-    print(f"Erro ao buscar dados da Binance: {e}")
-    exit()
+    # Só candles fechados, até o último fechado (o candle em formação não entra)
+    df_live = pd.DataFrame(np.asarray(ohlcv), columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+    df_live = df_live[df_live['timestamp'] <= ultimo_fechado].tail(points_to_fetch)
+
+    if len(df_live) < points_to_fetch or df_live['timestamp'].iloc[-1] != ultimo_fechado:
+        raise RuntimeError("A Binance ainda não publicou o último candle fechado. Tente novamente em alguns segundos.")
 
-print("Dados recentes obtidos com sucesso.")
+    print("Dados recentes obtidos com sucesso.")
 
-# --- 4. Separar Dados de Entrada e o Valor Real ---
-# Os primeiros 30 pontos são a nossa sequência de entrada para o modelo
-input_df = df_live.iloc[:-1] 
+    # --- 4. Separar Dados de Entrada e o Valor Real ---
+    # Os primeiros 30 pontos são a nossa sequência de entrada para o modelo
+    input_df = df_live.iloc[:-1]
 
-# O último ponto (o 31º) é o nosso "alvo", o valor real que queremos comparar
-actual_df = df_live.iloc[-1:]
+    # O último ponto (o 31º) é o nosso "alvo", o valor real que queremos comparar
+    actual_df = df_live.iloc[-1:]
 
-# Extrair os valores de 'close'
-input_data_close = input_df['close'].values.reshape(-1, 1)
-actual_price_real = actual_df['close'].iloc[0]
-actual_time = pd.to_datetime(actual_df['timestamp'].iloc[0], unit='ms')
+    # --- 5. Pré-processar, Prever e Pós-processar ---
+    # Normaliza a sequência de entrada e remodela para o formato do LSTM [1, look_back, 1]
+    scaled_input_data = scaler.transform(input_df['close'].values.reshape(-1, 1))
+    X_predict = np.reshape(scaled_input_data, (1, LOOK_BACK, 1))
 
-# --- 5. Pré-processar, Prever e Pós-processar ---
-# Normaliza a sequência de entrada
-scaled_input_data = scaler.transform(input_data_close)
+    # Faz a previsão
+    print(f"Realizando a previsão com base nos {LOOK_BACK} minutos anteriores...")
+    predicted_price_scaled = model.predict(X_predict)
 
-# Remodela para o formato do LSTM [1, look_back, 1]
-X_predict = np.reshape(scaled_input_data, (1, LOOK_BACK, 1))
+    # Reverte a previsão para a escala de dólares
+    predicted_price = scaler.inverse_transform(predicted_price_scaled)[0][0]
+    return {'real': float(actual_df['close'].iloc[0]), 'previsto': float(predicted_price), 'look_back': LOOK_BACK}
+
+
+# O último candle fechado sai do relógio local, sem perguntar à corretora (um acerto no cache não usa a rede)
+ultimo_fechado = int(time.time() * 1000) // DURACAO_CANDLE_MS * DURACAO_CANDLE_MS - DURACAO_CANDLE_MS
+inicio = time.perf_counter()
+try:
+    # O arquivo é resolvido uma vez: a chave do cache e a previsão usam a mesma versão do modelo
+    versao, model_file = arquivo_atual(MODEL_FILE)
+    cache = CachePrevisoes()
+    chave = chave_previsao(model_file, SYMBOL, ultimo_fechado, horizonte=1)
+    resultado, do_cache = cache.obter_ou_calcular(chave, lambda: calcular_previsao(ultimo_fechado, model_file))
+except FileNotFoundError as e:
+    print(f"Erro ao carregar arquivos necessários: {e}")
+    print("Certifique-se que os arquivos 'modelo_ethereum.h5' e 'modelo_ethereum_normalizador.json' estão na pasta.")
+    exit()
+except Exception as e:
+    print(f"Erro ao calcular a previsão: {e}")
+    exit()
 
-# Faz a previsão
-print("Realizando a previsão com base nos 30 minutos anteriores...")
-predicted_price_scaled = model.predict(X_predict)
+origem = 'cache' if do_cache else 'calculada agora'
+print(f"\nPrevisão obtida em {(time.perf_counter() - inicio) * 1000:.1f} ms ({origem}).")
 
-# Reverte a previsão para a escala de dólares
-predicted_price = scaler.inverse_transform(predicted_price_scaled)[0][0]
+actual_price_real = resultado['real']
+predicted_price = resultado['previsto']
+actual_time = pd.to_datetime(ultimo_fechado, unit='ms')
 
 # --- 6. Comparar e Mostrar o Resultado ---
 diferenca_abs = predicted_price - actual_price_real
@@ -84,7 +101,7 @@ diferenca_perc = (diferenca_abs / actual_price_real) * 100
 print("\n" + "="*50)
 print("       VERIFICAÇÃO DA ÚLTIMA PREVISÃO")
 print("="*50)
-print(f"Dados de entrada:       Últimos 30 min antes de {actual_time}")
+print(f"Dados de entrada:       Últimos {resultado['look_back']} min antes de {actual_time}")
 print(f"Previsão para o minuto: {actual_time}")
 print("-"*50)
 print(f"Preço Real:             ${actual_price_real:.2f}")
@@ -1,137 +1,234 @@
-import ccxt
 import pandas as pd
-import numpy as np
-from sklearn.preprocessing import MinMaxScaler
-from tensorflow.keras.models import load_model
-import matplotlib.pyplot as plt
+from registro_modelos import RegistroModelos, RecarregadorModelo, carregar_atual
+from preditor_continuo import PreditorContinuo
+from fontes_candles import FonteCompartilhada, FonteReplay
+from metricas import Metricas, LIMITES_ERRO
+from registro_previsoes import RegistroPrevisoes
+from Data.armazem_candles import ArmazemCandles
+import os
+import threading
 import time
-from datetime import datetime, timedelta
+from datetime import datetime
 
 # --- 1. Configurações ---
-LOOK_BACK = 30
 RUN_DURATION_MINUTES = 10
 
-# Nomes dos arquivos
-TRAIN_FILE = 'Data/dados_treino.csv'
-VALIDATION_FILE = 'Data/dados_validacao.csv'
-TEST_FILE = 'Data/dados_teste.csv'
-MODEL_FILE = 'modelo_ethereum.h5'
-
-# --- 2. Função de Previsão (igual à anterior) ---
-def fazer_previsao(model, scaler):
-    try:
-        exchange = ccxt.binance()
-        ohlcv = exchange.fetch_ohlcv('ETH/USDT', '1m', limit=LOOK_BACK + 5)
-        df_live = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-        df_live = df_live.tail(LOOK_BACK)
-
-        if len(df_live) < LOOK_BACK:
-            return None, None, None
-
-        last_known_price = df_live['close'].iloc[-1]
-        last_known_time = pd.to_datetime(df_live['timestamp'].iloc[-1], unit='ms')
-
-        live_data_close = df_live['close'].values.reshape(-1, 1)
-        scaled_live_data = scaler.transform(live_data_close)
-        X_predict = np.reshape(scaled_live_data, (1, LOOK_BACK, 1))
-
-        predicted_price_scaled = model.predict(X_predict, verbose=0)
-        predicted_price = scaler.inverse_transform(predicted_price_scaled)[0][0]
-
-        return last_known_price, last_known_time, predicted_price
-    except Exception as e:
-        print(f"  Erro durante a previsão: {e}")
-        return None, None, None
-
-# --- 3. Script Principal com Gráfico ---
+# Nomes dos arquivos (o LOOK_BACK vem do artefato do normalizador gravado junto com o modelo)
+MODEL_FILE = 'modelo_ethereum.h5' # Usado só enquanto nenhuma versão foi publicada no registro (registro_modelos.py)
+# Com o registro, a versão ativada é carregada e aquecida em segundo plano e entra entre duas previsões
+SEGUNDOS_ENTRE_VERIFICACOES = 10
+
+# False: roda o modelo em NumPy (lstm_numpy.py), sem importar o TensorFlow (inicialização bem mais rápida)
+USAR_TENSORFLOW = False
+
+# Fonte dos candles: 'binance' (ao vivo, direto ou pelo alimentador local) ou 'replay' (dados do armazém em Data/candles)
+FONTE = 'binance'
+REPLAY_INICIO = '2025-01-01 00:00:00' # Usado apenas com FONTE = 'replay'
+REPLAY_VELOCIDADE = 60 # O replay anda 60x mais rápido que o tempo real (None = sem espera)
+
+# Métricas por etapa: texto do Prometheus (reescrito a cada ciclo) e uma linha JSON por ciclo
+METRICAS_PROMETHEUS = 'metricas_tempo_real.prom'
+METRICAS_JSON = 'metricas_tempo_real.jsonl'
+# Tempo de trabalho máximo por ciclo (tudo menos a espera pelo fechamento do candle).
+# Acima disso o loop não acompanha mais os candles de 1 minuto.
+ORCAMENTO_CICLO_SEGUNDOS = 60
+
+# Todas as previsões e resultados vão para um registro binário só de anexação (ver registro_previsoes.py);
+# RMSE/MAE/acerto da direção rolantes nas janelas abaixo (em minutos, pelo timestamp dos candles previstos)
+ARQUIVO_REGISTRO = 'registro_previsoes.bin'
+# O replay grava em um registro próprio, refeito a cada sessão: resultados de backtest não entram nas métricas
+# ao vivo e os timestamps do arquivo continuam em ordem (o ler_registro faz busca binária neles)
+ARQUIVO_REGISTRO_REPLAY = 'registro_previsoes_replay.bin'
+JANELAS_METRICAS = (60, 24 * 60)
+# Intervalo de incerteza por Monte-Carlo dropout: AMOSTRAS_INCERTEZA trajetórias em um único lote
+# (0 desliga). QUANTIS_INTERVALO são os limites da faixa (0.05 e 0.95: intervalo de 90%).
+AMOSTRAS_INCERTEZA = 100
+QUANTIS_INTERVALO = (0.05, 0.95)
+# Pontos mantidos no gráfico (a memória da sessão não cresce com a duração)
+PONTOS_GRAFICO = 240
+# True: janela interativa (desenhada na thread principal; as previsões rodam em outra thread).
+# False: sem gráfico (servidores). None: automático, desliga quando não há display.
+MOSTRAR_GRAFICO = None
+
+
+def criar_fonte(look_back):
+    if FONTE == 'replay':
+        inicio = int(pd.Timestamp(REPLAY_INICIO).value // 10**6)
+        armazem = ArmazemCandles('ETH/USDT', '1m')
+        # Carrega um pouco antes do início (janela inicial) e o suficiente para a sessão inteira
+        return FonteReplay.do_armazem(
+            armazem,
+            t0=inicio - look_back * 60_000,
+            t1=inicio + (RUN_DURATION_MINUTES + 1) * 60_000,
+            inicio=inicio,
+            velocidade=REPLAY_VELOCIDADE,
+        )
+    # Lê do alimentador local (janela_compartilhada.py) quando ele está rodando; senão busca na Binance
+    return FonteCompartilhada('ETH/USDT', '1m')
+
+
+def grafico_habilitado():
+    if MOSTRAR_GRAFICO is not None:
+        return MOSTRAR_GRAFICO
+    # Sem display (servidor, container, ssh sem X) não há onde mostrar a janela
+    return os.name == 'nt' or bool(os.environ.get('DISPLAY') or os.environ.get('WAYLAND_DISPLAY'))
+
+
+def executar_sessao(preditor, metricas, registro, grafico=None, recarregador=None):
+    """Loop previsão -> fechamento do candle -> comparação. Roda fora da thread do gráfico."""
+    minutos_executados = 0
+    end_time = time.time() + (RUN_DURATION_MINUTES * 60)
+    while time.time() < end_time and minutos_executados < RUN_DURATION_MINUTES:
+        now = datetime.now()
+        inicio_ciclo = time.perf_counter()
+        metricas.ultimos.clear()
+
+        # 0. Versão nova do modelo já carregada e aquecida? Entra agora, entre duas previsões
+        nova = recarregador.trocar() if recarregador else None
+        if nova is not None:
+            versao, model, scaler = nova
+            preditor.trocar_modelo(model, scaler)
+            metricas.incrementar('trocas_modelo_total', ajuda='Versões do modelo trocadas a quente')
+            print(f"({now.strftime('%H:%M:%S')}) Modelo trocado para a versão {versao}.")
+
+        # 1. Faz a previsão para o próximo minuto (um único forward pass sobre o buffer)
+        try:
+            prediction_ts, prediction = preditor.prever()
+            referencia = preditor.ultimo_close # Último close conhecido, para o acerto da direção
+        except Exception as e:
+            print(f"  Erro durante a previsão: {e}")
+            metricas.incrementar('erros_total', ajuda='Erros por etapa do ciclo', etapa='previsao')
+            time.sleep(60)
+            continue
+
+        prediction_time = pd.to_datetime(prediction_ts, unit='ms')
+        print(f"({now.strftime('%H:%M:%S')}) PREVISÃO para {prediction_time.strftime('%H:%M:%S')}: ${prediction:.2f}")
+        faixa = None
+        if AMOSTRAS_INCERTEZA:
+            _, media, faixas = preditor.prever_intervalos(1, AMOSTRAS_INCERTEZA, QUANTIS_INTERVALO)
+            faixa = (faixas[0, 0], faixas[-1, 0])
+            print(f"  Intervalo {(QUANTIS_INTERVALO[-1] - QUANTIS_INTERVALO[0]) * 100:.0f}%: "
+                  f"${faixa[0]:.2f} a ${faixa[1]:.2f} (média das amostras ${media[0]:.2f})")
+
+        # 2. Aguarda o candle da previsão fechar e o anexa à janela (uma requisição pequena)
+        print(f"  Aguardando o fechamento do candle de {prediction_time.strftime('%H:%M:%S')}...")
+        try:
+            novos_candles = preditor.aguardar_proximo_candle()
+        except Exception as e:
+            print(f"  Erro ao buscar preço real: {e}\n")
+            metricas.incrementar('erros_total', ajuda='Erros por etapa do ciclo', etapa='busca')
+            continue
+        minutos_executados += 1
+
+        if not novos_candles:
+            print("  O candle ainda não foi publicado pela corretora.\n")
+            metricas.incrementar('erros_total', ajuda='Erros por etapa do ciclo', etapa='candle_ausente')
+            continue
+
+        # 3. O primeiro candle novo é o que foi previsto
+        actual_price = novos_candles[0][4] # O 4º índice é o 'close'
+        actual_time = pd.to_datetime(novos_candles[0][0], unit='ms')
+
+        print(f"  PREÇO REAL às {actual_time.strftime('%H:%M:%S')}: ${actual_price:.2f}")
+
+        erro = prediction - actual_price
+        metricas.observar('erro_absoluto_usd', abs(erro), limites=LIMITES_ERRO,
+                          ajuda='Erro absoluto da previsão do próximo minuto')
+        metricas.definir('ultimo_erro_usd', erro, ajuda='Erro (previsto - real) da última previsão')
+        if faixa is not None:
+            # Cobertura = dentro / total: perto do nível nominal (90%) quando o intervalo está bem calibrado
+            metricas.incrementar('intervalos_total', ajuda='Previsões com intervalo de incerteza')
+            if faixa[0] <= actual_price <= faixa[1]:
+                metricas.incrementar('intervalos_dentro_total', ajuda='Preços reais dentro do intervalo previsto')
+            metricas.definir('largura_intervalo_usd', faixa[1] - faixa[0], ajuda='Largura do último intervalo')
+
+        registro.registrar(int(novos_candles[0][0]), 1, prediction, actual_price, referencia)
+        for janela, rolante in registro.metricas(1).items():
+            print(f"  Últimos {janela} min ({rolante['n']} previsões): RMSE ${rolante['rmse']:.2f}, MAE ${rolante['mae']:.2f}, "
+                  f"acerto da direção {rolante['acerto_direcao'] * 100:.1f}%")
+            metricas.definir('rmse_rolante_usd', rolante['rmse'], ajuda='RMSE rolante das previsões', janela=janela)
+            metricas.definir('acerto_direcao_rolante', rolante['acerto_direcao'],
+                             ajuda='Taxa de acerto da direção rolante', janela=janela)
+        print()
+
+        # 4. Entrega o ponto ao gráfico (só copia os valores; o desenho acontece na thread principal)
+        if grafico is not None:
+            grafico.adicionar(int(novos_candles[0][0]), actual_price, prediction)
+
+        # 5. Métricas do ciclo: o trabalho é o ciclo inteiro menos a espera pelo fechamento do candle
+        ciclo = time.perf_counter() - inicio_ciclo
+        trabalho = ciclo - metricas.ultimos.get('espera_fechamento', 0.0)
+        metricas.observar('ciclo_segundos', ciclo, ajuda='Duração total do ciclo (inclui a espera)')
+        metricas.observar('trabalho_segundos', trabalho, ajuda='Duração do ciclo sem a espera pelo candle')
+        metricas.incrementar('ciclos_total', ajuda='Ciclos previsão/comparação concluídos')
+        if trabalho > ORCAMENTO_CICLO_SEGUNDOS:
+            metricas.incrementar('orcamento_estourado_total', ajuda='Ciclos acima do orçamento de 1 minuto')
+            etapas = {k: v for k, v in metricas.ultimos.items() if k != 'espera_fechamento'}
+            etapa_lenta = max(etapas, key=etapas.get)
+            print(f"  ALERTA: ciclo levou {trabalho:.1f}s (orçamento {ORCAMENTO_CICLO_SEGUNDOS}s); etapa mais lenta: {etapa_lenta}\n")
+
+        metricas.salvar_prometheus(METRICAS_PROMETHEUS)
+        metricas.registrar_json(METRICAS_JSON, ciclo=minutos_executados, previsto=prediction, real=actual_price,
+                                erro=erro, ciclo_segundos=ciclo, trabalho_segundos=trabalho)
+
+
+# --- 2. Script Principal com Gráfico ---
 if __name__ == "__main__":
     print("Carregando o modelo e preparando o normalizador...")
     try:
-        model = load_model(MODEL_FILE)
-        df_train = pd.read_csv(TRAIN_FILE)
+        versao, model, scaler = carregar_atual(MODEL_FILE, USAR_TENSORFLOW)
     except Exception as e:
         print(f"Erro fatal ao carregar arquivos: {e}")
         exit()
 
-    scaler = MinMaxScaler(feature_range=(0, 1))
-    scaler.fit(df_train['close'].values.reshape(-1, 1))
-    
-    # --- Configuração do Gráfico Interativo ---
-    plt.ion() # LIGA o modo interativo
-    fig, ax = plt.subplots(figsize=(15, 8))
-    
-    # Listas para armazenar o histórico de preços da sessão
-    timestamps_history = []
-    real_prices_history = []
-    predicted_prices_history = []
-    
-    # Inicia a sessão de previsão
-    start_time = time.time()
-    end_time = start_time + (RUN_DURATION_MINUTES * 60)
-    
+    LOOK_BACK = scaler.look_back
+    print(f"Modelo: {'versão ' + versao if versao else MODEL_FILE} (LOOK_BACK={LOOK_BACK}).")
+    recarregador = RecarregadorModelo(RegistroModelos(), versao, LOOK_BACK, USAR_TENSORFLOW,
+                                      intervalo=SEGUNDOS_ENTRE_VERIFICACOES).iniciar()
+
+    # O preditor busca a janela inicial uma única vez; depois só anexa o candle novo a cada minuto
+    metricas = Metricas()
+    preditor = PreditorContinuo(model, scaler, criar_fonte(LOOK_BACK), metricas=metricas)
+    try:
+        with metricas.cronometrar('janela_inicial'):
+            preditor.inicializar()
+    except Exception as e:
+        print(f"Erro fatal ao buscar a janela inicial: {e}")
+        exit()
+
+    if FONTE == 'replay':
+        if os.path.exists(ARQUIVO_REGISTRO_REPLAY):
+            os.remove(ARQUIVO_REGISTRO_REPLAY)
+        registro = RegistroPrevisoes(ARQUIVO_REGISTRO_REPLAY, JANELAS_METRICAS)
+    else:
+        registro = RegistroPrevisoes(ARQUIVO_REGISTRO, JANELAS_METRICAS)
+    grafico = None
+    if grafico_habilitado():
+        from grafico_ao_vivo import GraficoAoVivo
+        grafico = GraficoAoVivo(PONTOS_GRAFICO, metricas=metricas)
+
     print("\n" + "="*50)
-    print(f"Iniciando sessão com gráfico por {RUN_DURATION_MINUTES} minutos.")
+    print(f"Iniciando sessão {'com' if grafico else 'sem'} gráfico por {RUN_DURATION_MINUTES} minutos.")
     print("="*50 + "\n")
 
-    while time.time() < end_time:
-        now = datetime.now()
-        
-        # 1. Faz a previsão para o próximo minuto
-        last_price, last_time, prediction = fazer_previsao(model, scaler)
-        
-        if prediction is not None:
-            prediction_time = last_time + timedelta(minutes=1)
-            print(f"({now.strftime('%H:%M:%S')}) PREVISÃO para {prediction_time.strftime('%H:%M:%S')}: ${prediction:.2f}")
-
-            # 2. Aguarda o minuto da previsão passar para buscar o preço real
-            seconds_to_wait = 62 - datetime.now().second
-            if time.time() + seconds_to_wait > end_time: break
-            print(f"  Aguardando {seconds_to_wait}s para buscar o preço real...")
-            time.sleep(seconds_to_wait)
-            
-            # 3. Busca o preço real que acabou de se formar
-            try:
-                exchange = ccxt.binance()
-                latest_candle = exchange.fetch_ohlcv('ETH/USDT', '1m', limit=1)
-                actual_price = latest_candle[0][4] # O 4º índice é o 'close'
-                actual_time = pd.to_datetime(latest_candle[0][0], unit='ms')
-
-                print(f"  PREÇO REAL às {actual_time.strftime('%H:%M:%S')}: ${actual_price:.2f}\n")
-
-                # 4. Adiciona os dados ao histórico para plotagem
-                timestamps_history.append(actual_time)
-                real_prices_history.append(actual_price)
-                predicted_prices_history.append(prediction)
-
-                # 5. Atualiza o gráfico
-                ax.clear() # Limpa o gráfico anterior
-                ax.plot(timestamps_history, real_prices_history, 'bo-', label='Preço Real', markersize=5)
-                ax.plot(timestamps_history, predicted_prices_history, 'ro-', label='Preço Previsto', alpha=0.7, markersize=5)
-                
-                # Formatação
-                ax.set_title(f"Previsão em Tempo Real (Última Atualização: {datetime.now().strftime('%H:%M:%S')})")
-                ax.set_ylabel('Preço (USD)')
-                ax.legend()
-                ax.grid(True)
-                plt.xticks(rotation=30)
-                plt.tight_layout()
-                
-                # Redesenha o gráfico
-                fig.canvas.draw()
-                fig.canvas.flush_events()
-                
-            except Exception as e:
-                print(f"  Erro ao buscar preço real: {e}\n")
-
-        else:
-            # Se a previsão falhar, espera um minuto para tentar de novo
-            time.sleep(60)
-
+    if grafico is None:
+        executar_sessao(preditor, metricas, registro, recarregador=recarregador)
+    else:
+        # O matplotlib só pode desenhar na thread principal: as previsões vão para uma thread própria
+        # e a principal fica redesenhando os pontos novos (e mantendo a janela responsiva)
+        sessao = threading.Thread(target=executar_sessao, args=(preditor, metricas, registro, grafico, recarregador),
+                                  daemon=True)
+        sessao.start()
+        grafico.acompanhar(sessao)
+
+    recarregador.parar()
+    registro.fechar()
     print("="*50)
     print("Sessão de previsão concluída.")
+    for etapa, (contagem, media) in metricas.medias('etapa_segundos', 'etapa').items():
+        print(f"  {etapa:20s} {contagem:5d}x  média {media * 1000:9.2f} ms")
     print("="*50)
 
     # Salva o gráfico final
-    plt.savefig('previsao_final_plot.png')
-    plt.ioff() # DESLIGA o modo interativo
-    plt.show() # Mostra o gráfico final e bloqueia o script até fechar
\ No newline at end of file
+    if grafico is not None:
+        grafico.finalizar('previsao_final_plot.png')
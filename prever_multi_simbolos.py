@@ -0,0 +1,90 @@
+import asyncio
+import time
+
+import pandas as pd
+
+from limitador import LimitadorTaxa
+from preditor_multi_simbolos import PreditorMultiSimbolos
+from registro_modelos import RegistroModelos, RecarregadorModelo, carregar_atual
+
+# --- 1. Configurações ---
+MODEL_FILE = 'modelo_ethereum.h5'
+USAR_TENSORFLOW = False
+
+# O normalizador do artefato do modelo vale para o par em que ele foi treinado; os demais
+# pares usam o min/max dos seus últimos candles (ver PreditorMultiSimbolos)
+SYMBOL_DO_MODELO = 'ETH/USDT'
+SIMBOLOS = [
+    'ETH/USDT', 'BTC/USDT', 'BNB/USDT', 'SOL/USDT', 'XRP/USDT', 'ADA/USDT', 'DOGE/USDT', 'AVAX/USDT',
+    'DOT/USDT', 'LINK/USDT', 'LTC/USDT', 'TRX/USDT', 'ATOM/USDT', 'UNI/USDT', 'ETC/USDT', 'NEAR/USDT',
+]
+HORIZONTE = 1
+RUN_DURATION_MINUTES = 10
+
+# Limite compartilhado por todas as buscas (a Binance aceita bem mais; fica uma folga para outros scripts)
+REQUISICOES_POR_SEGUNDO = 10
+RAJADA = 20
+MARGEM_SEGUNDOS = 2 # Espera depois do fechamento do candle antes de buscar
+
+
+async def executar(preditor, exchange, recarregador=None):
+    await preditor.inicializar()
+    for symbol, erro in preditor.erros.items():
+        print(f"  Aviso: {symbol} ficou de fora na inicialização: {erro}")
+
+    for _ in range(RUN_DURATION_MINUTES):
+        # Espera o próximo candle fechar (com uma margem para a corretora publicar)
+        duracao_s = preditor.duracao / 1000
+        agora = exchange.milliseconds() / 1000
+        await asyncio.sleep(duracao_s - agora % duracao_s + MARGEM_SEGUNDOS)
+
+        # Versão nova do modelo já carregada e aquecida (ex.: `registro_modelos.py reverter`)? Entra entre dois minutos
+        nova = recarregador.trocar() if recarregador else None
+        if nova is not None:
+            versao, model, scaler = nova
+            preditor.trocar_modelo(model, scaler, SYMBOL_DO_MODELO)
+            print(f"\nModelo trocado para a versão {versao}.")
+
+        inicio = time.perf_counter()
+        await preditor.atualizar()
+        busca = time.perf_counter() - inicio
+        ultimo_fechado = int(exchange.milliseconds() // preditor.duracao * preditor.duracao) - preditor.duracao
+
+        inicio = time.perf_counter()
+        previsoes = preditor.prever(HORIZONTE, ate=ultimo_fechado)
+        modelo = time.perf_counter() - inicio
+
+        horario = pd.to_datetime(ultimo_fechado + preditor.duracao, unit='ms').strftime('%H:%M')
+        print(f"\nPrevisões para {horario} ({len(previsoes)}/{len(SIMBOLOS)} símbolos; "
+              f"busca {busca * 1000:.0f} ms, modelo {modelo * 1000:.1f} ms em um lote):")
+        for symbol, (timestamps, precos) in previsoes.items():
+            atual = preditor.ultimo_close[symbol]
+            print(f"  {symbol:12s} atual {atual:12.4f}  previsto {precos[0]:12.4f}  ({(precos[0] / atual - 1) * 100:+.3f}%)")
+        for symbol, erro in preditor.erros.items():
+            print(f"  {symbol:12s} erro: {erro}")
+
+
+async def main():
+    import ccxt.async_support as ccxt_async
+
+    # A versão ativa do registro (ou o MODEL_FILE solto, sem registro); versões publicadas depois entram a quente
+    versao, model, scaler = carregar_atual(MODEL_FILE, USAR_TENSORFLOW)
+    print(f"Modelo: {'versão ' + versao if versao else MODEL_FILE} (LOOK_BACK={scaler.look_back}).")
+    recarregador = RecarregadorModelo(RegistroModelos(), versao, scaler.look_back, USAR_TENSORFLOW).iniciar()
+
+    exchange = ccxt_async.binance()
+    limitador = LimitadorTaxa(REQUISICOES_POR_SEGUNDO, RAJADA)
+    preditor = PreditorMultiSimbolos(model, exchange, SIMBOLOS, limitador, scaler.look_back,
+                                     normalizadores={SYMBOL_DO_MODELO: scaler})
+    try:
+        await executar(preditor, exchange, recarregador)
+    finally:
+        recarregador.parar()
+        await exchange.close()
+
+
+if __name__ == '__main__':
+    try:
+        asyncio.run(main())
+    except Exception as e:
+        print(f"Erro fatal: {e}")
@@ -0,0 +1,73 @@
+import numpy as np
+
+
+def compilar_passo(model, look_back, dropout=False):
+    """Chamada direta do modelo compilada com tf.function (um único trace para qualquer tamanho de lote).
+
+    Evita o model.predict, que é feito para datasets grandes e custa alguns milissegundos por chamada.
+    Modelos em NumPy (lstm_numpy.ModeloNumpy) já são chamadas diretas e não passam pelo TensorFlow.
+    Com `dropout=True` as camadas Dropout ficam ativas (training=True), para a amostragem Monte-Carlo.
+    """
+    if hasattr(model, 'propagar'):
+        return (lambda janelas: model.propagar(janelas, dropout=True)) if dropout else model.propagar
+
+    import tensorflow as tf
+
+    @tf.function(input_signature=[tf.TensorSpec([None, look_back, 1], tf.float32)])
+    def passo(janelas):
+        return model(janelas, training=dropout)
+
+    return lambda janelas: passo(janelas).numpy()
+
+
+# --- Previsão Autorregressiva em Vários Passos ---
+# Cada previsão é escrita logo depois da janela em um buffer pré-alocado de
+# [N, look_back + horizonte, 1]; a entrada do passo seguinte é só uma fatia desse buffer.
+# Com N janelas iniciais, cada passo é UM forward pass em lote: o custo de 1.000
+# previsões simultâneas de 10 passos é de 10 chamadas ao modelo.
+class PrevisorMultipasso:
+    def __init__(self, model, look_back=None):
+        self.model = model
+        self.look_back = look_back or model.input_shape[1]
+        self._passo = compilar_passo(model, self.look_back)
+        self._passo_dropout = None # Compilado na primeira chamada de prever_intervalos
+
+    def _rolar(self, passo, janelas, horizonte):
+        buffer = np.empty((len(janelas), self.look_back + horizonte, 1), dtype=np.float32)
+        buffer[:, :self.look_back, 0] = janelas
+        for i in range(horizonte):
+            saida = passo(buffer[:, i:i + self.look_back])
+            buffer[:, self.look_back + i, 0] = saida[:, 0]
+        return buffer[:, self.look_back:, 0]
+
+    def prever(self, janelas, horizonte):
+        """Prevê `horizonte` passos a partir de uma ou várias janelas JÁ NORMALIZADAS.
+
+        `janelas` pode ter shape (look_back,), (N, look_back) ou (N, look_back, 1).
+        Retorna as previsões normalizadas com shape (horizonte,) ou (N, horizonte).
+        """
+        janelas = np.asarray(janelas, dtype=np.float32)
+        unica = janelas.ndim == 1
+        previsoes = self._rolar(self._passo, janelas.reshape(-1, self.look_back), horizonte)
+        return previsoes[0] if unica else previsoes
+
+    def prever_intervalos(self, janelas, horizonte, amostras=100, quantis=(0.05, 0.5, 0.95)):
+        """Média e quantis de `amostras` trajetórias com o Dropout ativo (Monte-Carlo dropout).
+
+        Cada janela é repetida `amostras` vezes e todas as cópias vão juntas no mesmo lote: o custo é o
+        de `horizonte` forward passes em lote, não de `amostras` chamadas separadas. Em vários passos,
+        cada trajetória realimenta a própria amostra, então a faixa abre com o horizonte.
+        Retorna (media, faixas): media com shape (horizonte,) ou (N, horizonte) e faixas com um
+        eixo a mais na frente, um por quantil. Tudo normalizado, como em prever().
+        """
+        if self._passo_dropout is None:
+            self._passo_dropout = compilar_passo(self.model, self.look_back, dropout=True)
+        janelas = np.asarray(janelas, dtype=np.float32)
+        unica = janelas.ndim == 1
+        janelas = janelas.reshape(-1, self.look_back)
+
+        lote = np.repeat(janelas, amostras, axis=0)
+        trajetorias = self._rolar(self._passo_dropout, lote, horizonte).reshape(len(janelas), amostras, horizonte)
+        media = trajetorias.mean(axis=1)
+        faixas = np.quantile(trajetorias, quantis, axis=1)
+        return (media[0], faixas[:, 0]) if unica else (media, faixas)
@@ -0,0 +1,206 @@
+import json
+import os
+import re
+import shutil
+import threading
+import time
+
+import numpy as np
+
+from normalizador import caminho_artefato, carregar_normalizador
+
+# --- Registro de Modelos Versionado ---
+# Cada versão publicada é uma pasta imutável com o modelo e o artefato do normalizador:
+#   modelos/v0001/modelo_ethereum.h5 + modelo_ethereum_normalizador.json
+#   modelos/v0002/...
+#   modelos/atual.json -> {"versao": "v0002", "anterior": "v0001", "ativado_em": ...}
+# O treino grava em outro lugar e só publica o arquivo pronto; a pasta da versão aparece de uma vez
+# (os.rename) e o ponteiro atual.json é trocado de uma vez (os.replace). Um leitor vê a versão antiga
+# ou a nova inteira, nunca um .h5 pela metade. A versão anterior continua lá para reverter na hora.
+DIRETORIO_MODELOS = 'modelos'
+ARQUIVO_ATUAL = 'atual.json'
+NOME_MODELO = 'modelo_ethereum.h5'
+
+
+class RegistroModelos:
+    def __init__(self, raiz=DIRETORIO_MODELOS):
+        self.raiz = raiz
+
+    def versoes(self):
+        if not os.path.isdir(self.raiz):
+            return []
+        return sorted(nome for nome in os.listdir(self.raiz) if re.fullmatch(r'v\d{4,}', nome))
+
+    def caminho_modelo(self, versao):
+        return os.path.join(self.raiz, versao, NOME_MODELO)
+
+    def atual(self):
+        """Conteúdo do ponteiro ({'versao', 'anterior', 'ativado_em'}) ou None se nada foi publicado."""
+        try:
+            with open(os.path.join(self.raiz, ARQUIVO_ATUAL)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def publicar(self, model_file, ativar=True):
+        """Copia o modelo e o artefato do normalizador para uma versão nova. Retorna o nome da versão."""
+        # Confere antes de publicar: o artefato precisa existir e pertencer a este modelo
+        carregar_normalizador(model_file)
+        os.makedirs(self.raiz, exist_ok=True)
+        versoes = self.versoes()
+        versao = f"v{int(versoes[-1][1:]) + 1 if versoes else 1:04d}"
+
+        temporario = os.path.join(self.raiz, f'.{versao}.tmp')
+        shutil.rmtree(temporario, ignore_errors=True)
+        os.makedirs(temporario)
+        shutil.copyfile(model_file, os.path.join(temporario, NOME_MODELO))
+        shutil.copyfile(caminho_artefato(model_file), caminho_artefato(os.path.join(temporario, NOME_MODELO)))
+        os.rename(temporario, os.path.join(self.raiz, versao))
+
+        if ativar:
+            self.ativar(versao)
+        return versao
+
+    def ativar(self, versao):
+        """Aponta o 'atual' para `versao`; a versão que estava ativa vira a 'anterior'."""
+        if not os.path.exists(self.caminho_modelo(versao)):
+            raise FileNotFoundError(f"A versão '{versao}' não existe em '{self.raiz}'.")
+        atual = self.atual()
+        anterior = atual['versao'] if atual and atual['versao'] != versao else (atual or {}).get('anterior')
+        caminho = os.path.join(self.raiz, ARQUIVO_ATUAL)
+        with open(caminho + '.tmp', 'w') as f:
+            json.dump({'versao': versao, 'anterior': anterior, 'ativado_em': time.time()}, f)
+        os.replace(caminho + '.tmp', caminho)
+
+    def reverter(self):
+        """Volta para a versão anterior. Retorna o nome da versão reativada."""
+        atual = self.atual()
+        if not atual or not atual.get('anterior'):
+            raise RuntimeError("Não há versão anterior para reverter.")
+        self.ativar(atual['anterior'])
+        return atual['anterior']
+
+    def carregar(self, versao=None, usar_tensorflow=False):
+        """(versao, model, scaler) da versão pedida ou da atual."""
+        from lstm_numpy import carregar_modelo
+
+        if versao is None:
+            atual = self.atual()
+            if atual is None:
+                raise FileNotFoundError(f"Nenhuma versão publicada em '{self.raiz}'.")
+            versao = atual['versao']
+        model_file = self.caminho_modelo(versao)
+        model = carregar_modelo(model_file, usar_tensorflow)
+        return versao, model, carregar_normalizador(model_file, model)
+
+
+def arquivo_atual(model_file, raiz=DIRETORIO_MODELOS):
+    """(versao, caminho do .h5) da versão atual do registro; sem registro, o `model_file` solto (versao None)."""
+    registro = RegistroModelos(raiz)
+    atual = registro.atual()
+    if atual is None:
+        return None, model_file
+    return atual['versao'], registro.caminho_modelo(atual['versao'])
+
+
+def carregar_atual(model_file, usar_tensorflow=False, raiz=DIRETORIO_MODELOS):
+    """(versao, model, scaler) da versão atual do registro; sem registro, o `model_file` solto (versao None)."""
+    from lstm_numpy import carregar_modelo
+
+    versao, caminho = arquivo_atual(model_file, raiz)
+    model = carregar_modelo(caminho, usar_tensorflow)
+    return versao, model, carregar_normalizador(caminho, model)
+
+
+def aquecer(model, scaler):
+    """Um forward pass descartável (no TensorFlow, faz o trace antes da primeira previsão de verdade)."""
+    from previsao_multipasso import PrevisorMultipasso
+
+    PrevisorMultipasso(model, scaler.look_back).prever(np.zeros(scaler.look_back, dtype=np.float32), 1)
+
+
+# --- Recarga a Quente ---
+# Uma thread observa o ponteiro; quando ele muda, carrega e aquece a versão nova em segundo plano.
+# O processo de previsão chama trocar() entre duas previsões: se houver uma versão pronta, recebe
+# (versao, model, scaler) e troca as referências. Nenhum minuto fica sem previsão durante a carga.
+class RecarregadorModelo:
+    def __init__(self, registro, versao=None, look_back=None, usar_tensorflow=False, intervalo=5.0):
+        """`versao` é a versão em uso; com `look_back`, versões com outra janela são recusadas."""
+        self.registro = registro
+        self.versao = versao
+        self.look_back = look_back
+        self.usar_tensorflow = usar_tensorflow
+        self.intervalo = intervalo
+        self._trava = threading.Lock()
+        self._pronta = None
+        self._alvo = versao # última versão carregada (ou tentada) em segundo plano
+        self._parar = threading.Event()
+        self._thread = None
+        self.erros = {} # versão -> mensagem de erro da carga
+
+    def iniciar(self):
+        self._thread = threading.Thread(target=self._observar, daemon=True)
+        self._thread.start()
+        return self
+
+    def parar(self):
+        self._parar.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _observar(self):
+        while not self._parar.is_set():
+            atual = self.registro.atual()
+            if atual is not None and atual['versao'] != self._alvo:
+                self._preparar(atual['versao'])
+            self._parar.wait(self.intervalo)
+
+    def _preparar(self, versao):
+        self._alvo = versao
+        try:
+            versao, model, scaler = self.registro.carregar(versao, self.usar_tensorflow)
+            if self.look_back is not None and scaler.look_back != self.look_back:
+                raise ValueError(f"LOOK_BACK {scaler.look_back} diferente do usado pelo processo ({self.look_back}).")
+            aquecer(model, scaler)
+        except Exception as e:
+            # A versão em uso continua; a recusada só é tentada de novo se o ponteiro mudar
+            self.erros[versao] = str(e)
+            print(f"Versão {versao} do modelo recusada: {e}")
+            return
+        with self._trava:
+            self._pronta = (versao, model, scaler)
+
+    def trocar(self):
+        """Devolve (versao, model, scaler) se uma versão nova já está carregada e aquecida; senão None."""
+        with self._trava:
+            pronta, self._pronta = self._pronta, None
+        if pronta is None or pronta[0] == self.versao:
+            return None
+        self.versao = pronta[0]
+        return pronta
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Registro versionado de modelos.')
+    parser.add_argument('comando', choices=['listar', 'publicar', 'ativar', 'reverter'])
+    parser.add_argument('alvo', nargs='?', help="Arquivo .h5 (publicar) ou versão (ativar)")
+    parser.add_argument('--raiz', default=DIRETORIO_MODELOS)
+    args = parser.parse_args()
+
+    registro = RegistroModelos(args.raiz)
+    try:
+        if args.comando == 'publicar':
+            print(f"Publicada e ativada a versão {registro.publicar(args.alvo or NOME_MODELO)}.")
+        elif args.comando == 'ativar':
+            registro.ativar(args.alvo)
+            print(f"Versão {args.alvo} ativada.")
+        elif args.comando == 'reverter':
+            print(f"Versão {registro.reverter()} reativada.")
+        atual = registro.atual() or {}
+        for versao in registro.versoes():
+            marca = ' (atual)' if versao == atual.get('versao') else ' (anterior)' if versao == atual.get('anterior') else ''
+            print(f"  {versao}{marca}")
+    except Exception as e:
+        print(f"Erro: {e}")
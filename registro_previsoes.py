@@ -0,0 +1,125 @@
+import os
+from collections import deque
+
+import numpy as np
+
+# --- Registro Durável de Previsões e Resultados ---
+# Cada par (previsão, preço real) vira um registro binário de tamanho fixo, anexado ao fim de um
+# arquivo que nunca é reescrito. Para consultar semanas de histórico basta um memmap do arquivo
+# (np.memmap + searchsorted no timestamp), sem parse de texto.
+# As métricas rolantes (RMSE, MAE, taxa de acerto da direção) são mantidas com somas corridas:
+# cada resultado novo soma sua contribuição e subtrai a dos que saíram da janela de tempo, O(1) amortizado.
+
+ARQUIVO_REGISTRO = 'registro_previsoes.bin'
+JANELAS_PADRAO = (60, 24 * 60) # Última hora e último dia (em minutos, pelo timestamp dos candles previstos)
+
+# ts: timestamp (ms) do candle previsto; referencia: último close conhecido quando a previsão foi feita
+REGISTRO = np.dtype([
+    ('ts', '<i8'), ('horizonte', '<i4'), ('previsto', '<f8'), ('real', '<f8'), ('referencia', '<f8'),
+])
+
+
+class MetricasRolantes:
+    """RMSE, MAE e taxa de acerto da direção dos resultados dos últimos `minutos` minutos, em O(1) amortizado.
+
+    A janela anda com o timestamp do resultado mais novo: resultados de uma sessão antiga saem assim que
+    chega o primeiro resultado da sessão nova.
+    """
+
+    def __init__(self, minutos):
+        self.minutos = minutos
+        self._duracao = minutos * 60_000
+        # Uma linha por resultado: ts, erro², |erro|, acerto (0/1)
+        self._valores = deque()
+        self._somas = np.zeros(3, dtype=np.float64)
+        self._desde_recalculo = 0
+
+    @property
+    def n(self):
+        return len(self._valores)
+
+    def adicionar(self, ts, previsto, real, referencia):
+        erro = previsto - real
+        acerto = float(np.sign(previsto - referencia) == np.sign(real - referencia))
+        novo = (erro * erro, abs(erro), acerto)
+        self._valores.append((ts,) + novo)
+        self._somas += novo
+        limite = ts - self._duracao
+        while self._valores[0][0] <= limite:
+            self._somas -= self._valores.popleft()[1:]
+
+        # Somas corridas acumulam erro de arredondamento; depois de tantas atualizações quanto o tamanho da
+        # janela elas são refeitas a partir dos valores (custo O(n) a cada n atualizações: O(1) amortizado)
+        self._desde_recalculo += 1
+        if self._desde_recalculo >= len(self._valores):
+            self._somas = np.array([linha[1:] for linha in self._valores]).sum(axis=0)
+            self._desde_recalculo = 0
+
+    def resultado(self):
+        if self.n == 0:
+            return {'n': 0, 'rmse': float('nan'), 'mae': float('nan'), 'acerto_direcao': float('nan')}
+        quadrado, absoluto, acertos = np.maximum(self._somas, 0.0) / self.n
+        return {'n': self.n, 'rmse': float(np.sqrt(quadrado)), 'mae': float(absoluto), 'acerto_direcao': float(acertos)}
+
+
+class RegistroPrevisoes:
+    def __init__(self, caminho=ARQUIVO_REGISTRO, janelas=JANELAS_PADRAO):
+        self.caminho = caminho
+        self.janelas = tuple(janelas)
+        self._metricas = {} # horizonte -> {janela: MetricasRolantes}
+        if os.path.exists(caminho) and os.path.getsize(caminho) % REGISTRO.itemsize:
+            # Descarta um registro cortado no meio, para os próximos ficarem alinhados
+            with open(caminho, 'r+b') as f:
+                f.truncate(os.path.getsize(caminho) // REGISTRO.itemsize * REGISTRO.itemsize)
+        self._retomar()
+        self._arquivo = open(caminho, 'ab')
+
+    def _rolantes(self, horizonte):
+        if horizonte not in self._metricas:
+            self._metricas[horizonte] = {janela: MetricasRolantes(janela) for janela in self.janelas}
+        return self._metricas[horizonte]
+
+    def _retomar(self):
+        # Uma sessão nova continua as janelas de onde a anterior parou: relê só a maior janela antes do último
+        # resultado (busca binária no timestamp). Se ela for antiga, sai das janelas com o primeiro resultado novo
+        ultimo = ler_registro(self.caminho, ultimos=1)
+        if len(ultimo) == 0:
+            return
+        registros = ler_registro(self.caminho, t0=int(ultimo['ts'][0]) - max(self.janelas) * 60_000)
+        for registro in registros:
+            for rolante in self._rolantes(int(registro['horizonte'])).values():
+                rolante.adicionar(int(registro['ts']), registro['previsto'], registro['real'], registro['referencia'])
+
+    def registrar(self, ts, horizonte, previsto, real, referencia):
+        """Anexa um resultado ao arquivo e atualiza as métricas rolantes do horizonte."""
+        registro = np.array([(ts, horizonte, previsto, real, referencia)], dtype=REGISTRO)
+        self._arquivo.write(registro.tobytes())
+        self._arquivo.flush()
+        for rolante in self._rolantes(horizonte).values():
+            rolante.adicionar(ts, previsto, real, referencia)
+
+    def metricas(self, horizonte=1):
+        """{janela em minutos: {'n', 'rmse', 'mae', 'acerto_direcao'}} do horizonte."""
+        return {janela: rolante.resultado() for janela, rolante in self._rolantes(horizonte).items()}
+
+    def fechar(self):
+        self._arquivo.close()
+
+
+def ler_registro(caminho=ARQUIVO_REGISTRO, t0=None, t1=None, ultimos=None):
+    """Lê o registro via memmap. Filtra por t0 <= ts <= t1 (ms) ou pega os `ultimos` registros.
+
+    Os registros são anexados em ordem de tempo, então o filtro por intervalo é uma busca binária.
+    """
+    if not os.path.exists(caminho):
+        return np.empty(0, dtype=REGISTRO)
+    # Um registro cortado no meio (queda durante a escrita) é ignorado
+    n = os.path.getsize(caminho) // REGISTRO.itemsize
+    if n == 0:
+        return np.empty(0, dtype=REGISTRO)
+    registros = np.memmap(caminho, dtype=REGISTRO, mode='r', shape=(n,))
+    if ultimos is not None:
+        registros = registros[-ultimos:]
+    a = 0 if t0 is None else int(np.searchsorted(registros['ts'], t0, side='left'))
+    b = len(registros) if t1 is None else int(np.searchsorted(registros['ts'], t1, side='right'))
+    return registros[a:b]
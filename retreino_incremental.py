@@ -0,0 +1,138 @@
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from Data.armazem_candles import ARQUIVO_DIVISAO, ArmazemCandles
+from normalizador import salvar_normalizador
+from registro_modelos import RegistroModelos, carregar_atual
+from sequencias import indices_sem_lacunas
+
+# --- Retreino Incremental (Warm Start) ---
+# Em vez de treinar do zero sobre anos de dados, parte do modelo atual e faz um ajuste fino curto
+# só com os candles que chegaram depois do último treino, misturados a uma amostra de janelas
+# antigas (replay) para o modelo não "esquecer" o passado. O modelo novo só substitui o atual se
+# tiver erro menor em um holdout com os candles mais recentes, que nenhum dos dois viu no treino.
+# O normalizador (min/max do treino original) é mantido, então o artefato continua compatível.
+
+# --- 1. Configurações ---
+MODEL_FILE = 'modelo_ethereum.h5'
+BACKUP_FILE = 'modelo_ethereum_anterior.h5' # O modelo substituído fica guardado aqui
+PUBLICAR_NO_REGISTRO = True # O candidato promovido vira versão nova do registro (ver registro_modelos.py)
+
+HOLDOUT_MINUTOS = 24 * 60 # Último dia de candles: usado só para comparar os dois modelos
+PROPORCAO_REPLAY = 1.0 # Janelas antigas sorteadas por janela nova
+MAX_PASSOS = 500 # Limite de lotes de ajuste fino (o custo não cresce com o histórico)
+BATCH_SIZE = 128
+EPOCAS = 2
+TAXA_APRENDIZADO = 1e-4 # Menor que a do treino original, para ajustar sem destruir o que já foi aprendido
+MIN_JANELAS_NOVAS = 60
+
+
+def janelas(serie, timestamps, look_back, indices=None):
+    """Materializa (X, y) das janelas sem lacunas (ou só das `indices` escolhidas)."""
+    if indices is None:
+        indices = indices_sem_lacunas(timestamps, look_back)
+    X = sliding_window_view(serie, look_back)[indices][:, :, np.newaxis]
+    y = serie[indices + look_back]
+    return X.astype(np.float32), y.astype(np.float32)
+
+
+def corte_do_treino(scaler, armazem):
+    # Modelos treinados antes do retreino incremental não têm o corte no artefato: usa o fim do conjunto de treino
+    if scaler.corte_treino is not None:
+        return scaler.corte_treino
+    with open(os.path.join(armazem.diretorio, ARQUIVO_DIVISAO)) as f:
+        return json.load(f)['treino']['fim']
+
+
+def erro_quadratico(model, X, y):
+    return float(np.mean((model.predict(X, batch_size=1024, verbose=0)[:, 0] - y) ** 2))
+
+
+if __name__ == '__main__':
+    import tensorflow as tf
+
+    # O modelo atual é a versão ativa do registro (já considera um `registro_modelos.py reverter`)
+    print("Carregando o modelo atual e o normalizador...")
+    try:
+        versao, model, scaler = carregar_atual(MODEL_FILE, usar_tensorflow=True)
+    except Exception as e:
+        print(f"Erro ao carregar o modelo atual: {e}")
+        exit()
+    modelo_atual = RegistroModelos().caminho_modelo(versao) if versao else MODEL_FILE
+    LOOK_BACK = scaler.look_back
+
+    armazem = ArmazemCandles('ETH/USDT', '1m')
+    try:
+        corte = corte_do_treino(scaler, armazem)
+    except FileNotFoundError:
+        print("Erro: o artefato não tem o corte do treino e não há divisão salva. Execute Data/gerarDadaFrame.py.")
+        exit()
+
+    # --- 2. Candles Novos e Holdout ---
+    # Os LOOK_BACK candles até o corte entram como contexto: o alvo da primeira janela é o primeiro candle novo
+    novos = armazem.ler_intervalo(corte - (LOOK_BACK - 1) * 60_000, None, colunas=('close',))
+    serie_nova = scaler.transform(novos['close'].reshape(-1, 1)).ravel()
+    inicio_holdout = max(0, len(serie_nova) - HOLDOUT_MINUTOS - LOOK_BACK)
+    X_novo, y_novo = janelas(serie_nova[:inicio_holdout + LOOK_BACK], novos['timestamp'][:inicio_holdout + LOOK_BACK], LOOK_BACK)
+    X_holdout, y_holdout = janelas(serie_nova[inicio_holdout:], novos['timestamp'][inicio_holdout:], LOOK_BACK)
+
+    print(f"Corte do último treino: {pd.to_datetime(corte, unit='ms')}")
+    print(f"{len(y_novo)} janelas novas para o ajuste fino, {len(y_holdout)} no holdout.")
+    if len(y_novo) < MIN_JANELAS_NOVAS or len(y_holdout) == 0:
+        print("Poucos candles novos desde o último treino; nada a fazer.")
+        exit()
+
+    # --- 3. Amostra de Replay (dados antigos) ---
+    rng = np.random.default_rng()
+    antigos = armazem.ler_intervalo(None, corte, colunas=('close',))
+    indices_antigos = indices_sem_lacunas(antigos['timestamp'], LOOK_BACK)
+    n_replay = min(len(indices_antigos), int(len(y_novo) * PROPORCAO_REPLAY))
+    if n_replay:
+        sorteio = np.sort(rng.choice(indices_antigos, n_replay, replace=False))
+        # Só normaliza até a última janela sorteada (o resto do histórico continua no memmap)
+        serie_antiga = scaler.transform(antigos['close'][:sorteio[-1] + LOOK_BACK + 1].reshape(-1, 1)).ravel()
+        X_replay, y_replay = janelas(serie_antiga, None, LOOK_BACK, sorteio)
+    else:
+        X_replay, y_replay = X_novo[:0], y_novo[:0]
+
+    X = np.concatenate([X_novo, X_replay])
+    y = np.concatenate([y_novo, y_replay])
+    # Limita o número de passos: no máximo MAX_PASSOS lotes no total
+    limite = MAX_PASSOS * BATCH_SIZE // EPOCAS
+    if len(y) > limite:
+        escolhidos = rng.choice(len(y), limite, replace=False)
+        X, y = X[escolhidos], y[escolhidos]
+    print(f"Ajuste fino: {len(y)} janelas ({n_replay} de replay), {EPOCAS} épocas.")
+
+    # --- 4. Ajuste Fino do Candidato ---
+    candidato = tf.keras.models.clone_model(model)
+    candidato.set_weights(model.get_weights())
+    candidato.compile(optimizer=tf.keras.optimizers.Adam(TAXA_APRENDIZADO), loss='mean_squared_error')
+    candidato.fit(X, y, batch_size=BATCH_SIZE, epochs=EPOCAS, shuffle=True, verbose=1)
+
+    # --- 5. Comparação no Holdout e Promoção ---
+    mse_atual = erro_quadratico(model, X_holdout, y_holdout)
+    mse_candidato = erro_quadratico(candidato, X_holdout, y_holdout)
+    escala = 1 / scaler.scale_[0] # MSE normalizado -> RMSE em dólares
+    print(f"\nRMSE no holdout: atual ${np.sqrt(mse_atual) * escala:.4f}, candidato ${np.sqrt(mse_candidato) * escala:.4f}")
+
+    if mse_candidato >= mse_atual:
+        print("O candidato não é melhor; o modelo atual foi mantido.")
+        exit()
+
+    shutil.copyfile(modelo_atual, BACKUP_FILE)
+    temporario = os.path.splitext(MODEL_FILE)[0] + '.tmp.h5'
+    candidato.save(temporario)
+    # O corte avança até o último candle usado no ajuste; o holdout de hoje entra no próximo retreino.
+    # O artefato vai antes da troca, para o modelo novo nunca ficar no ar sem o seu normalizador.
+    salvar_normalizador(scaler, LOOK_BACK, MODEL_FILE, corte_treino=novos['timestamp'][inicio_holdout + LOOK_BACK - 1],
+                        novo_modelo=temporario)
+    os.replace(temporario, MODEL_FILE)
+    print(f"Modelo promovido e salvo em '{MODEL_FILE}' (anterior em '{BACKUP_FILE}').")
+    if PUBLICAR_NO_REGISTRO:
+        print(f"Publicado e ativado no registro como versão {RegistroModelos().publicar(MODEL_FILE)}.")
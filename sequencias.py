@@ -0,0 +1,79 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from Data.armazem_candles import indices_sem_lacunas
+
+try:
+    from tensorflow.keras.utils import Sequence
+except ImportError:
+    # Sem TensorFlow as janelas continuam funcionando, só não dá para passar direto ao model.fit
+    Sequence = object
+
+
+# --- Janelas Deslizantes sem Cópia ---
+# Substitui o antigo create_sequences (que era copiado em treinar_modelo.py e ValidarModelo.py).
+# Em vez de um loop Python que copia 30 valores por minuto, devolvemos uma "view" por strides
+# sobre a série normalizada: X[i] aponta para data[i:i+look_back] sem duplicar a memória.
+def create_sequences(data, look_back):
+    """Cria os pares (X, y) no formato do LSTM: X com shape (amostras, look_back, 1) e y com shape (amostras,).
+
+    X e y são views somente-leitura de `data`; nenhuma cópia da série é feita.
+    """
+    serie = np.asarray(data).reshape(-1)
+    n_amostras = len(serie) - look_back
+    if n_amostras <= 0:
+        return np.empty((0, look_back, 1), dtype=serie.dtype), np.empty((0,), dtype=serie.dtype)
+
+    # sliding_window_view gera len - look_back + 1 janelas (já somente-leitura);
+    # a última não tem alvo, então é descartada
+    X = sliding_window_view(serie, look_back)[:n_amostras, :, np.newaxis]
+    y = serie[look_back:].view()
+    y.flags.writeable = False
+    return X, y
+
+
+# --- Dataset em Lotes para o Keras ---
+# O model.fit converte arrays NumPy inteiros em tensores, o que materializaria todas as janelas de novo.
+# Esta classe entrega ao Keras um lote por vez, copiando apenas batch_size janelas em cada passo.
+# Com `timestamps`, as janelas que atravessam lacunas nos dados são puladas. Com `indices` (as janelas sem
+# lacunas já calculadas para este look_back, como os `<conjunto>_indices.npy` do Data/preprocessado via
+# memmap), nada é recalculado; sem shuffle, nem copiado.
+class SequenciaJanelas(Sequence):
+    def __init__(self, data, look_back, batch_size=128, shuffle=False, seed=None, timestamps=None, duracao_ms=60_000,
+                 max_janelas=None, indices=None):
+        super().__init__()
+        self.X, self.y = create_sequences(data, look_back)
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self._rng = np.random.default_rng(seed)
+        # Janelas usadas, em ordem cronológica (self.y[self.indices] são os alvos na ordem dos lotes sem shuffle)
+        if indices is not None:
+            self.indices = indices
+        elif timestamps is None:
+            self.indices = np.arange(len(self.y))
+        else:
+            self.indices = indices_sem_lacunas(timestamps, look_back, duracao_ms)
+        if max_janelas is not None:
+            # Só as primeiras max_janelas janelas (testes rápidos e comparações de desempenho)
+            self.indices = self.indices[:max_janelas]
+        # Só o embaralhamento precisa de uma cópia; sem ele os lotes saem direto de self.indices
+        self._indices = self.indices
+        if self.shuffle:
+            self._indices = np.array(self.indices)
+            self._rng.shuffle(self._indices)
+
+    def __len__(self):
+        return int(np.ceil(len(self._indices) / self.batch_size))
+
+    def __getitem__(self, idx):
+        lote = self._indices[idx * self.batch_size:(idx + 1) * self.batch_size]
+        if not self.shuffle and (len(lote) == 0 or lote[-1] - lote[0] + 1 == len(lote)):
+            # Lote contíguo: basta fatiar a view
+            fatia = slice(lote[0], lote[-1] + 1) if len(lote) else slice(0, 0)
+            return (np.ascontiguousarray(self.X[fatia], dtype=np.float32),
+                    np.ascontiguousarray(self.y[fatia], dtype=np.float32))
+        return self.X[lote].astype(np.float32), self.y[lote].astype(np.float32)
+
+    def on_epoch_end(self):
+        if self.shuffle:
+            self._rng.shuffle(self._indices)
@@ -0,0 +1,182 @@
+import argparse
+import asyncio
+import glob
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from buffer_circular import BufferCircular
+from Data.armazem_candles import duracao_timeframe_ms
+
+# --- 1. Configurações ---
+URL_BINANCE_WS = 'wss://stream.binance.com:9443/ws/{stream}'
+ARQUIVOS_REPLAY = 'Data/eth_usdt_1m_data_*.csv'
+
+
+# --- 2. Fontes de Eventos de Fechamento de Candle ---
+# Cada fluxo é um iterador assíncrono que produz um candle [timestamp, open, high, low, close, volume]
+# no momento em que ele fecha. O consumidor não sabe se o candle veio da Binance ou de um replay.
+# `duracao` (ms por candle) permite usar o fluxo como fonte do PreditorContinuo (ver prever_ao_fechar).
+
+class FluxoBinance:
+    """Stream de klines da Binance via WebSocket; só repassa os candles fechados."""
+
+    def __init__(self, symbol='ETH/USDT', timeframe='1m', pausa_reconexao=5):
+        self.stream = f"{symbol.replace('/', '').lower()}@kline_{timeframe}"
+        self.duracao = duracao_timeframe_ms(timeframe)
+        self.pausa_reconexao = pausa_reconexao
+
+    async def __aiter__(self):
+        import websockets
+
+        while True:
+            try:
+                async with websockets.connect(URL_BINANCE_WS.format(stream=self.stream)) as ws:
+                    async for mensagem in ws:
+                        kline = json.loads(mensagem)['k']
+                        if kline['x']: # 'x' indica que o candle fechou
+                            yield [kline['t'], float(kline['o']), float(kline['h']), float(kline['l']),
+                                   float(kline['c']), float(kline['v'])]
+            except Exception as e:
+                print(f"Conexão com a Binance perdida: {e}. Reconectando em {self.pausa_reconexao}s...")
+                await asyncio.sleep(self.pausa_reconexao)
+
+
+class FluxoReplay:
+    """Reproduz os CSVs anuais (Data/eth_usdt_1m_data_*.csv) como um stream de fechamentos.
+
+    `velocidade` é quantas vezes mais rápido que o tempo real (None = o mais rápido possível).
+    Os arquivos são lidos em pedaços, então a memória não depende do tamanho do histórico.
+    """
+
+    def __init__(self, padrao=ARQUIVOS_REPLAY, velocidade=None, tamanho_pedaco=50_000, timeframe='1m'):
+        self.arquivos = sorted(glob.glob(padrao))
+        self.duracao = duracao_timeframe_ms(timeframe)
+        self.velocidade = velocidade
+        self.tamanho_pedaco = tamanho_pedaco
+
+    def _pedacos(self):
+        colunas = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+        for arquivo in self.arquivos:
+            for df in pd.read_csv(arquivo, usecols=colunas, chunksize=self.tamanho_pedaco):
+                df['timestamp'] = pd.to_datetime(df['timestamp']).values.astype('datetime64[ms]').astype('int64')
+                yield df[colunas].to_numpy(dtype=np.float64)
+
+    async def __aiter__(self):
+        inicio_real = time.monotonic()
+        inicio_replay = None
+        for pedaco in self._pedacos():
+            for candle in pedaco.tolist():
+                candle[0] = int(candle[0])
+                if self.velocidade:
+                    if inicio_replay is None:
+                        inicio_replay = candle[0]
+                    # O candle "fecha" quando o relógio acelerado passa do seu fechamento
+                    alvo = (candle[0] - inicio_replay) / 1000 / self.velocidade
+                    atraso = alvo - (time.monotonic() - inicio_real)
+                    if atraso > 0:
+                        await asyncio.sleep(atraso)
+                yield candle
+            # Devolve o controle ao event loop entre pedaços, mesmo sem espera
+            await asyncio.sleep(0)
+
+
+# --- 3. Consumidor ---
+# A cada candle fechado: atualiza a janela em memória, acumula o candle para o histórico em disco
+# e chama os callbacks com a lista [candle], no mesmo formato do ccxt que o
+# PreditorContinuo.adicionar_candles recebe (ver prever_ao_fechar). A gravação no armazém é feita em lotes para
+# aguentar milhares de candles por segundo no replay; ao vivo, com flush_a_cada=1, cada candle
+# vai para o disco assim que fecha.
+class ConsumidorCandles:
+    def __init__(self, fluxo, armazem=None, tamanho_janela=30, flush_a_cada=1, ao_fechar=()):
+        self.fluxo = fluxo
+        self.armazem = armazem
+        self.janela = BufferCircular(tamanho_janela, dtype=np.float64)
+        self.flush_a_cada = flush_a_cada
+        self.ao_fechar = list(ao_fechar)
+        self.ultimo_timestamp = None
+        self.candles_recebidos = 0
+        self._pendentes = []
+
+    def _flush(self):
+        if self.armazem is not None and self._pendentes:
+            self.armazem.adicionar(self._pendentes)
+        self._pendentes = []
+
+    def processar(self, candle):
+        # Eventos repetidos ou atrasados (reconexões do WebSocket) são ignorados
+        if self.ultimo_timestamp is not None and candle[0] <= self.ultimo_timestamp:
+            return
+        self.ultimo_timestamp = candle[0]
+        self.candles_recebidos += 1
+        self.janela.adicionar(candle[4])
+
+        self._pendentes.append(candle)
+        if len(self._pendentes) >= self.flush_a_cada:
+            self._flush()
+
+        for callback in self.ao_fechar:
+            callback([candle])
+
+    async def executar(self, limite=None):
+        """Consome o fluxo até ele acabar (ou até `limite` candles)."""
+        try:
+            async for candle in self.fluxo:
+                self.processar(candle)
+                if limite is not None and self.candles_recebidos >= limite:
+                    break
+        finally:
+            self._flush()
+
+
+def prever_ao_fechar(preditor, ao_prever):
+    """Callback do ConsumidorCandles que liga o fluxo a um PreditorContinuo.
+
+    Cada candle fechado entra na janela do preditor; assim que ela tem LOOK_BACK candles, cada novo
+    fechamento gera uma previsão, entregue a `ao_prever(timestamp_previsto, preco_previsto)`.
+    O preditor deve ser criado com o próprio fluxo como fonte (só a `duracao` dela é usada aqui).
+    """
+    def ao_fechar(candles):
+        preditor.adicionar_candles(candles)
+        if preditor.janela.cheio:
+            ao_prever(*preditor.prever())
+    return ao_fechar
+
+
+# --- 4. Teste de Carga Offline ---
+if __name__ == '__main__':
+    import tempfile
+    from Data.armazem_candles import ArmazemCandles
+
+    parser = argparse.ArgumentParser(description='Replay dos CSVs anuais como stream de fechamentos.')
+    parser.add_argument('--arquivos', default=ARQUIVOS_REPLAY, help='padrão glob dos CSVs')
+    parser.add_argument('--prever', action='store_true', help='liga um PreditorContinuo ao fluxo (modelo_ethereum.h5)')
+    parser.add_argument('--limite', type=int, help='para depois de N candles')
+    args = parser.parse_args()
+
+    # Replay sem espera, gravando em um armazém temporário para não tocar no histórico real
+    fluxo = FluxoReplay(args.arquivos, velocidade=None)
+    armazem = ArmazemCandles('ETH/USDT', '1m', raiz=tempfile.mkdtemp())
+    consumidor = ConsumidorCandles(fluxo, armazem, flush_a_cada=10_000)
+
+    previsoes = []
+    if args.prever:
+        from lstm_numpy import carregar_modelo
+        from normalizador import carregar_normalizador
+        from preditor_continuo import PreditorContinuo
+
+        model = carregar_modelo('modelo_ethereum.h5')
+        preditor = PreditorContinuo(model, carregar_normalizador('modelo_ethereum.h5', model), fluxo)
+        consumidor.ao_fechar.append(prever_ao_fechar(preditor, lambda ts, preco: previsoes.append((ts, preco))))
+
+    print(f"Reproduzindo {len(fluxo.arquivos)} arquivos...")
+    inicio = time.perf_counter()
+    asyncio.run(consumidor.executar(args.limite))
+    duracao = time.perf_counter() - inicio
+    print(f"{consumidor.candles_recebidos} candles em {duracao:.1f}s "
+          f"({consumidor.candles_recebidos / max(duracao, 1e-9):.0f} candles/s).")
+    if previsoes:
+        ts, preco = previsoes[-1]
+        print(f"{len(previsoes)} previsões; a última: {pd.to_datetime(ts, unit='ms')} -> US$ {preco:.2f}.")
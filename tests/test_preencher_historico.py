@@ -0,0 +1,44 @@
+import asyncio
+import time
+
+import numpy as np
+
+from Data.armazem_candles import ArmazemCandles
+from dados_sinteticos import gerar_candles
+from limitador import LimitadorTaxa
+from preencher_historico import ExchangeSimulada, preencher
+
+INICIO = 1_704_067_200_000 # 2024-01-01 00:00 UTC
+
+
+def test_preencher_com_erros_de_limite(tmp_path):
+    candles = gerar_candles(INICIO, 3000)
+    # Um em cada cinco pedidos volta como RateLimitExceeded, além dos que passam do limite por segundo
+    exchange = ExchangeSimulada(candles, latencia=0.002, pedidos_por_segundo=200, taxa_erros=0.2, seed=1)
+    armazem = ArmazemCandles('ETH/USDT', '1m', raiz=str(tmp_path))
+    limitador = LimitadorTaxa(1000, capacidade=8)
+
+    novos = asyncio.run(preencher(exchange, armazem, INICIO, limitador=limitador, concorrencia=8, limit=100,
+                                  tamanho_lote=500, peso=1, tentativas=10, espera_inicial=0.001,
+                                  espera_maxima=0.01))
+
+    assert exchange.recusadas > 0
+    assert novos == len(candles)
+    gravado = armazem.ler_intervalo(colunas=('timestamp', 'close'))
+    # Mesmos timestamps da fonte, em ordem e sem repetição
+    np.testing.assert_array_equal(gravado['timestamp'], candles[:, 0].astype('i8'))
+    np.testing.assert_allclose(gravado['close'], candles[:, 4])
+
+
+def test_pausa_estende_quem_ja_esta_esperando():
+    async def cenario():
+        limitador = LimitadorTaxa(100, capacidade=1)
+        await limitador.adquirir() # Esvazia o balde: o próximo espera ~10 ms
+        inicio = time.monotonic()
+        espera = asyncio.create_task(limitador.adquirir())
+        await asyncio.sleep(0.002) # A tarefa já está dormindo dentro de adquirir()
+        limitador.pausar(0.1)
+        await espera
+        return time.monotonic() - inicio
+
+    assert asyncio.run(cenario()) >= 0.1
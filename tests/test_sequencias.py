@@ -0,0 +1,103 @@
+import numpy as np
+
+from benchmark import LOOK_BACK, create_sequences_antigo
+from sequencias import SequenciaJanelas, create_sequences
+
+
+def serie(n=500, seed=0):
+    return np.random.default_rng(seed).random((n, 1)).astype(np.float32)
+
+
+def juntar_lotes(sequencia):
+    lotes = [sequencia[i] for i in range(len(sequencia))]
+    return np.concatenate([X for X, _ in lotes]), np.concatenate([y for _, y in lotes])
+
+
+def test_create_sequences_igual_ao_antigo():
+    dados = serie()
+    X_antigo, y_antigo = create_sequences_antigo(dados)
+    X, y = create_sequences(dados, LOOK_BACK)
+    assert X.shape == X_antigo.shape == (len(dados) - LOOK_BACK, LOOK_BACK, 1)
+    np.testing.assert_array_equal(X, X_antigo)
+    np.testing.assert_array_equal(y, y_antigo)
+    # Série 1-D dá as mesmas janelas
+    X_1d, y_1d = create_sequences(dados.ravel(), LOOK_BACK)
+    np.testing.assert_array_equal(X_1d, X_antigo)
+    np.testing.assert_array_equal(y_1d, y_antigo)
+
+
+def test_create_sequences_nao_copia():
+    dados = serie()
+    X, y = create_sequences(dados, LOOK_BACK)
+    assert np.shares_memory(X, dados) and np.shares_memory(y, dados)
+    assert not X.flags.writeable and not y.flags.writeable
+
+
+def test_create_sequences_serie_curta():
+    X, y = create_sequences(serie(LOOK_BACK), LOOK_BACK)
+    assert X.shape == (0, LOOK_BACK, 1) and y.shape == (0,)
+
+
+def test_sequencia_janelas_igual_ao_antigo():
+    dados = serie(1000)
+    X_antigo, y_antigo = create_sequences_antigo(dados)
+    X, y = juntar_lotes(SequenciaJanelas(dados, LOOK_BACK, batch_size=128))
+    np.testing.assert_array_equal(X, X_antigo.astype(np.float32))
+    np.testing.assert_array_equal(y, y_antigo.astype(np.float32))
+
+
+def test_sequencia_janelas_shuffle_tem_as_mesmas_janelas():
+    dados = serie(1000)
+    X_antigo, _ = create_sequences_antigo(dados)
+    X, _ = juntar_lotes(SequenciaJanelas(dados, LOOK_BACK, batch_size=128, shuffle=True, seed=0))
+    ordenar = lambda janelas: janelas[np.lexsort(janelas[:, ::-1, 0].T)]
+    np.testing.assert_array_equal(ordenar(X), ordenar(X_antigo.astype(np.float32)))
+
+
+def test_sequencia_janelas_pula_lacunas():
+    dados = serie(1000)
+    timestamps = np.arange(len(dados), dtype=np.int64) * 60_000
+    # Duas paradas da corretora: 5 e 90 minutos sem candles
+    timestamps[300:] += 5 * 60_000
+    timestamps[700:] += 90 * 60_000
+
+    # Referência: as janelas do código antigo cujos look_back + 1 candles são minutos seguidos
+    X_antigo, y_antigo = create_sequences_antigo(dados)
+    manter = [i for i in range(len(y_antigo)) if np.all(np.diff(timestamps[i:i + LOOK_BACK + 1]) == 60_000)]
+    assert len(manter) == len(y_antigo) - 2 * LOOK_BACK
+
+    sequencia = SequenciaJanelas(dados, LOOK_BACK, batch_size=128, timestamps=timestamps)
+    np.testing.assert_array_equal(sequencia.indices, manter)
+    X, y = juntar_lotes(sequencia)
+    np.testing.assert_array_equal(X, X_antigo[manter].astype(np.float32))
+    np.testing.assert_array_equal(y, y_antigo[manter].astype(np.float32))
+
+
+def test_sequencia_janelas_max_janelas():
+    dados = serie(1000)
+    X_antigo, y_antigo = create_sequences_antigo(dados)
+    sequencia = SequenciaJanelas(dados, LOOK_BACK, batch_size=128, max_janelas=300)
+    assert len(sequencia) == 3
+    X, y = juntar_lotes(sequencia)
+    np.testing.assert_array_equal(X, X_antigo[:300].astype(np.float32))
+    np.testing.assert_array_equal(y, y_antigo[:300].astype(np.float32))
+
+
+def test_sequencia_janelas_indices_prontos(tmp_path):
+    dados = serie(1000)
+    timestamps = np.arange(len(dados), dtype=np.int64) * 60_000
+    timestamps[400:] += 10 * 60_000
+    calculada = SequenciaJanelas(dados, LOOK_BACK, batch_size=128, timestamps=timestamps)
+
+    # Índices gravados em disco (como os do Data/preprocessado) e lidos via memmap
+    np.save(tmp_path / 'treino_indices.npy', calculada.indices)
+    indices = np.load(tmp_path / 'treino_indices.npy', mmap_mode='r')
+    sequencia = SequenciaJanelas(dados, LOOK_BACK, batch_size=128, indices=indices)
+    assert sequencia._indices is indices # Sem shuffle, nenhuma cópia
+    X, y = juntar_lotes(sequencia)
+    X_calculada, y_calculada = juntar_lotes(calculada)
+    np.testing.assert_array_equal(X, X_calculada)
+    np.testing.assert_array_equal(y, y_calculada)
+
+    embaralhada = SequenciaJanelas(dados, LOOK_BACK, batch_size=128, shuffle=True, seed=0, indices=indices)
+    assert sorted(embaralhada._indices) == list(calculada.indices)
@@ -0,0 +1,98 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Os scripts de Data/ importam os vizinhos sem o prefixo do pacote (como quando rodam de dentro da pasta)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Data'))
+
+from armazem_candles import ArmazemCandles
+from getVelueEth import ler_checkpoint, sincronizar
+
+INICIO = 1_704_067_200_000 # 2024-01-01 00:00 UTC
+MINUTO = 60_000
+
+
+def candles(n):
+    timestamps = INICIO + np.arange(n) * MINUTO
+    closes = 3000 + np.arange(n, dtype='f8')
+    return [[int(t), c, c + 1, c - 1, c, 1.0] for t, c in zip(timestamps, closes)]
+
+
+class ExchangeFalsa:
+    """Páginas prontas a partir de uma lista de candles; `sobreposicao` repete candles da página anterior."""
+
+    def __init__(self, candles, agora, sobreposicao=0, falhar_em=()):
+        self.candles = candles
+        self.agora = agora
+        self.sobreposicao = sobreposicao
+        self.falhar_em = set(falhar_em) # números das requisições (a partir de 0) que falham
+        self.pedidos = []
+
+    def milliseconds(self):
+        return self.agora
+
+    def fetch_ohlcv(self, symbol, timeframe, since, limit):
+        self.pedidos.append(since)
+        if len(self.pedidos) - 1 in self.falhar_em:
+            raise RuntimeError('binance 502 Bad Gateway')
+        inicio = next((i for i, c in enumerate(self.candles) if c[0] >= since), len(self.candles))
+        inicio = max(0, inicio - self.sobreposicao)
+        # A corretora também devolve o candle em formação
+        return [c for c in self.candles[inicio:inicio + limit] if c[0] <= self.agora]
+
+
+def timestamps(armazem):
+    return armazem.ler_intervalo(colunas=('timestamp',))['timestamp'].tolist()
+
+
+def test_retoma_do_checkpoint_depois_de_uma_queda(tmp_path):
+    dados = candles(50)
+    armazem = ArmazemCandles('ETH/USDT', '1m', raiz=str(tmp_path))
+    agora = dados[-1][0] + MINUTO + 1
+
+    # A terceira página falha até esgotar as tentativas: o que veio antes fica gravado
+    exchange = ExchangeFalsa(dados, agora, falhar_em=range(2, 100))
+    with pytest.raises(RuntimeError):
+        sincronizar(exchange, armazem, INICIO, limit=10, pausa_erro=0, tentativas=3)
+    assert len(exchange.pedidos) == 2 + 3
+    assert timestamps(armazem) == [c[0] for c in dados[:20]]
+    assert ler_checkpoint(armazem) == dados[20][0]
+
+    # O reinício começa do checkpoint, sem buscar de novo o que já está no armazém
+    exchange = ExchangeFalsa(dados, agora)
+    assert sincronizar(exchange, armazem, INICIO, limit=10, pausa_erro=0) == 30
+    assert exchange.pedidos[0] == dados[20][0]
+    assert timestamps(armazem) == [c[0] for c in dados]
+
+
+def test_erro_passageiro_nao_perde_candles(tmp_path):
+    dados = candles(30)
+    armazem = ArmazemCandles('ETH/USDT', '1m', raiz=str(tmp_path))
+    exchange = ExchangeFalsa(dados, dados[-1][0] + MINUTO + 1, falhar_em={1, 2})
+    assert sincronizar(exchange, armazem, INICIO, limit=10, pausa_erro=0, tentativas=3) == 30
+    assert timestamps(armazem) == [c[0] for c in dados]
+
+
+def test_paginas_sobrepostas_nao_duplicam(tmp_path):
+    dados = candles(45)
+    armazem = ArmazemCandles('ETH/USDT', '1m', raiz=str(tmp_path))
+    exchange = ExchangeFalsa(dados, dados[-1][0] + MINUTO + 1, sobreposicao=3)
+    assert sincronizar(exchange, armazem, INICIO, limit=10, pausa_erro=0) == 45
+    assert timestamps(armazem) == [c[0] for c in dados]
+
+
+def test_candle_em_formacao_fica_de_fora(tmp_path):
+    dados = candles(25)
+    armazem = ArmazemCandles('ETH/USDT', '1m', raiz=str(tmp_path))
+
+    # O relógio está no meio do último candle: ele ainda não fechou
+    exchange = ExchangeFalsa(dados, dados[-1][0] + MINUTO // 2)
+    assert sincronizar(exchange, armazem, INICIO, limit=10, pausa_erro=0) == 24
+    assert timestamps(armazem) == [c[0] for c in dados[:-1]]
+
+    # Depois que ele fecha, a próxima execução o grava
+    exchange.agora = dados[-1][0] + MINUTO + 1
+    assert sincronizar(exchange, armazem, INICIO, limit=10, pausa_erro=0) == 1
+    assert timestamps(armazem) == [c[0] for c in dados]
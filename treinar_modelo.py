@@ -1,10 +1,12 @@
-import pandas as pd
-import numpy as np
+import os
 from sklearn.preprocessing import MinMaxScaler
-from tensorflow.keras.models import Sequential
-from tensorflow.keras.layers import LSTM, Dense, Dropout
 from tensorflow.keras.callbacks import EarlyStopping, ModelCheckpoint
 import matplotlib.pyplot as plt
+from sequencias import SequenciaJanelas
+from modelo import construir_modelo
+from Data.armazem_candles import carregar_conjunto, carregar_preprocessado, ler_manifesto, preprocessado_atualizado
+from normalizador import Normalizador, salvar_normalizador
+from registro_modelos import RegistroModelos
 
 # --- 1. Hiperparâmetros e Configurações ---
 # Tamanho da janela de tempo (quantos passos no tempo vamos usar para prever o próximo)
@@ -14,66 +16,57 @@ LOOK_BACK = 30
 EPOCHS = 5
 BATCH_SIZE = 128
 
-# Nomes dos arquivos
-TRAIN_FILE = 'Data/dados_treino.csv'
-VALIDATION_FILE = 'Data/dados_validacao.csv'
+# Nomes dos arquivos (os dados vêm do armazém em Data/candles, dividido pelo gerarDadaFrame.py)
 MODEL_FILE = 'modelo_ethereum.h5' # O Keras salva modelos no formato .h5
+# O checkpoint grava num temporário; o MODEL_FILE só é trocado (de uma vez) no fim do treino
+CHECKPOINT_FILE = os.path.splitext(MODEL_FILE)[0] + '.tmp.h5'
+# Publica o modelo treinado como versão nova do registro (os preditores em execução trocam sozinhos)
+PUBLICAR_NO_REGISTRO = True
 
 # --- 2. Carregar e Preparar os Dados ---
 print("Carregando dados de treino e validação...")
-df_train = pd.read_csv(TRAIN_FILE)
-df_val = pd.read_csv(VALIDATION_FILE)
-
-# Vamos usar apenas a coluna 'close' para a previsão
-train_data = df_train['close'].values.reshape(-1, 1)
-val_data = df_val['close'].values.reshape(-1, 1)
-
-# Normalização dos dados
-# É CRUCIAL treinar o scaler APENAS com os dados de treino para evitar vazamento de dados
-scaler = MinMaxScaler(feature_range=(0, 1))
-scaled_train_data = scaler.fit_transform(train_data)
-scaled_val_data = scaler.transform(val_data) # Usa o mesmo scaler para transformar a validação
-
-# --- 3. Função para Criar Sequências ---
-# Esta função transforma uma lista de preços em pares de input/output para o modelo
-def create_sequences(data, look_back=LOOK_BACK):
-    X, y = [], []
-    for i in range(len(data) - look_back):
-        X.append(data[i:(i + look_back), 0])
-        y.append(data[i + look_back, 0])
-    return np.array(X), np.array(y)
-
+manifesto = ler_manifesto()
+if manifesto is not None and not preprocessado_atualizado(manifesto):
+    # Candles novos no armazém depois do último Data/preprocessar.py: a saída dele ficou para trás
+    print("A saída do Data/preprocessar.py está desatualizada em relação ao armazém; ela não será usada.")
+    manifesto = None
+if manifesto is not None and manifesto['look_back'] == LOOK_BACK:
+    # Saída do Data/preprocessar.py: séries já normalizadas (scaler ajustado só no treino), via memmap
+    print("Usando a saída do Data/preprocessar.py.")
+    treino = carregar_preprocessado('treino')
+    validacao = carregar_preprocessado('validacao')
+    scaler = Normalizador(**manifesto['normalizador'])
+    scaled_train_data = treino['close']
+    scaled_val_data = validacao['close']
+else:
+    # Vamos usar apenas a coluna 'close' para a previsão (lida via memmap, sem parse de CSV)
+    treino = carregar_conjunto('treino')
+    validacao = carregar_conjunto('validacao')
+    train_data = treino['close'].reshape(-1, 1)
+    val_data = validacao['close'].reshape(-1, 1)
+
+    # Normalização dos dados
+    # É CRUCIAL treinar o scaler APENAS com os dados de treino para evitar vazamento de dados
+    scaler = MinMaxScaler(feature_range=(0, 1))
+    scaled_train_data = scaler.fit_transform(train_data)
+    scaled_val_data = scaler.transform(val_data) # Usa o mesmo scaler para transformar a validação
+
+# --- 3. Criar as Sequências ---
+# As janelas de LOOK_BACK minutos são views sobre a série normalizada (ver sequencias.py),
+# e o Keras recebe um lote por vez, já no formato [amostras, timesteps, features].
+# Os timestamps servem para pular as janelas que atravessam lacunas (paradas da corretora)
 print("Criando sequências de treino e validação...")
-X_train, y_train = create_sequences(scaled_train_data)
-X_val, y_val = create_sequences(scaled_val_data)
-
-# O LSTM espera uma entrada no formato [amostras, timesteps, features]
-# Então, precisamos remodelar os dados
-X_train = np.reshape(X_train, (X_train.shape[0], X_train.shape[1], 1))
-X_val = np.reshape(X_val, (X_val.shape[0], X_val.shape[1], 1))
+train_sequences = SequenciaJanelas(scaled_train_data, LOOK_BACK, batch_size=BATCH_SIZE, shuffle=True,
+                                   timestamps=treino['timestamp'])
+val_sequences = SequenciaJanelas(scaled_val_data, LOOK_BACK, batch_size=BATCH_SIZE, timestamps=validacao['timestamp'])
 
-print(f"Formato dos dados de treino: {X_train.shape}")
-print(f"Formato dos dados de validação: {X_val.shape}")
+print(f"Formato dos dados de treino: {train_sequences.X.shape} ({len(train_sequences.indices)} janelas sem lacunas)")
+print(f"Formato dos dados de validação: {val_sequences.X.shape} ({len(val_sequences.indices)} janelas sem lacunas)")
 
 # --- 4. Construção do Modelo LSTM ---
 print("\nConstruindo o modelo LSTM...")
-model = Sequential()
-
-# Camada LSTM 1 com Dropout para evitar overfitting
-model.add(LSTM(units=50, return_sequences=True, input_shape=(LOOK_BACK, 1)))
-model.add(Dropout(0.2))
-
-# Camada LSTM 2
-model.add(LSTM(units=50, return_sequences=False))
-model.add(Dropout(0.2))
-
-# Camada de Saída (Dense)
-# A saída é 1, pois queremos prever um único valor (o próximo preço de 'close')
-model.add(Dense(units=1))
-
-# Compilação do modelo
-# Usamos 'adam' como otimizador e 'mean_squared_error' como função de perda para regressão
-model.compile(optimizer='adam', loss='mean_squared_error')
+# Duas camadas LSTM de 50 unidades com Dropout e uma saída Dense (ver modelo.py)
+model = construir_modelo(LOOK_BACK)
 
 # Mostra um resumo da arquitetura do modelo
 model.summary()
@@ -84,20 +77,31 @@ print("\nIniciando o treinamento do modelo...")
 # Callbacks para melhorar o treinamento:
 # EarlyStopping: para o treino se a perda na validação não melhorar após N épocas
 early_stopping = EarlyStopping(monitor='val_loss', patience=10, restore_best_weights=True)
-# ModelCheckpoint: salva o melhor modelo observado durante o treino
-model_checkpoint = ModelCheckpoint(MODEL_FILE, monitor='val_loss', save_best_only=True)
+# ModelCheckpoint: salva o melhor modelo observado durante o treino (no temporário, nunca no arquivo em uso)
+model_checkpoint = ModelCheckpoint(CHECKPOINT_FILE, monitor='val_loss', save_best_only=True)
 
 history = model.fit(
-    X_train, y_train,
+    train_sequences,
     epochs=EPOCHS,
-    batch_size=BATCH_SIZE,
-    validation_data=(X_val, y_val),
+    validation_data=val_sequences,
     callbacks=[early_stopping, model_checkpoint],
     verbose=1
 )
 
 print("\nTreinamento concluído!")
+
+# Grava os parâmetros do scaler e o LOOK_BACK ao lado do modelo, para a inferência não precisar
+# reler o conjunto de treino. O artefato guarda o hash do modelo e só vale para este arquivo;
+# ele é gravado antes da troca, para o modelo novo nunca ficar no ar sem o seu normalizador.
+normalizador_file = salvar_normalizador(scaler, LOOK_BACK, MODEL_FILE, corte_treino=treino['timestamp'][-1],
+                                        novo_modelo=CHECKPOINT_FILE)
+os.replace(CHECKPOINT_FILE, MODEL_FILE)
 print(f"O melhor modelo foi salvo em '{MODEL_FILE}'.")
+print(f"O normalizador foi salvo em '{normalizador_file}'.")
+
+if PUBLICAR_NO_REGISTRO:
+    versao = RegistroModelos().publicar(MODEL_FILE)
+    print(f"Modelo publicado e ativado no registro como versão {versao}.")
 
 # --- 6. Visualizar o Histórico de Treinamento ---
 print("Gerando gráfico do histórico de perdas...")
@@ -0,0 +1,27 @@
+import os
+
+from Data.armazem_candles import DIRETORIO_PREPROCESSADO, ler_manifesto, preprocessado_atualizado
+
+
+# --- Partes Comuns dos Treinos em Vários Processos ---
+# Usadas pelo treino_paralelo.py e pelo varredura.py: os dois dividem os núcleos entre processos
+# e leem as séries da saída do Data/preprocessar.py.
+def configurar_threads(threads):
+    # Precisa rodar antes de qualquer operação do TensorFlow no processo
+    for variavel in ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS'):
+        os.environ[variavel] = str(threads)
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+
+
+def exigir_preprocessado():
+    """Manifesto do Data/preprocessado; encerra com uma mensagem se ele não existe ou está desatualizado."""
+    manifesto = ler_manifesto()
+    if manifesto is None:
+        print(f"Erro: '{DIRETORIO_PREPROCESSADO}' não encontrado. Execute Data/preprocessar.py primeiro.")
+        exit()
+    if not preprocessado_atualizado(manifesto):
+        print("Erro: o armazém tem candles que não estão na saída do Data/preprocessar.py. Execute-o de novo.")
+        exit()
+    return manifesto
@@ -0,0 +1,267 @@
+import argparse
+import multiprocessing as mp
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from Data.armazem_candles import DIRETORIO_PREPROCESSADO, carregar_preprocessado, ler_manifesto
+from treino_comum import configurar_threads, exigir_preprocessado
+
+# --- Treino Paralelo por Dados (vários processos na CPU) ---
+# N processos treinam o MESMO modelo ao mesmo tempo. A cada passo, cada um calcula os gradientes de
+# uma fatia do lote (BATCH_SIZE / N janelas da sua parte dos dados); os gradientes são somados em
+# memória compartilhada e todos aplicam a mesma média. Como todos partem dos mesmos pesos e somam os
+# gradientes na mesma ordem, os pesos continuam idênticos em todos os processos, passo a passo.
+# O lote global continua BATCH_SIZE: é o mesmo treino do treinar_modelo.py, dividido entre os núcleos.
+# As janelas saem das séries do Data/preprocessado via memmap: o sistema operacional mantém uma única
+# cópia em cache para todos os processos.
+
+# --- 1. Configurações ---
+EPOCHS = 5
+BATCH_SIZE = 128 # Lote global (somado entre os processos)
+PACIENCIA = 10 # EarlyStopping: épocas sem melhora no val_loss antes de parar
+SEED = 42
+LOTE_VALIDACAO = 4096
+
+MODEL_FILE = 'modelo_ethereum.h5'
+# Só o processo principal (o de número 0) grava o checkpoint; o MODEL_FILE é trocado no fim do treino
+CHECKPOINT_FILE = os.path.splitext(MODEL_FILE)[0] + '.tmp.h5'
+PUBLICAR_NO_REGISTRO = True
+
+
+# --- 2. Soma entre Processos (memória compartilhada) ---
+# Dois conjuntos de posições (alternados a cada chamada), uma linha por processo. Cada processo escreve
+# a sua linha, espera todos na barreira e soma as N linhas na mesma ordem. Com as posições alternadas,
+# uma única barreira por passo basta: ninguém escreve de novo numa linha que outro ainda está lendo.
+class SomaCompartilhada:
+    def __init__(self, memoria, barreira, processos, tamanho, numero):
+        self._linhas = np.frombuffer(memoria, dtype=np.float32).reshape(2, processos, tamanho)
+        self.barreira = barreira
+        self.numero = numero
+        self._paridade = 0
+
+    def somar(self, vetor):
+        linhas = self._linhas[self._paridade]
+        self._paridade ^= 1
+        linhas[self.numero, :len(vetor)] = vetor
+        self.barreira.wait()
+        return linhas[:, :len(vetor)].sum(axis=0)
+
+
+# --- 3. Processo de Treino ---
+def treinar_processo(numero, processos, memoria, barreira, fila, config):
+    configurar_threads(config['threads'])
+    import tensorflow as tf
+    from modelo import construir_modelo
+    from sequencias import create_sequences
+
+    # Mesmos pesos iniciais em todos os processos; máscaras de Dropout diferentes em cada um
+    tf.keras.utils.set_random_seed(SEED)
+    look_back = config['look_back']
+    model = construir_modelo(look_back)
+    tf.random.set_seed(SEED + numero)
+    variaveis = model.trainable_variables
+    formas = [v.shape for v in variaveis]
+    cortes = np.cumsum([int(np.prod(forma)) for forma in formas])[:-1]
+    soma = SomaCompartilhada(memoria, barreira, processos, config['tamanho'], numero)
+
+    treino = carregar_preprocessado('treino', config['diretorio'])
+    validacao = carregar_preprocessado('validacao', config['diretorio'])
+    X_treino, y_treino = create_sequences(treino['close'], look_back)
+    X_val, y_val = create_sequences(validacao['close'], look_back)
+    indices_treino = np.asarray(treino['indices'])[:config['max_janelas']]
+    indices_val = np.asarray(validacao['indices'])[numero::processos] # A parte desta validação
+
+    lote = config['lote'] // processos
+    passos = len(indices_treino) // (lote * processos)
+
+    @tf.function(input_signature=[tf.TensorSpec([lote, look_back, 1], tf.float32), tf.TensorSpec([lote], tf.float32)])
+    def gradientes(X, y):
+        with tf.GradientTape() as fita:
+            perda = tf.reduce_mean(tf.square(model(X, training=True)[:, 0] - y))
+        return perda, fita.gradient(perda, variaveis)
+
+    melhor, espera, melhores_pesos = np.inf, 0, None
+    for epoca in range(config['epocas']):
+        inicio = time.perf_counter()
+        # Mesma permutação em todos os processos; cada um fica com uma parte (sem sobreposição)
+        parte = np.random.default_rng(SEED + epoca).permutation(indices_treino)[numero::processos]
+        soma_perdas = 0.0
+        for passo in range(passos):
+            idx = np.sort(parte[passo * lote:(passo + 1) * lote]) # Ordenado: leitura do memmap mais sequencial
+            perda, grads = gradientes(X_treino[idx].astype(np.float32), y_treino[idx].astype(np.float32))
+            vetor = np.concatenate([g.numpy().ravel() for g in grads] + [[perda.numpy()]])
+            media = soma.somar(vetor) / processos
+            model.optimizer.apply_gradients(
+                zip([tf.constant(g.reshape(forma)) for g, forma in zip(np.split(media[:-1], cortes), formas)], variaveis)
+            )
+            soma_perdas += media[-1]
+
+        # Validação dividida entre os processos: soma dos erros quadráticos e contagem, somadas entre todos
+        sse = 0.0
+        for a in range(0, len(indices_val), LOTE_VALIDACAO):
+            idx = indices_val[a:a + LOTE_VALIDACAO]
+            previsto = model(X_val[idx].astype(np.float32), training=False).numpy()[:, 0]
+            sse += float(np.sum((previsto - y_val[idx]) ** 2))
+        total_sse, total_n = soma.somar(np.array([sse, len(indices_val)], dtype=np.float32))
+        val_loss = float(total_sse / total_n)
+        segundos = time.perf_counter() - inicio
+
+        # EarlyStopping(patience=PACIENCIA, restore_best_weights=True) + ModelCheckpoint(save_best_only=True):
+        # todos veem o mesmo val_loss e decidem igual; só o principal grava
+        if val_loss < melhor:
+            melhor, espera, melhores_pesos = val_loss, 0, model.get_weights()
+            if numero == 0 and config['checkpoint']:
+                model.save(config['checkpoint'])
+        else:
+            espera += 1
+        if numero == 0:
+            fila.put({'epoca': epoca + 1, 'loss': float(soma_perdas) / max(passos, 1), 'val_loss': val_loss,
+                      'segundos': segundos, 'passos': passos})
+        if espera >= config['paciencia']:
+            break
+
+    if melhores_pesos is not None:
+        model.set_weights(melhores_pesos)
+
+
+def treinar_paralelo(processos, epocas=EPOCHS, lote=BATCH_SIZE, paciencia=PACIENCIA, checkpoint=CHECKPOINT_FILE,
+                     threads=None, max_janelas=None, diretorio=DIRETORIO_PREPROCESSADO):
+    """Treina com `processos` processos. Retorna o histórico por época (só o processo principal informa)."""
+    from modelo import construir_modelo
+
+    manifesto = ler_manifesto(diretorio)
+    look_back = manifesto['look_back']
+    if lote % processos:
+        raise ValueError(f"O lote global ({lote}) precisa ser divisível pelo número de processos ({processos}).")
+    # Tamanho de uma linha da soma: todos os pesos treináveis + a perda
+    tamanho = construir_modelo(look_back).count_params() + 1
+
+    # 'spawn': o TensorFlow não é seguro depois de um fork
+    contexto = mp.get_context('spawn')
+    memoria = contexto.RawArray('f', 2 * processos * tamanho)
+    barreira = contexto.Barrier(processos)
+    fila = contexto.Queue()
+    config = {
+        'look_back': look_back, 'epocas': epocas, 'lote': lote, 'paciencia': paciencia, 'checkpoint': checkpoint,
+        'threads': threads or max(1, (os.cpu_count() or 1) // processos), 'max_janelas': max_janelas,
+        'diretorio': diretorio, 'tamanho': tamanho,
+    }
+    trabalhadores = [contexto.Process(target=treinar_processo, args=(numero, processos, memoria, barreira, fila, config))
+                     for numero in range(processos)]
+    for trabalhador in trabalhadores:
+        trabalhador.start()
+
+    historico = []
+    while any(trabalhador.is_alive() for trabalhador in trabalhadores) or not fila.empty():
+        try:
+            epoca = fila.get(timeout=1)
+        except Exception:
+            if any(t.exitcode not in (None, 0) for t in trabalhadores):
+                # Um processo morreu: os outros ficariam parados na barreira para sempre
+                barreira.abort()
+                for trabalhador in trabalhadores:
+                    trabalhador.terminate()
+                raise RuntimeError("Um dos processos de treino falhou.")
+            continue
+        historico.append(epoca)
+        print(f"  Época {epoca['epoca']}: loss={epoca['loss']:.6f} val_loss={epoca['val_loss']:.6f} "
+              f"({epoca['segundos']:.1f}s, {epoca['passos']} passos)")
+    for trabalhador in trabalhadores:
+        trabalhador.join()
+    return historico
+
+
+# --- 4. Comparação com o Treino em um Processo ---
+def treinar_um_processo(epocas, lote, max_janelas=None, diretorio=DIRETORIO_PREPROCESSADO):
+    """O treino de hoje (model.fit com SequenciaJanelas) nas mesmas janelas, para comparar o tempo por época."""
+    import tensorflow as tf
+    from modelo import construir_modelo
+    from sequencias import SequenciaJanelas
+
+    look_back = ler_manifesto(diretorio)['look_back']
+    treino = carregar_preprocessado('treino', diretorio)
+    validacao = carregar_preprocessado('validacao', diretorio)
+    train_sequences = SequenciaJanelas(treino['close'], look_back, batch_size=lote, shuffle=True, seed=SEED,
+                                       max_janelas=max_janelas, indices=treino['indices'])
+    val_sequences = SequenciaJanelas(validacao['close'], look_back, batch_size=LOTE_VALIDACAO,
+                                     indices=validacao['indices'])
+
+    class Tempos(tf.keras.callbacks.Callback):
+        def on_epoch_begin(self, epoch, logs=None):
+            self.inicio = time.perf_counter()
+
+        def on_epoch_end(self, epoch, logs=None):
+            historico.append({'epoca': epoch + 1, 'loss': logs['loss'], 'val_loss': logs['val_loss'],
+                              'segundos': time.perf_counter() - self.inicio, 'passos': len(train_sequences)})
+
+    historico = []
+    tf.keras.utils.set_random_seed(SEED)
+    model = construir_modelo(look_back)
+    model.fit(train_sequences, epochs=epocas, validation_data=val_sequences, callbacks=[Tempos()], verbose=0)
+    return historico
+
+
+def comparar(lista_processos, epocas, lote, max_janelas):
+    linhas = []
+    print("Referência: model.fit em um processo...")
+    historico = treinar_um_processo(epocas, lote, max_janelas)
+    linhas.append(('model.fit (1 processo)', historico))
+    for processos in lista_processos:
+        print(f"Treino paralelo com {processos} processo(s)...")
+        with tempfile.TemporaryDirectory() as temporario:
+            historico = treinar_paralelo(processos, epocas, lote, paciencia=epocas,
+                                         checkpoint=os.path.join(temporario, 'checkpoint.h5'), max_janelas=max_janelas)
+        linhas.append((f'paralelo ({processos} processos)', historico))
+
+    def por_epoca(historico):
+        # A primeira época inclui a compilação do grafo: fica de fora quando há outras
+        return np.mean([e['segundos'] for e in historico[1:] or historico])
+
+    base = por_epoca(linhas[0][1])
+    print(f"\n{'modo':28s} {'s/época':>9s} {'aceleração':>11s} {'val_loss final':>15s}")
+    for nome, historico in linhas:
+        segundos = por_epoca(historico)
+        print(f"{nome:28s} {segundos:9.1f} {base / segundos:10.2f}x {historico[-1]['val_loss']:15.6f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Treino do LSTM com vários processos (paralelismo de dados).')
+    parser.add_argument('--processos', type=int, default=os.cpu_count())
+    parser.add_argument('--epocas', type=int, default=EPOCHS)
+    parser.add_argument('--lote', type=int, default=BATCH_SIZE, help='lote global (divisível pelos processos)')
+    parser.add_argument('--max-janelas', type=int, help='usa só as primeiras N janelas de treino')
+    parser.add_argument('--comparar', type=int, nargs='+', metavar='N',
+                        help='compara o tempo por época com model.fit para cada número de processos')
+    args = parser.parse_args()
+
+    manifesto = exigir_preprocessado()
+
+    if args.comparar:
+        comparar(args.comparar, args.epocas, args.lote, args.max_janelas)
+        exit()
+
+    print(f"Treinando com {args.processos} processos (lote global {args.lote}, LOOK_BACK={manifesto['look_back']})...")
+    inicio = time.perf_counter()
+    try:
+        historico = treinar_paralelo(args.processos, args.epocas, args.lote, max_janelas=args.max_janelas)
+    except Exception as e:
+        print(f"Erro no treino: {e}")
+        exit()
+    print(f"\nTreinamento concluído em {time.perf_counter() - inicio:.0f}s.")
+
+    from normalizador import Normalizador, salvar_normalizador
+    from registro_modelos import RegistroModelos
+
+    # O checkpoint tem os melhores pesos (val_loss); só agora ele substitui o modelo em uso,
+    # depois de o artefato do normalizador (com o hash do checkpoint) estar gravado
+    treino = carregar_preprocessado('treino')
+    scaler = Normalizador(**manifesto['normalizador'])
+    salvar_normalizador(scaler, manifesto['look_back'], MODEL_FILE, corte_treino=treino['timestamp'][-1],
+                        novo_modelo=CHECKPOINT_FILE)
+    os.replace(CHECKPOINT_FILE, MODEL_FILE)
+    print(f"O melhor modelo foi salvo em '{MODEL_FILE}'.")
+    if PUBLICAR_NO_REGISTRO:
+        print(f"Modelo publicado e ativado no registro como versão {RegistroModelos().publicar(MODEL_FILE)}.")
@@ -0,0 +1,150 @@
+import argparse
+import itertools
+import json
+import multiprocessing as mp
+import os
+import random
+import time
+
+import numpy as np
+import pandas as pd
+
+from Data.armazem_candles import DIRETORIO_PREPROCESSADO
+from treino_comum import configurar_threads, exigir_preprocessado
+
+# --- Varredura de Hiperparâmetros em Paralelo ---
+# Cada tentativa (uma combinação do espaço de busca) treina em um processo separado, com um número
+# fixo de threads do TensorFlow, para N processos dividirem os núcleos sem disputa.
+# Todos os processos leem as mesmas séries normalizadas do Data/preprocessado via memmap: o sistema
+# operacional mantém uma única cópia em cache e a RAM não cresce com o número de processos.
+
+# --- 1. Configurações ---
+ESPACO_PADRAO = {
+    'look_back': [30, 60],
+    'unidades': [32, 50],
+    'dropout': [0.1, 0.2],
+    'batch_size': [128, 256],
+}
+EPOCAS = 5
+SAIDA_PADRAO = 'resultados_varredura.csv'
+
+# Poda pela mediana: a partir da época EPOCA_MIN_PODA, uma tentativa é interrompida se o val_loss
+# dela for pior que a mediana das outras tentativas na mesma época (com pelo menos MIN_TENTATIVAS_PODA)
+EPOCA_MIN_PODA = 1
+MIN_TENTATIVAS_PODA = 3
+
+
+def combinacoes(espaco, max_tentativas=None, seed=0):
+    nomes = sorted(espaco)
+    todas = [dict(zip(nomes, valores)) for valores in itertools.product(*(espaco[n] for n in nomes))]
+    if max_tentativas is not None and max_tentativas < len(todas):
+        todas = random.Random(seed).sample(todas, max_tentativas)
+    return todas
+
+
+# --- 2. Processos de Treino ---
+def _configurar_processo(threads, historico, trava):
+    configurar_threads(threads)
+    global _historico, _trava
+    _historico, _trava = historico, trava
+
+
+def _deve_podar(epoca, val_loss):
+    """Registra o val_loss da época e diz se a tentativa está abaixo da mediana das outras."""
+    with _trava:
+        anteriores = list(_historico.get(epoca, []))
+        _historico[epoca] = anteriores + [val_loss]
+    if epoca < EPOCA_MIN_PODA or len(anteriores) < MIN_TENTATIVAS_PODA:
+        return False
+    return val_loss > float(np.median(anteriores))
+
+
+def executar_tentativa(argumentos):
+    numero, parametros, epocas, diretorio = argumentos
+    import tensorflow as tf
+    from Data.armazem_candles import carregar_preprocessado, ler_manifesto
+    from modelo import construir_modelo
+    from sequencias import SequenciaJanelas
+
+    tf.keras.utils.set_random_seed(numero)
+    look_back = parametros['look_back']
+    treino = carregar_preprocessado('treino', diretorio)
+    validacao = carregar_preprocessado('validacao', diretorio)
+    # As séries continuam mapeadas do disco; cada lote copia só batch_size janelas. Com o LOOK_BACK do
+    # pipeline, as janelas sem lacunas também vêm do disco; com outro, são recalculadas neste processo
+    mesmo_look_back = look_back == ler_manifesto(diretorio)['look_back']
+    train_sequences = SequenciaJanelas(treino['close'], look_back, batch_size=parametros['batch_size'],
+                                       shuffle=True, seed=numero, timestamps=treino['timestamp'],
+                                       indices=treino['indices'] if mesmo_look_back else None)
+    val_sequences = SequenciaJanelas(validacao['close'], look_back, batch_size=1024,
+                                     timestamps=validacao['timestamp'],
+                                     indices=validacao['indices'] if mesmo_look_back else None)
+
+    class PodaMediana(tf.keras.callbacks.Callback):
+        podada = False
+
+        def on_epoch_end(self, epoch, logs=None):
+            if _deve_podar(epoch, float(logs['val_loss'])):
+                self.podada = True
+                self.model.stop_training = True
+
+    poda = PodaMediana()
+    model = construir_modelo(look_back, parametros['unidades'], parametros['dropout'])
+    inicio = time.perf_counter()
+    history = model.fit(train_sequences, epochs=epocas, validation_data=val_sequences, callbacks=[poda], verbose=0)
+    perdas = history.history['val_loss']
+    return {
+        'tentativa': numero,
+        **parametros,
+        'melhor_val_loss': float(min(perdas)),
+        'ultimo_val_loss': float(perdas[-1]),
+        'epocas': len(perdas),
+        'podada': poda.podada,
+        'segundos': time.perf_counter() - inicio,
+    }
+
+
+# --- 3. Varredura ---
+def varrer(tentativas, epocas, processos, threads, diretorio=DIRETORIO_PREPROCESSADO):
+    """Roda as tentativas em `processos` processos com `threads` threads cada. Retorna um DataFrame."""
+    # 'spawn': o TensorFlow não é seguro depois de um fork
+    contexto = mp.get_context('spawn')
+    with contexto.Manager() as gerente:
+        historico, trava = gerente.dict(), gerente.Lock()
+        with contexto.Pool(processos, initializer=_configurar_processo, initargs=(threads, historico, trava),
+                           maxtasksperchild=1) as pool:
+            argumentos = [(i, parametros, epocas, diretorio) for i, parametros in enumerate(tentativas)]
+            resultados = []
+            for resultado in pool.imap_unordered(executar_tentativa, argumentos):
+                situacao = 'podada' if resultado['podada'] else 'concluída'
+                print(f"  Tentativa {resultado['tentativa']} {situacao}: val_loss={resultado['melhor_val_loss']:.6f} "
+                      f"({resultado['epocas']} épocas, {resultado['segundos']:.0f}s)")
+                resultados.append(resultado)
+    return pd.DataFrame(resultados).sort_values('melhor_val_loss').reset_index(drop=True)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Varredura de hiperparâmetros do LSTM em processos paralelos.')
+    parser.add_argument('--espaco', help='arquivo JSON {parametro: [valores]} (padrão: ESPACO_PADRAO)')
+    parser.add_argument('--max-tentativas', type=int, help='sorteia no máximo N combinações da grade')
+    parser.add_argument('--epocas', type=int, default=EPOCAS)
+    parser.add_argument('--processos', type=int, default=os.cpu_count())
+    parser.add_argument('--threads', type=int, default=1, help='threads intra-op do TensorFlow por processo')
+    parser.add_argument('--saida', default=SAIDA_PADRAO)
+    args = parser.parse_args()
+
+    manifesto = exigir_preprocessado()
+
+    espaco = ESPACO_PADRAO
+    if args.espaco:
+        with open(args.espaco) as f:
+            espaco = json.load(f)
+    tentativas = combinacoes(espaco, args.max_tentativas)
+
+    print(f"Varredura: {len(tentativas)} tentativas, {args.processos} processos x {args.threads} threads.")
+    inicio = time.perf_counter()
+    tabela = varrer(tentativas, args.epocas, args.processos, args.threads)
+    tabela.to_csv(args.saida, index=False)
+
+    print(f"\nVarredura concluída em {time.perf_counter() - inicio:.0f}s. Resultados em '{args.saida}':")
+    print(tabela.to_string(index=False))